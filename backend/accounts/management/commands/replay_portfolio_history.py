@@ -0,0 +1,91 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils import timezone
+from companies.history import parse_history_bound
+from investments.models import Investment
+from accounts.replay import DEFAULT_CHUNK_SIZE, PortfolioReplayer, replay_range, split_user_range
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild PortfolioHistory by replaying stored daily prices (resumable, parallel by user ID range). '
+        'A resumed run keeps the window of the interrupted one, including a default window. '
+        'Withdrawn investments are left out, since their withdrawal date is not recorded.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help='First day to replay (ISO date, default 365 days ago)')
+        parser.add_argument('--to', dest='end', help='Day after the last replayed day (ISO date, default tomorrow)')
+        parser.add_argument('--users', help='User ID range to replay, e.g. 1-50000 (default all users with investments)')
+        parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Users per transaction')
+        parser.add_argument('--restart', action='store_true', help='Ignore saved checkpoints and replay from the start')
+
+    def handle(self, *args, **options):
+        try:
+            today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            start = parse_history_bound(options['start']) if options['start'] else today - timedelta(days=365)
+            end = parse_history_bound(options['end']) if options['end'] else today + timedelta(days=1)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if start >= end:
+            raise CommandError('--from must be before --to')
+        # Checkpoints are keyed by the window as given, so defaults resolved on another day still resume
+        window = f"{start.date() if options['start'] else 'default'}:{end.date() if options['end'] else 'default'}"
+
+        if options['users']:
+            try:
+                first_user_id, last_user_id = (int(part) for part in options['users'].split('-', 1))
+            except ValueError:
+                raise CommandError('--users must look like FIRST-LAST, e.g. 1-50000')
+        else:
+            bounds = Investment.objects.aggregate(first=Min('user_id'), last=Max('user_id'))
+            if bounds['first'] is None:
+                self.stdout.write('No investments to replay')
+                return
+            first_user_id, last_user_id = bounds['first'], bounds['last']
+
+        resume = not options['restart']
+        workers = max(options['workers'], 1)
+        ranges = split_user_range(first_user_id, last_user_id, workers)
+        self.stdout.write(f"Replaying {start.date()} .. {end.date()} for users {first_user_id}-{last_user_id} "
+                          f"in {len(ranges)} range(s)")
+
+        if len(ranges) == 1:
+            if not options['users']:
+                # Open bounds keep the checkpoint key stable as users are added
+                first_user_id = last_user_id = None
+            checkpoint = PortfolioReplayer(
+                start, end, first_user_id, last_user_id,
+                chunk_size=options['chunk_size'], resume=resume, window=window
+            ).run()
+            self.stdout.write(self.style.SUCCESS(f"{checkpoint.key}: {checkpoint.rows_written} history rows"))
+            return
+
+        # Children must open their own database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=context) as executor:
+            futures = [
+                executor.submit(replay_range, start, end, low, high, options['chunk_size'], resume, window)
+                for low, high in ranges
+            ]
+            failed = 0
+            for future in as_completed(futures):
+                try:
+                    key, rows_written = future.result()
+                    self.stdout.write(self.style.SUCCESS(f"{key}: {rows_written} history rows"))
+                except Exception as e:
+                    failed += 1
+                    logger.exception(f"Replay worker failed: {str(e)}")
+                    self.stderr.write(f"Replay worker failed: {str(e)}")
+
+        if failed:
+            raise CommandError(f"{failed} replay range(s) failed; re-run the same command to resume them")
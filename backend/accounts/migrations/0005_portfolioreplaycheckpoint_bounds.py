@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_portfoliohistory_timestamp_portfolioreplaycheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfolioreplaycheckpoint',
+            name='end',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='portfolioreplaycheckpoint',
+            name='start',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
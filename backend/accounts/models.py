@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager, UserManager
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
+from django.utils import timezone
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, username, email, password=None, **extra_fields):
@@ -88,7 +89,7 @@ class PortfolioHistory(models.Model):
     portfolio = models.ForeignKey(Portfolio, on_delete=models.CASCADE, related_name='history')
     value = models.DecimalField(max_digits=20, decimal_places=2)
     profit_loss = models.DecimalField(max_digits=20, decimal_places=2)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # Set explicitly when replaying history
 
     class Meta:
         ordering = ['-timestamp']
@@ -96,3 +97,16 @@ class PortfolioHistory(models.Model):
 
     def __str__(self):
         return f"{self.portfolio.user.username}'s Portfolio History - {self.timestamp}"
+
+class PortfolioReplayCheckpoint(models.Model):
+    """Progress of a PortfolioHistory replay over one user ID range"""
+    key = models.CharField(max_length=100, unique=True)
+    last_user_id = models.IntegerField(default=0)  # Highest user ID fully replayed
+    rows_written = models.IntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    start = models.DateTimeField(null=True, blank=True)  # Resolved window, reused on resume
+    end = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Replay {self.key} at user {self.last_user_id}"
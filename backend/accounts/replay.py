@@ -0,0 +1,299 @@
+import logging
+import time
+from datetime import timedelta
+from decimal import Decimal
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from companies.models import PriceBar
+from investments.models import Investment, InvestmentPosition
+from .models import Portfolio, PortfolioHistory, PortfolioReplayCheckpoint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def replay_days(start, end):
+    """Start of every UTC day in [start, end) that has at least one daily bar"""
+    return list(
+        PriceBar.objects.filter(
+            resolution=PriceBar.RESOLUTION_DAY,
+            bucket_start__gte=start,
+            bucket_start__lt=end
+        ).order_by('bucket_start').values_list('bucket_start', flat=True).distinct()
+    )
+
+
+def day_end(day):
+    """Timestamp used for the history point of a replayed day"""
+    return day + timedelta(days=1) - timedelta(seconds=1)
+
+
+class PriceMatrix:
+    """
+    Daily closes as a (days x companies) array, forward-filled so each cell
+    holds the latest close known at the end of that day (NaN before the
+    company's first bar).
+    """
+
+    def __init__(self, days, company_ids, closes):
+        self.days = days
+        self.company_ids = company_ids
+        self.closes = closes
+
+    @classmethod
+    def load(cls, days, company_ids):
+        company_ids = np.unique(np.asarray(company_ids, dtype=np.int64))
+        closes = np.full((len(days), len(company_ids)), np.nan, dtype=np.float64)
+        if not days or not len(company_ids):
+            return cls(days, company_ids, closes)
+
+        day_index = {day: row for row, day in enumerate(days)}
+        bars = PriceBar.objects.filter(
+            resolution=PriceBar.RESOLUTION_DAY,
+            company_id__in=company_ids.tolist(),
+            bucket_start__gte=days[0],
+            bucket_start__lte=days[-1]
+        ).values_list('company_id', 'bucket_start', 'close')
+        for company_id, bucket_start, close in bars.iterator(chunk_size=10000):
+            column = np.searchsorted(company_ids, company_id)
+            closes[day_index[bucket_start], column] = float(close)
+
+        # Seed the first row with the last close before the window
+        seed = PriceBar.objects.filter(
+            resolution=PriceBar.RESOLUTION_DAY,
+            company_id__in=company_ids.tolist(),
+            bucket_start__lt=days[0]
+        ).values('company_id').annotate(latest=Max('bucket_start'))
+        previous = PriceBar.objects.filter(
+            resolution=PriceBar.RESOLUTION_DAY,
+            company_id__in=[row['company_id'] for row in seed],
+            bucket_start__in={row['latest'] for row in seed}
+        ).values_list('company_id', 'bucket_start', 'close')
+        latest = {row['company_id']: row['latest'] for row in seed}
+        for company_id, bucket_start, close in previous:
+            column = np.searchsorted(company_ids, company_id)
+            if latest[company_id] == bucket_start and np.isnan(closes[0, column]):
+                closes[0, column] = float(close)
+
+        # Forward-fill gaps day by day
+        for row in range(1, len(days)):
+            missing = np.isnan(closes[row])
+            closes[row, missing] = closes[row - 1, missing]
+        return cls(days, company_ids, closes)
+
+
+class ReplayBook:
+    """
+    Positions of a chunk of users loaded once as arrays and revalued at
+    every replayed day without further queries.
+    """
+
+    def __init__(self, investments, positions, prices):
+        self.portfolio_ids = np.array(sorted({row['portfolio_id'] for row in investments}), dtype=np.int64)
+        self.investment_ids = np.array([row['pk'] for row in investments], dtype=np.int64)
+        self.amounts = np.array([float(row['amount']) for row in investments], dtype=np.float64)
+        self.opened_at = np.array([row['investment_date'].timestamp() for row in investments], dtype=np.float64)
+        self.investment_portfolio = np.searchsorted(
+            self.portfolio_ids,
+            np.array([row['portfolio_id'] for row in investments], dtype=np.int64)
+        )
+
+        order = np.argsort(self.investment_ids)
+        sorted_ids = self.investment_ids[order]
+        position_investments = np.array([row[0] for row in positions], dtype=np.int64)
+        self.position_investment = order[np.searchsorted(sorted_ids, position_investments)]
+        self.position_company = np.searchsorted(
+            prices.company_ids, np.array([row[1] for row in positions], dtype=np.int64)
+        )
+        self.quantities = np.array([float(row[2]) for row in positions], dtype=np.float64)
+        self.purchase_prices = np.array([float(row[3]) for row in positions], dtype=np.float64)
+
+    def values_at(self, closes, opened):
+        """
+        Portfolio (value, profit_loss) arrays for one day.
+        closes is the day's row of the price matrix and opened a boolean mask
+        of investments that existed by then; like Investment.update_current_value
+        a non-positive total falls back to the invested amount.
+        """
+        investment_count = len(self.investment_ids)
+        prices = closes[self.position_company]
+        prices = np.where(np.isnan(prices), self.purchase_prices, prices)
+        totals = np.bincount(
+            self.position_investment,
+            weights=self.quantities * prices,
+            minlength=investment_count
+        )
+        values = np.round(np.where(totals > 0, totals, self.amounts), 2)
+        values = np.where(opened, values, 0.0)
+        amounts = np.where(opened, self.amounts, 0.0)
+
+        portfolio_count = len(self.portfolio_ids)
+        portfolio_values = np.bincount(self.investment_portfolio, weights=values, minlength=portfolio_count)
+        portfolio_amounts = np.bincount(self.investment_portfolio, weights=amounts, minlength=portfolio_count)
+        has_investments = np.bincount(
+            self.investment_portfolio, weights=opened.astype(np.float64), minlength=portfolio_count
+        ) > 0
+        return portfolio_values, portfolio_values - portfolio_amounts, has_investments
+
+
+def ensure_portfolios(user_ids):
+    """Map user ID -> Portfolio ID, creating missing portfolios in bulk"""
+    existing = dict(Portfolio.objects.filter(user_id__in=user_ids).values_list('user_id', 'pk'))
+    missing = [Portfolio(user_id=user_id) for user_id in user_ids if user_id not in existing]
+    if missing:
+        Portfolio.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = dict(Portfolio.objects.filter(user_id__in=user_ids).values_list('user_id', 'pk'))
+    return existing
+
+
+class PortfolioReplayer:
+    """
+    Rebuilds PortfolioHistory for users in [first_user_id, last_user_id] by
+    revaluing their investments at the close of every day in [start, end).
+
+    Users are processed in chunks of chunk_size; each chunk replaces its own
+    replayed points (same day-end timestamps) and advances a checkpoint in
+    the same transaction, so an interrupted replay resumes after the last
+    finished chunk and re-running a range is idempotent.
+
+    The checkpoint is keyed by window, the window as requested (default
+    "<start date>:<end date>"), and stores the resolved start and end. A
+    resumed replay keeps the stored bounds, so a window given as "default"
+    does not move with the calendar between runs.
+
+    Withdrawn investments are left out: the withdrawal date is not recorded,
+    so they cannot be valued only up to it.
+    """
+
+    def __init__(self, start, end, first_user_id=None, last_user_id=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, resume=True, window=None):
+        self.start = start
+        self.end = end
+        self.first_user_id = first_user_id or 0
+        self.last_user_id = last_user_id
+        self.chunk_size = chunk_size
+        self.resume = resume
+        self.window = window or f"{start.date()}:{end.date()}"
+
+    @property
+    def key(self):
+        return (
+            f"{self.window}:"
+            f"{self.first_user_id}-{self.last_user_id if self.last_user_id is not None else 'max'}"
+        )
+
+    def investments(self):
+        investments = Investment.objects.filter(
+            user_id__gte=self.first_user_id, investment_date__lt=self.end
+        ).exclude(status='WITHDRAWN')
+        if self.last_user_id is not None:
+            investments = investments.filter(user_id__lte=self.last_user_id)
+        return investments
+
+    def run(self):
+        started = time.perf_counter()
+        checkpoint, created = PortfolioReplayCheckpoint.objects.get_or_create(key=self.key)
+        # Checkpoints saved without bounds are keyed by an explicit window
+        bounds = (checkpoint.start or self.start, checkpoint.end or self.end)
+        if self.resume and not checkpoint.finished:
+            if bounds != (self.start, self.end):
+                logger.info(f"Replay {self.key}: resuming over {bounds[0]} .. {bounds[1]}")
+            self.start, self.end = bounds
+        elif self.resume and bounds == (self.start, self.end):
+            logger.info(f"Replay {self.key} already finished")
+            return checkpoint
+        else:
+            checkpoint.last_user_id, checkpoint.rows_written, checkpoint.finished = 0, 0, False
+        checkpoint.start, checkpoint.end = self.start, self.end
+
+        days = replay_days(self.start, self.end)
+        if not days:
+            logger.info(f"Replay {self.key}: no daily bars in window")
+            return checkpoint
+
+        # 1. Price matrix for every company held in the range, loaded once
+        company_ids = InvestmentPosition.objects.filter(
+            investment__in=self.investments()
+        ).values_list('company_id', flat=True).distinct()
+        prices = PriceMatrix.load(days, list(company_ids))
+        stamps = [day_end(day) for day in days]
+
+        # 2. Walk users in ID order, one chunk at a time
+        user_ids = list(
+            self.investments().filter(
+                user_id__gt=checkpoint.last_user_id
+            ).order_by('user_id').values_list('user_id', flat=True).distinct()
+        )
+        for offset in range(0, len(user_ids), self.chunk_size):
+            chunk = user_ids[offset:offset + self.chunk_size]
+            with transaction.atomic():
+                written = self.replay_chunk(chunk, prices, stamps)
+                checkpoint.last_user_id = chunk[-1]
+                checkpoint.rows_written += written
+                checkpoint.save()
+            logger.info(f"Replay {self.key}: users up to {chunk[-1]} done, {checkpoint.rows_written} rows")
+
+        checkpoint.finished = True
+        checkpoint.save()
+        logger.info(
+            f"Replay {self.key} finished: {checkpoint.rows_written} rows over {len(days)} days "
+            f"in {(time.perf_counter() - started):.1f} s"
+        )
+        return checkpoint
+
+    def replay_chunk(self, user_ids, prices, stamps):
+        portfolios = ensure_portfolios(user_ids)
+        investments = [
+            {**row, 'portfolio_id': portfolios[row['user_id']]}
+            for row in self.investments().filter(user_id__in=user_ids).values(
+                'pk', 'user_id', 'amount', 'investment_date'
+            )
+        ]
+        positions = list(
+            InvestmentPosition.objects.filter(
+                investment_id__in=[row['pk'] for row in investments]
+            ).values_list('investment_id', 'company_id', 'quantity', 'purchase_price')
+        )
+        book = ReplayBook(investments, positions, prices)
+
+        history = []
+        for row, stamp in enumerate(stamps):
+            opened = book.opened_at <= stamp.timestamp()
+            values, profit_loss, has_investments = book.values_at(prices.closes[row], opened)
+            for column in np.flatnonzero(has_investments).tolist():
+                history.append(PortfolioHistory(
+                    portfolio_id=int(book.portfolio_ids[column]),
+                    value=Decimal(f"{values[column]:.2f}"),
+                    profit_loss=Decimal(f"{profit_loss[column]:.2f}"),
+                    timestamp=stamp
+                ))
+
+        PortfolioHistory.objects.filter(
+            portfolio_id__in=book.portfolio_ids.tolist(),
+            timestamp__in=stamps
+        ).delete()
+        PortfolioHistory.objects.bulk_create(history, batch_size=5000)
+        return len(history)
+
+
+def split_user_range(first_user_id, last_user_id, workers):
+    """Split [first, last] into up to workers contiguous, non-overlapping ranges"""
+    size = max((last_user_id - first_user_id + 1) // workers, 1)
+    ranges = []
+    low = first_user_id
+    while low <= last_user_id:
+        high = last_user_id if len(ranges) == workers - 1 else min(low + size - 1, last_user_id)
+        ranges.append((low, high))
+        low = high + 1
+    return ranges
+
+
+def replay_range(start, end, first_user_id, last_user_id, chunk_size=DEFAULT_CHUNK_SIZE, resume=True, window=None):
+    """Entry point for one worker process; returns (key, rows_written)"""
+    checkpoint = PortfolioReplayer(
+        start, end, first_user_id, last_user_id, chunk_size=chunk_size, resume=resume, window=window
+    ).run()
+    return checkpoint.key, checkpoint.rows_written
+
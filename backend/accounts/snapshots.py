@@ -0,0 +1,72 @@
+import logging
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import Portfolio, PortfolioHistory
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_portfolios(company_ids=None):
+    """
+    Refresh portfolio totals after a revaluation and append a history point.
+
+    Totals are computed with one grouped aggregate over investments (same
+    sums as Portfolio.update_totals). When company_ids is given only users
+    holding those companies are snapshotted; an empty collection is a no-op.
+    Returns the number of history rows written.
+    """
+    from investments.models import Investment
+
+    investments = Investment.objects.all()
+    if company_ids is not None:
+        company_ids = list(company_ids)
+        if not company_ids:
+            return 0
+        investments = investments.filter(
+            user_id__in=Investment.objects.filter(
+                positions__company_id__in=company_ids
+            ).values('user_id')
+        )
+
+    totals = {
+        row['user_id']: row
+        for row in investments.values('user_id').annotate(
+            value=Sum('current_value'),
+            profit_loss=Sum('profit_loss')
+        )
+    }
+    if not totals:
+        return 0
+
+    now = timezone.now()
+    portfolios = list(Portfolio.objects.filter(user_id__in=list(totals)))
+    existing = {portfolio.user_id for portfolio in portfolios}
+    portfolios += [Portfolio(user_id=user_id) for user_id in totals if user_id not in existing]
+
+    for portfolio in portfolios:
+        row = totals[portfolio.user_id]
+        portfolio.total_value = row['value'] or Decimal('0.00')
+        portfolio.total_profit_loss = row['profit_loss'] or Decimal('0.00')
+        portfolio.last_updated = now
+
+    with transaction.atomic():
+        Portfolio.objects.bulk_create([p for p in portfolios if p.pk is None])
+        Portfolio.objects.bulk_update(
+            [p for p in portfolios if p.user_id in existing],
+            ['total_value', 'total_profit_loss', 'last_updated'],
+            batch_size=1000
+        )
+        history = [
+            PortfolioHistory(
+                portfolio_id=portfolio.pk,
+                value=portfolio.total_value,
+                profit_loss=portfolio.total_profit_loss
+            )
+            for portfolio in portfolios
+        ]
+        PortfolioHistory.objects.bulk_create(history, batch_size=1000)
+
+    logger.info(f"Snapshotted {len(history)} portfolios")
+    return len(history)
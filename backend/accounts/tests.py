@@ -1,3 +1,60 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 from django.test import TestCase
+from companies.models import Company, PriceBar
+from indexes.models import Index
+from investments.models import Investment, InvestmentPosition
+from .models import CustomUser, PortfolioHistory, PortfolioReplayCheckpoint
+from .replay import PortfolioReplayer, day_end
 
-# Create your tests here.
+DAYS = [datetime(2025, 3, day, tzinfo=dt_timezone.utc) for day in range(3, 8)]
+
+
+class PortfolioReplayTests(TestCase):
+    """Replaying portfolio history from daily bars"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('user', 'user@example.com', 'password')
+        self.company = Company.objects.create(name='Alpha', symbol='AAA', current_price=Decimal('10.00'))
+        for offset, day in enumerate(DAYS):
+            close = Decimal(10 + offset)
+            PriceBar.objects.create(
+                company=self.company, resolution=PriceBar.RESOLUTION_DAY, bucket_start=day,
+                open=close, high=close, low=close, close=close, tick_count=1, first_tick_at=day, last_tick_at=day
+            )
+        self.index = Index.objects.create(name='Index', description='Test index')
+        self.add_investment('ACTIVE')
+
+    def add_investment(self, status):
+        investment = Investment.objects.create(user=self.user, index=self.index, amount=Decimal('20.00'), status=status)
+        Investment.objects.filter(pk=investment.pk).update(investment_date=DAYS[0] - timedelta(days=1))
+        InvestmentPosition.objects.create(
+            investment=investment, company=self.company, amount=Decimal('20.00'), quantity=Decimal('2'),
+            purchase_price=Decimal('10.00'), current_price=Decimal('10.00'), weight=Decimal('100.00')
+        )
+
+    def history(self):
+        return list(PortfolioHistory.objects.order_by('timestamp').values_list('timestamp', 'value'))
+
+    def test_resume_keeps_the_interrupted_window(self):
+        # A default window resolved on an earlier day, interrupted before any chunk finished
+        PortfolioReplayCheckpoint.objects.create(key='default:default:0-max', start=DAYS[0], end=DAYS[2])
+        checkpoint = PortfolioReplayer(DAYS[1], DAYS[4], window='default:default').run()
+        self.assertTrue(checkpoint.finished)
+        self.assertEqual((checkpoint.start, checkpoint.end), (DAYS[0], DAYS[2]))
+        self.assertEqual([row[0] for row in self.history()], [day_end(DAYS[0]), day_end(DAYS[1])])
+
+    def test_finished_window_is_not_replayed_but_a_new_one_is(self):
+        PortfolioReplayer(DAYS[0], DAYS[2], window='default:default').run()
+        PortfolioHistory.objects.all().delete()
+        PortfolioReplayer(DAYS[0], DAYS[2], window='default:default').run()
+        self.assertEqual(self.history(), [])
+
+        checkpoint = PortfolioReplayer(DAYS[1], DAYS[4], window='default:default').run()
+        self.assertEqual((checkpoint.start, checkpoint.end), (DAYS[1], DAYS[4]))
+        self.assertEqual([row[0] for row in self.history()], [day_end(day) for day in DAYS[1:4]])
+
+    def test_withdrawn_investments_are_left_out(self):
+        self.add_investment('WITHDRAWN')
+        PortfolioReplayer(DAYS[0], DAYS[2]).run()
+        self.assertEqual([row[1] for row in self.history()], [Decimal('20.00'), Decimal('22.00')])
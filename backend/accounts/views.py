@@ -10,13 +10,13 @@ from .serializer import (
     UserProfileSerializer
 )
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from .models import CustomUser, Portfolio
+from .models import CustomUser, Portfolio, PortfolioHistory
 from .serializer import (
     PortfolioSerializer,
     PortfolioHistorySerializer
 )
 from decimal import Decimal
-from django.db.models import Sum, Count, F
+from django.db.models import Count, F
 from django.db.models.functions import TruncMonth
 from investments.models import Investment, InvestmentPosition
 from companies.models import Company
@@ -209,22 +209,25 @@ class UserProfileView(APIView):
 
         # Get monthly performance data (last 12 months)
         twelve_months_ago = timezone.now() - timedelta(days=365)
-        monthly_performance = Portfolio.objects.filter(
-            user=user,
-            history__timestamp__gte=twelve_months_ago
+        # History can hold many points per month (e.g. daily replayed values),
+        # so each month reports its last portfolio value rather than a sum
+        monthly_performance = {}
+        history = PortfolioHistory.objects.filter(
+            portfolio__user=user,
+            timestamp__gte=twelve_months_ago
         ).annotate(
-            month=TruncMonth('history__timestamp')
-        ).values('month').annotate(
-            value=Sum('history__value')
-        ).order_by('month')
+            month=TruncMonth('timestamp')
+        ).order_by('timestamp').values_list('month', 'value')
+        for month, value in history:
+            monthly_performance[month] = value
 
         # Format monthly performance data
         monthly_data = [
             {
-                'month': item['month'].strftime('%Y-%m'),
-                'value': float(item['value'])
+                'month': month.strftime('%Y-%m'),
+                'value': float(value)
             }
-            for item in monthly_performance
+            for month, value in monthly_performance.items()
         ]
 
         # Calculate investment details by index
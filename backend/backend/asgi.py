@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Server processes (runserver, gunicorn, uwsgi, ...) host the price scheduler
+# when PRICE_SCHEDULER_AUTOSTART is set; the apps must be loaded first
+from updates.scheduler import autostart_scheduler  # noqa: E402
+
+autostart_scheduler()
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'accounts',
     'companies',
     'indexes',
@@ -52,8 +53,29 @@ INSTALLED_APPS = [
     'insurance',
     'voting',
     'updates',
+    'jobs',
 ]
 
+# Shared cache: Redis when REDIS_URL is set, otherwise a database table
+# (created by the indexes migrations or `manage.py createcachetable`).
+# Cached responses are invalidated from other processes (the run_jobs
+# worker, the scheduler leader), so a per-process cache would go stale.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_table',
+        }
+    }
+INDEX_CACHE_TIMEOUT = int(os.getenv('INDEX_CACHE_TIMEOUT', 300))  # seconds an index list/detail response is cached
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -177,6 +199,39 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Price updates
+PRICE_SOURCE_CLASS = os.getenv('PRICE_SOURCE_CLASS', 'updates.sources.FilePriceSource')
+PRICE_SOURCE_PATH = os.getenv('PRICE_SOURCE_PATH', str(BASE_DIR / 'data_prices.csv'))
+PRICE_INGEST_BATCH_SIZE = int(os.getenv('PRICE_INGEST_BATCH_SIZE', 500))
+PRICE_SNAPSHOT_FULL_REFRESH = 60 * 60  # seconds between full re-reads of the in-memory price snapshot
+PRICE_SOURCE_URL = os.getenv('PRICE_SOURCE_URL', '')  # quote API for updates.http_source.HttpPriceSource
+PRICE_SOURCE_API_KEY = os.getenv('PRICE_SOURCE_API_KEY', '')
+PRICE_HTTP_BATCH_SIZE = int(os.getenv('PRICE_HTTP_BATCH_SIZE', 100))  # symbols per quote request
+PRICE_HTTP_CONCURRENCY = int(os.getenv('PRICE_HTTP_CONCURRENCY', 8))  # quote requests in flight
+PRICE_HTTP_RETRIES = 3
+PRICE_HTTP_BACKOFF = 0.5  # seconds, doubled on each retry
+PRICE_HTTP_TIMEOUT = 10  # seconds per request
+PRICE_TICKS_MAX_BATCH = 10000  # ticks accepted per request by updates/ticks/
+REVALUATION_ENGINE = os.getenv('REVALUATION_ENGINE', 'vectorized')  # 'vectorized' (NumPy) or 'sql'
+REVALUATION_BATCH_SIZE = 1000  # investments per bulk update statement
+REVALUATION_SHARDS = int(os.getenv('REVALUATION_SHARDS', 1))  # worker processes; 1 revalues in-process
+REVALUATION_SHARD_BY = os.getenv('REVALUATION_SHARD_BY', 'id')  # partition by investment 'id' range or by 'index'
+REVALUATION_SHARD_MIN_INVESTMENTS = 10000  # smaller books are revalued in-process
+EXECUTION_BATCH_SIZE = 5000  # positions per bulk insert when an index is executed
+JOB_POLL_INTERVAL = 2  # seconds an idle job worker waits before polling again
+JOB_HEARTBEAT_INTERVAL = 30  # seconds between lease renewals of a running job
+JOB_LEASE_SECONDS = 300  # running jobs without a heartbeat for this long are retried
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_BACKOFF = 30  # seconds before the first retry, doubled on each further attempt
+COUNTER_RECONCILE_INTERVAL = int(os.getenv('COUNTER_RECONCILE_INTERVAL', 6 * 60 * 60))  # seconds between platform counter recounts
+INDEX_AUTO_TRANSITIONS = os.getenv('INDEX_AUTO_TRANSITIONS', 'true').lower() == 'true'  # scheduler opens/closes windows on their dates
+ANALYTICS_RISK_FREE_RATE = float(os.getenv('ANALYTICS_RISK_FREE_RATE', 0.0))  # annual rate used by the index Sharpe ratio
+PRICE_UPDATE_INTERVAL = int(os.getenv('PRICE_UPDATE_INTERVAL', 30 * 60))  # seconds between refreshes
+PRICE_SCHEDULER_POLL_INTERVAL = 60  # seconds between scheduler checks
+PRICE_SCHEDULER_JITTER = 15  # random +/- seconds added to each check
+# Start the scheduler in web server processes (see backend/wsgi.py); otherwise run `manage.py run_scheduler`
+PRICE_SCHEDULER_AUTOSTART = os.getenv('PRICE_SCHEDULER_AUTOSTART', 'false').lower() == 'true'
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
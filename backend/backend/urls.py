@@ -27,4 +27,5 @@ urlpatterns = [
     path('insurance/', include('insurance.urls')),
     path('voting/', include('voting.urls')),
     path('updates/', include('updates.urls')),
+    path('jobs/', include('jobs.urls')),
 ]
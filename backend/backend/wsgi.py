@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Server processes (runserver, gunicorn, uwsgi, ...) host the price scheduler
+# when PRICE_SCHEDULER_AUTOSTART is set; the apps must be loaded first
+from updates.scheduler import autostart_scheduler  # noqa: E402
+
+autostart_scheduler()
@@ -0,0 +1,149 @@
+import csv
+import logging
+import re
+import time
+from itertools import islice
+from django.db import transaction
+from django.utils import timezone
+from .models import Company
+from .signals import companies_changed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+SYMBOL_COLUMNS = ['symbol', 'act symbol', 'ticker']
+NAME_COLUMNS = ['company name', 'name']
+
+# Keyword rules used to guess a sector from the company name; first match wins
+SECTOR_KEYWORDS = [
+    ('REAL', ['realty', 'real estate', 'reit', 'properties', 'property']),
+    ('HEALTH', ['pharma', 'pharmaceuticals', 'therapeutics', 'biotherapeutics', 'biosciences', 'biotech',
+                'biopharma', 'medical', 'health', 'healthcare', 'genomics', 'diagnostics', 'oncology',
+                'surgical', 'clinical', 'bio']),
+    ('FIN', ['bank', 'bancorp', 'bancshares', 'financial', 'capital', 'acquisition', 'insurance',
+             'trust', 'investment', 'investors', 'credit', 'lending', 'asset management']),
+    ('ENERGY', ['energy', 'oil', 'gas', 'petroleum', 'solar', 'renewable', 'drilling', 'pipeline', 'midstream']),
+    ('UTIL', ['utilities', 'utility', 'water', 'electric']),
+    ('MAT', ['mining', 'metals', 'gold', 'silver', 'steel', 'chemical', 'chemicals', 'materials',
+             'lithium', 'copper', 'aluminum', 'minerals']),
+    ('TECH', ['technology', 'technologies', 'software', 'semiconductor', 'semiconductors', 'digital',
+              'data', 'cloud', 'networks', 'systems', 'electronics', 'computer', 'internet', 'cyber', 'ai']),
+    ('IND', ['industrial', 'industries', 'aerospace', 'defense', 'machinery', 'logistics', 'transport',
+             'transportation', 'airlines', 'construction', 'engineering', 'manufacturing']),
+    ('CONS', ['retail', 'foods', 'food', 'beverage', 'beverages', 'restaurant', 'restaurants', 'apparel',
+              'brands', 'consumer', 'entertainment', 'hotels', 'stores', 'motors', 'automotive']),
+]
+SECTOR_PATTERNS = [
+    (sector, re.compile(r'\b(' + '|'.join(re.escape(word) for word in words) + r')\b', re.IGNORECASE))
+    for sector, words in SECTOR_KEYWORDS
+]
+
+
+def infer_sector(name):
+    """Guess a sector code from a company name, defaulting to OTHER"""
+    for sector, pattern in SECTOR_PATTERNS:
+        if pattern.search(name):
+            return sector
+    return 'OTHER'
+
+
+class ImportResult:
+    """Counts reported by a catalog import"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.elapsed_ms = 0
+
+    def as_dict(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'skipped': self.skipped,
+            'elapsed_ms': self.elapsed_ms,
+        }
+
+
+def read_catalog_rows(handle):
+    """Yield (symbol, name) pairs from a catalog CSV without loading it all in memory"""
+    reader = csv.reader(handle)
+    header = [column.strip().lower() for column in next(reader, [])]
+    symbol_index = next((header.index(c) for c in SYMBOL_COLUMNS if c in header), None)
+    name_index = next((header.index(c) for c in NAME_COLUMNS if c in header), None)
+    if symbol_index is None or name_index is None:
+        raise ValueError('Catalog CSV needs a symbol and a company name column')
+
+    for row in reader:
+        if len(row) <= max(symbol_index, name_index):
+            yield None, None
+            continue
+        yield row[symbol_index].strip(), row[name_index].strip()
+
+
+def import_catalog(handle, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Upsert companies by symbol from a catalog CSV.
+
+    Rows are processed in chunks: each chunk looks up the existing companies
+    with one query and writes new and changed rows with a single
+    INSERT ... ON CONFLICT (symbol) DO UPDATE. Sectors are inferred from the
+    company name unless a sector other than OTHER is already set.
+    """
+    started = time.perf_counter()
+    result = ImportResult()
+    rows = read_catalog_rows(handle)
+    changed_ids = set()
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        incoming = {}
+        for symbol, name in chunk:
+            if not symbol or not name or len(symbol) > 50:
+                result.skipped += 1
+                continue
+            incoming[symbol] = name[:255]
+
+        existing = {
+            company.symbol: company
+            for company in Company.objects.filter(symbol__in=list(incoming)).only('id', 'symbol', 'name', 'sector')
+        }
+
+        now = timezone.now()
+        upserts = []
+        for symbol, name in incoming.items():
+            company = existing.get(symbol)
+            if company is None:
+                upserts.append(Company(symbol=symbol, name=name, sector=infer_sector(name), updated_at=now))
+                result.inserted += 1
+                continue
+
+            sector = company.sector if company.sector != 'OTHER' else infer_sector(name)
+            if company.name == name and company.sector == sector:
+                result.unchanged += 1
+                continue
+            upserts.append(Company(symbol=symbol, name=name, sector=sector, updated_at=now))
+            changed_ids.add(company.id)
+            result.updated += 1
+
+        if upserts:
+            with transaction.atomic():
+                Company.objects.bulk_create(
+                    upserts,
+                    update_conflicts=True,
+                    unique_fields=['symbol'],
+                    update_fields=['name', 'sector', 'updated_at']
+                )
+
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    logger.info(f"Catalog import finished: {result.as_dict()}")
+    if changed_ids:
+        # bulk_create skips post_save; cached responses embedding these companies must be dropped
+        companies_changed.send(sender=Company, company_ids=changed_ids)
+    return result
@@ -0,0 +1,154 @@
+import logging
+from datetime import datetime, time, timezone as dt_timezone
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import PriceTick, PriceBar
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = [PriceBar.RESOLUTION_HOUR, PriceBar.RESOLUTION_DAY]
+
+
+def bucket_start(timestamp, resolution):
+    """Truncate a timestamp to the start of its hourly or daily UTC bucket"""
+    timestamp = timestamp.astimezone(dt_timezone.utc)
+    if resolution == PriceBar.RESOLUTION_HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def parse_history_bound(value):
+    """Parse a ?from= / ?to= query value given as an ISO date or datetime"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def merge_tick(bar, price, timestamp):
+    """Fold a single tick into an OHLC bar"""
+    if bar.tick_count == 0:
+        bar.open = bar.high = bar.low = bar.close = price
+        bar.first_tick_at = bar.last_tick_at = timestamp
+        bar.tick_count = 1
+        return bar
+
+    if timestamp < bar.first_tick_at:
+        bar.open = price
+        bar.first_tick_at = timestamp
+    if timestamp >= bar.last_tick_at:
+        bar.close = price
+        bar.last_tick_at = timestamp
+    bar.high = max(bar.high, price)
+    bar.low = min(bar.low, price)
+    bar.tick_count += 1
+    return bar
+
+
+def rollup_ticks(ticks):
+    """
+    Incrementally update hourly and daily bars with new ticks.
+
+    Only the buckets the ticks fall into are read (one query) and written
+    back (one batched upsert), so the cost is proportional to the size of
+    the ingest rather than the size of the history.
+    """
+    if not ticks:
+        return 0
+
+    keys = {
+        (tick.company_id, resolution, bucket_start(tick.timestamp, resolution))
+        for tick in ticks
+        for resolution in RESOLUTIONS
+    }
+    company_ids = {key[0] for key in keys}
+    starts = {key[2] for key in keys}
+
+    bars = {
+        (bar.company_id, bar.resolution, bar.bucket_start): bar
+        for bar in PriceBar.objects.filter(company_id__in=company_ids, bucket_start__in=starts)
+    }
+
+    for tick in sorted(ticks, key=lambda t: t.timestamp):
+        for resolution in RESOLUTIONS:
+            key = (tick.company_id, resolution, bucket_start(tick.timestamp, resolution))
+            bar = bars.get(key)
+            if bar is None:
+                bar = bars[key] = PriceBar(
+                    company_id=tick.company_id,
+                    resolution=resolution,
+                    bucket_start=key[2]
+                )
+            merge_tick(bar, tick.price, tick.timestamp)
+
+    touched = [bar for key, bar in bars.items() if key in keys]
+    PriceBar.objects.bulk_create(
+        touched,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['company', 'resolution', 'bucket_start'],
+        update_fields=['open', 'high', 'low', 'close', 'tick_count', 'first_tick_at', 'last_tick_at']
+    )
+    return len(touched)
+
+
+def record_ticks(prices):
+    """
+    Append price ticks and roll them up into OHLC bars.
+    prices is an iterable of (company_id, price, timestamp) tuples.
+    """
+    ticks = [
+        PriceTick(company_id=company_id, price=price, timestamp=timestamp)
+        for company_id, price, timestamp in prices
+    ]
+    if not ticks:
+        return 0
+
+    # Skip ticks already stored for the same (company, timestamp)
+    existing = set(PriceTick.objects.filter(
+        company_id__in={tick.company_id for tick in ticks},
+        timestamp__in={tick.timestamp for tick in ticks}
+    ).values_list('company_id', 'timestamp'))
+    ticks = [tick for tick in ticks if (tick.company_id, tick.timestamp) not in existing]
+
+    PriceTick.objects.bulk_create(ticks, batch_size=1000, ignore_conflicts=True)
+    bars = rollup_ticks(ticks)
+    logger.info(f"Recorded {len(ticks)} price ticks and updated {bars} bars")
+    return len(ticks)
+
+
+def get_price_history(company, start, end, resolution=PriceBar.RESOLUTION_DAY):
+    """
+    Return price history for a company between start and end.
+    Bar resolutions read pre-aggregated buckets; 'raw' reads the ticks.
+    """
+    if resolution == 'raw':
+        return [
+            {'timestamp': tick.timestamp, 'price': tick.price}
+            for tick in PriceTick.objects.filter(
+                company=company, timestamp__gte=start, timestamp__lt=end
+            )
+        ]
+
+    bars = PriceBar.objects.filter(
+        company=company,
+        resolution=resolution,
+        bucket_start__gte=bucket_start(start, resolution),
+        bucket_start__lt=end
+    )
+    return [
+        {
+            'timestamp': bar.bucket_start,
+            'open': bar.open,
+            'high': bar.high,
+            'low': bar.low,
+            'close': bar.close,
+            'ticks': bar.tick_count,
+        }
+        for bar in bars
+    ]
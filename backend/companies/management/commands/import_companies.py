@@ -0,0 +1,28 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from companies.catalog import DEFAULT_CHUNK_SIZE, import_catalog
+
+
+class Command(BaseCommand):
+    help = 'Seed or refresh the company catalog from a CSV file (defaults to data_companies.csv)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=str(Path(settings.BASE_DIR) / 'data_companies.csv'))
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per upsert statement')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"Catalog file not found: {path}")
+
+        try:
+            with open(path, newline='', encoding='utf-8') as handle:
+                result = import_catalog(handle, chunk_size=options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {result.inserted}, updated {result.updated}, unchanged {result.unchanged}, "
+            f"skipped {result.skipped} in {result.elapsed_ms} ms"
+        ))
@@ -0,0 +1,53 @@
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0008_update_price_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceBar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('1h', 'Hourly'), ('1d', 'Daily')], max_length=2, verbose_name='Resolution')),
+                ('bucket_start', models.DateTimeField(verbose_name='Bucket Start')),
+                ('open', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='Open')),
+                ('high', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='High')),
+                ('low', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='Low')),
+                ('close', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='Close')),
+                ('tick_count', models.PositiveIntegerField(default=0, verbose_name='Tick Count')),
+                ('first_tick_at', models.DateTimeField(verbose_name='First Tick At')),
+                ('last_tick_at', models.DateTimeField(verbose_name='Last Tick At')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_bars', to='companies.company', verbose_name='Company')),
+            ],
+            options={
+                'verbose_name': 'Price Bar',
+                'verbose_name_plural': 'Price Bars',
+                'db_table': 'company_price_bars',
+                'ordering': ['bucket_start'],
+                'unique_together': {('company', 'resolution', 'bucket_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceTick',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(verbose_name='Timestamp')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='Price')),
+                ('company', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='price_ticks', to='companies.company', verbose_name='Company')),
+            ],
+            options={
+                'verbose_name': 'Price Tick',
+                'verbose_name_plural': 'Price Ticks',
+                'db_table': 'company_price_ticks',
+                'ordering': ['timestamp'],
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='price_tick_ts_brin')],
+                'constraints': [models.UniqueConstraint(fields=('company', 'timestamp'), name='price_tick_company_ts_uniq')],
+            },
+        ),
+    ]
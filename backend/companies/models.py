@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from accounts.models import CustomUser
@@ -33,12 +35,24 @@ class Company(models.Model):
     is_active = models.BooleanField(default=True, verbose_name=_('Is Active'))
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by Postgres on every write, including bulk imports
+    search_vector = models.GeneratedField(
+        expression=SearchVector('symbol', 'name', weight='A', config='english'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name=_('Search Vector')
+    )
 
     class Meta:
         db_table = 'companies'
         verbose_name = _('Company')
         verbose_name_plural = _('Companies')
         ordering = ['name']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='companies_search_gin'),
+            # Trigram index for typo-tolerant symbol lookup (symbol % 'APPL')
+            GinIndex(fields=['symbol'], name='companies_symbol_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.symbol})"
@@ -53,3 +67,74 @@ class Company(models.Model):
             self.price_change = ((self.current_price - self.initial_price) / self.initial_price) * 100
             
         super().save(*args, **kwargs)
+
+
+class PriceTick(models.Model):
+    """
+    Append-only record of every price applied to a company.
+    Rows arrive in timestamp order, so the BRIN index keeps each day's ticks
+    physically clustered and range scans cheap without a large btree.
+    """
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='price_ticks',
+        db_index=False,
+        verbose_name=_('Company')
+    )
+    timestamp = models.DateTimeField(verbose_name=_('Timestamp'))
+    price = models.DecimalField(max_digits=20, decimal_places=2, verbose_name=_('Price'))
+
+    class Meta:
+        db_table = 'company_price_ticks'
+        verbose_name = _('Price Tick')
+        verbose_name_plural = _('Price Ticks')
+        ordering = ['timestamp']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'timestamp'], name='price_tick_company_ts_uniq'),
+        ]
+        indexes = [
+            BrinIndex(fields=['timestamp'], name='price_tick_ts_brin'),
+        ]
+
+    def __str__(self):
+        return f"{self.company_id} @ {self.timestamp}: {self.price}"
+
+
+class PriceBar(models.Model):
+    """
+    OHLC rollup of price ticks for a company over an hourly or daily bucket.
+    Bars are maintained incrementally after each ingest.
+    """
+    RESOLUTION_HOUR = '1h'
+    RESOLUTION_DAY = '1d'
+    RESOLUTION_CHOICES = [
+        (RESOLUTION_HOUR, _('Hourly')),
+        (RESOLUTION_DAY, _('Daily')),
+    ]
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='price_bars',
+        verbose_name=_('Company')
+    )
+    resolution = models.CharField(max_length=2, choices=RESOLUTION_CHOICES, verbose_name=_('Resolution'))
+    bucket_start = models.DateTimeField(verbose_name=_('Bucket Start'))
+    open = models.DecimalField(max_digits=20, decimal_places=2, verbose_name=_('Open'))
+    high = models.DecimalField(max_digits=20, decimal_places=2, verbose_name=_('High'))
+    low = models.DecimalField(max_digits=20, decimal_places=2, verbose_name=_('Low'))
+    close = models.DecimalField(max_digits=20, decimal_places=2, verbose_name=_('Close'))
+    tick_count = models.PositiveIntegerField(default=0, verbose_name=_('Tick Count'))
+    first_tick_at = models.DateTimeField(verbose_name=_('First Tick At'))
+    last_tick_at = models.DateTimeField(verbose_name=_('Last Tick At'))
+
+    class Meta:
+        db_table = 'company_price_bars'
+        verbose_name = _('Price Bar')
+        verbose_name_plural = _('Price Bars')
+        ordering = ['bucket_start']
+        unique_together = ['company', 'resolution', 'bucket_start']
+
+    def __str__(self):
+        return f"{self.company_id} {self.resolution} {self.bucket_start}"
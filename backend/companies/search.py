@@ -0,0 +1,81 @@
+import re
+from contextlib import contextmanager
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+SEARCH_CONFIG = 'english'
+
+# Below pg_trgm's default of 0.3: one transposed letter in a 4-letter
+# ticker (APPL for AAPL, MSTF for MSFT) scores 0.25
+SYMBOL_SIMILARITY_THRESHOLD = 0.2
+
+
+@contextmanager
+def symbol_similarity_threshold(using=DEFAULT_DB_ALIAS):
+    """
+    Transaction in which the pg_trgm % operator behind symbol__trigram_similar
+    matches at SYMBOL_SIMILARITY_THRESHOLD. Search querysets must be evaluated
+    inside it; outside, % falls back to the session's 0.3.
+    """
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # set_config(..., true) is SET LOCAL that takes a parameter
+                cursor.execute(
+                    "SELECT set_config('pg_trgm.similarity_threshold', %s, true)",
+                    [str(SYMBOL_SIMILARITY_THRESHOLD)]
+                )
+        yield
+
+
+def build_search_query(term):
+    """
+    Prefix tsquery requiring every word of term, so partial input like
+    'gold sach' finds 'Goldman Sachs'. Returns None when term has no words.
+    """
+    words = re.findall(r'\w+', term or '')
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_companies(queryset, term, ranked=True):
+    """
+    Filter companies by full-text match on name and symbol, or by a symbol
+    trigram-similar to term, so a mistyped ticker like 'APPL' still finds
+    'AAPL'. Both conditions are served by their GIN indexes; evaluate the
+    result inside symbol_similarity_threshold(). When ranked, results are
+    ordered by relevance with an exact symbol match first.
+    """
+    term = term.strip()
+    query = build_search_query(term)
+    matches = Q(symbol__trigram_similar=term)
+    if query is not None:
+        matches |= Q(search_vector=query)
+    queryset = queryset.filter(matches)
+    if not ranked:
+        return queryset
+
+    # Similarity is only computed for ranking, on the rows the indexes found
+    similarity = TrigramSimilarity('symbol', term)
+    relevance = Greatest(SearchRank(F('search_vector'), query), similarity) if query is not None else similarity
+    exact = Case(When(symbol=term.upper(), then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+    return queryset.annotate(search_rank=relevance + exact).order_by('-search_rank', 'name')
+
+
+class CompanySearchFilter(filters.SearchFilter):
+    """
+    Full-text replacement for SearchFilter on ?search=. Results keep the
+    requested ?ordering when one is given, otherwise they come by relevance.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = ' '.join(self.get_search_terms(request))
+        if not term:
+            return queryset
+        ordering_param = getattr(view, 'ordering_param', None) or filters.OrderingFilter.ordering_param
+        return search_companies(queryset, term, ranked=not request.query_params.get(ordering_param))
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent after bulk writes that bypass Company.save() (catalog imports).
+# Arguments: company_ids (set of IDs of the existing companies that changed).
+companies_changed = Signal()
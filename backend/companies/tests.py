@@ -0,0 +1,44 @@
+import unittest
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import CustomUser
+from .models import Company
+from .search import search_companies, symbol_similarity_threshold
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Search uses PostgreSQL full-text and pg_trgm')
+class CompanySearchTests(TestCase):
+    """Typo-tolerant company search on /companies/companies/search/"""
+
+    def setUp(self):
+        for symbol, name in [('AAPL', 'Apple Inc.'), ('MSFT', 'Microsoft Corporation'),
+                             ('TSLA', 'Tesla Inc.'), ('GS', 'Goldman Sachs Group')]:
+            Company.objects.create(symbol=symbol, name=name, current_price=Decimal('10.00'))
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user('user', 'user@example.com', 'password'))
+
+    def search(self, term):
+        response = self.client.get('/companies/companies/search/', {'q': term})
+        self.assertEqual(response.status_code, 200)
+        return [company['symbol'] for company in response.data]
+
+    def test_transposed_ticker_finds_the_company(self):
+        # Neither name stems to these terms, so only the symbol trigrams can match
+        self.assertEqual(self.search('MSTF')[:1], ['MSFT'])
+        self.assertEqual(self.search('TSAL')[:1], ['TSLA'])
+
+    def test_exact_symbol_ranks_first(self):
+        self.assertEqual(self.search('GS')[:1], ['GS'])
+
+    def test_name_prefix_matches(self):
+        self.assertEqual(self.search('gold sach'), ['GS'])
+
+    def test_filter_is_served_by_both_gin_indexes(self):
+        with symbol_similarity_threshold(), connection.cursor() as cursor:
+            # Four rows are cheaper to scan; this asks whether the indexes can serve the filter
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = search_companies(Company.objects.defer('search_vector'), 'gold sach').explain()
+        self.assertIn('Bitmap Index Scan on companies_search_gin', plan)
+        self.assertIn('Bitmap Index Scan on companies_symbol_trgm', plan)
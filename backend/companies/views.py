@@ -1,20 +1,33 @@
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Sum
-from .models import Company
+from rest_framework.permissions import IsAdminUser
+from django.db.models import ProtectedError, Sum
+from django.utils import timezone
+from datetime import timedelta
+from .models import Company, PriceBar
 from .serializers import CompanySerializer
+from .history import get_price_history, parse_history_bound
+from .catalog import import_catalog
+from .search import CompanySearchFilter, search_companies, symbol_similarity_threshold
+from django.conf import settings
+from pathlib import Path
+import io
 import logging
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 logger = logging.getLogger(__name__)
 
+HISTORY_RESOLUTIONS = [PriceBar.RESOLUTION_HOUR, PriceBar.RESOLUTION_DAY, 'raw']
+
+
 class CompanyViewSet(viewsets.ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
     permission_classes = [permissions.IsAuthenticated]
     authentication_classes = [JWTAuthentication]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    # Search runs last so it can order by relevance unless ?ordering is given
+    filter_backends = [filters.OrderingFilter, CompanySearchFilter]
     search_fields = ['name', 'symbol']
     ordering_fields = ['name', 'symbol', 'current_price', 'market_cap']
     ordering = ['name']
@@ -39,9 +52,24 @@ class CompanyViewSet(viewsets.ModelViewSet):
             
         return super().initial(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get(CompanySearchFilter.search_param):
+            return super().list(request, *args, **kwargs)
+        # ?search= filters with the trigram % operator, which needs its threshold
+        with symbol_similarity_threshold():
+            return super().list(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response({
+                'error': 'Company is a constituent of a recorded index version and cannot be deleted'
+            }, status=status.HTTP_409_CONFLICT)
+
     def get_queryset(self):
         logger.debug(f"User in request: {self.request.user}")
-        queryset = Company.objects.all()
+        queryset = Company.objects.defer('search_vector')
         
         # Filter by active status
         is_active = self.request.query_params.get('is_active', None)
@@ -72,13 +100,10 @@ class CompanyViewSet(viewsets.ModelViewSet):
         if not query:
             return Response([])
 
-        companies = Company.objects.filter(
-            Q(name__icontains=query) | 
-            Q(symbol__icontains=query)
-        )[:10]
-        
-        serializer = self.get_serializer(companies, many=True)
-        return Response(serializer.data)
+        with symbol_similarity_threshold():
+            companies = search_companies(Company.objects.defer('search_vector'), query)[:10]
+            serializer = self.get_serializer(companies, many=True)
+            return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -96,3 +121,60 @@ class CompanyViewSet(viewsets.ModelViewSet):
             'total_market_cap': total_market_cap,
             'average_market_cap': total_market_cap / total_companies if total_companies > 0 else 0
         })
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def import_catalog(self, request):
+        """
+        Upsert the company catalog from an uploaded CSV ('file') or, when no
+        file is sent, from the bundled data_companies.csv.
+        """
+        try:
+            upload = request.FILES.get('file')
+            if upload:
+                handle = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+                result = import_catalog(handle)
+            else:
+                with open(Path(settings.BASE_DIR) / 'data_companies.csv', newline='', encoding='utf-8') as handle:
+                    result = import_catalog(handle)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'status': 'success',
+            **result.as_dict()
+        })
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """
+        Get price history for a company.
+        Query params: from, to (ISO date or datetime) and resolution (1h, 1d or raw).
+        """
+        company = self.get_object()
+        resolution = request.query_params.get('resolution', PriceBar.RESOLUTION_DAY)
+        if resolution not in HISTORY_RESOLUTIONS:
+            return Response(
+                {'error': f'resolution must be one of {", ".join(HISTORY_RESOLUTIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            end = parse_history_bound(request.query_params['to']) if 'to' in request.query_params else timezone.now()
+            start = parse_history_bound(request.query_params['from']) if 'from' in request.query_params else end - timedelta(days=30)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if start >= end:
+            return Response(
+                {'error': 'from must be before to'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'company_id': company.id,
+            'symbol': company.symbol,
+            'resolution': resolution,
+            'from': start,
+            'to': end,
+            'data': get_price_history(company, start, end, resolution)
+        })
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Index
+from .models import Index, IndexConstituent, IndexTransition, IndexVersion, PlatformCounter
 from django.db import models
 
 @admin.register(Index)
@@ -75,3 +75,41 @@ class IndexAdmin(admin.ModelAdmin):
     def save_related(self, request, form, formsets, change):
         """Handle related fields after the model has been saved"""
         super().save_related(request, form, formsets, change)
+
+
+@admin.register(PlatformCounter)
+class PlatformCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value', 'updated_at', 'reconciled_at']
+    readonly_fields = ['updated_at', 'reconciled_at']
+
+
+class IndexConstituentInline(admin.TabularInline):
+    model = IndexConstituent
+    fields = ['rank', 'company', 'vote_weight', 'vote_count', 'target_weight', 'selected']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(IndexVersion)
+class IndexVersionAdmin(admin.ModelAdmin):
+    list_display = ['index', 'version', 'universe_size', 'selected_count', 'total_vote_weight', 'created_at']
+    list_filter = ['index']
+    readonly_fields = ['index', 'version', 'universe_size', 'selected_count', 'total_vote_weight', 'created_at']
+    inlines = [IndexConstituentInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(IndexTransition)
+class IndexTransitionAdmin(admin.ModelAdmin):
+    list_display = ['index', 'transition', 'due_at', 'job', 'created_at']
+    list_filter = ['transition']
+    readonly_fields = ['index', 'transition', 'due_at', 'job', 'created_at']
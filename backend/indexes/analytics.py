@@ -0,0 +1,202 @@
+import logging
+import time
+from datetime import date, timedelta
+import numpy as np
+from django.conf import settings
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from companies.history import bucket_start
+from companies.models import Company, PriceBar
+from .models import IndexConstituent
+
+logger = logging.getLogger(__name__)
+
+# Look-back windows in calendar days
+ANALYTICS_WINDOWS = {'1m': 30, '3m': 91, '6m': 182, '1y': 365, '3y': 1095}
+DEFAULT_WINDOW = '1y'
+TRADING_DAYS = 252
+SECONDS_PER_DAY = 86400
+EPOCH = date(1970, 1, 1)
+
+
+def basket_weights(index):
+    """
+    Constituent IDs (sorted) and weights summing to 1: the target weights of
+    the current version for an executed index, equal weights otherwise.
+    """
+    if index.current_version_id:
+        rows = list(IndexConstituent.objects.filter(
+            version_id=index.current_version_id, selected=True
+        ).values_list('company_id', 'target_weight'))
+    else:
+        rows = [(company_id, 1) for company_id in index.companies.values_list('id', flat=True)]
+    rows.sort()
+    company_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    weights = np.array([float(row[1]) for row in rows], dtype=np.float64)
+    if weights.sum() > 0:
+        weights /= weights.sum()
+    return company_ids, weights
+
+
+def load_closes(company_ids, start, end):
+    """
+    Daily closes of the companies between start and end as a (days x
+    companies) array, from one query. Gaps are forward-filled; cells before
+    a company's first bar stay NaN. Returns (UTC day numbers, closes).
+    """
+    rows = list(PriceBar.objects.filter(
+        resolution=PriceBar.RESOLUTION_DAY,
+        company_id__in=company_ids.tolist(),
+        bucket_start__gte=bucket_start(start, PriceBar.RESOLUTION_DAY),
+        bucket_start__lt=end
+    ).annotate(
+        close_value=Cast('close', FloatField())
+    ).values_list('company_id', 'bucket_start', 'close_value'))
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(company_ids)), dtype=np.float64)
+
+    count = len(rows)
+    companies = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+    seconds = np.fromiter((row[1].timestamp() for row in rows), dtype=np.float64, count=count)
+    values = np.fromiter((row[2] for row in rows), dtype=np.float64, count=count)
+
+    days, day_rows = np.unique((seconds // SECONDS_PER_DAY).astype(np.int64), return_inverse=True)
+    closes = np.full((len(days), len(company_ids)), np.nan, dtype=np.float64)
+    closes[day_rows, np.searchsorted(company_ids, companies)] = values
+
+    # Forward-fill: every cell takes the row of the latest close at or above it
+    filled_rows = np.where(np.isnan(closes), 0, np.arange(len(days))[:, None])
+    np.maximum.accumulate(filled_rows, axis=0, out=filled_rows)
+    return days, closes[filled_rows, np.arange(len(company_ids))]
+
+
+def performance(days, closes, weights, risk_free_rate=0.0):
+    """
+    Risk and return of a buy-and-hold basket over the closes matrix.
+    Columns must have at least one close; companies first priced inside the
+    window are held flat at that close until then. Contributions of the
+    constituents add up to the cumulative return.
+    """
+    columns = np.arange(closes.shape[1])
+    first_rows = np.argmax(~np.isnan(closes), axis=0)
+    base = closes[first_rows, columns]
+    relative = np.where(np.isnan(closes), 1.0, closes / base)
+
+    # Value of one unit invested at the start of the window
+    values = relative @ weights
+    returns = values[1:] / values[:-1] - 1.0
+
+    cumulative = values[-1] - 1.0
+    years = (days[-1] - days[0]) / 365.0
+    annualized_return = values[-1] ** (1.0 / years) - 1.0 if years > 0 and values[-1] > 0 else None
+    volatility = float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS)) if len(returns) > 1 else None
+
+    drawdowns = values / np.maximum.accumulate(values) - 1.0
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(values[:trough + 1]))
+
+    sharpe = None
+    if volatility:
+        sharpe = (float(returns.mean()) * TRADING_DAYS - risk_free_rate) / volatility
+
+    return {
+        'values': values,
+        'cumulative_return': float(cumulative),
+        'annualized_return': float(annualized_return) if annualized_return is not None else None,
+        'annualized_volatility': volatility,
+        'max_drawdown': float(drawdowns[trough]),
+        'drawdown_peak': peak,
+        'drawdown_trough': trough,
+        'sharpe_ratio': sharpe,
+        'constituent_returns': relative[-1] - 1.0,
+        'contributions': weights * (relative[-1] - 1.0),
+    }
+
+
+def _round(value, digits=6):
+    return None if value is None else round(float(value), digits)
+
+
+def _day(day_number):
+    return EPOCH + timedelta(days=int(day_number))
+
+
+def compute_index_analytics(index, window=DEFAULT_WINDOW, now=None):
+    """
+    Cumulative and annualized return, annualized volatility, maximum
+    drawdown, Sharpe ratio and per-constituent contribution of an index
+    over a look-back window of daily bars.
+    """
+    started = time.perf_counter()
+    end = now or timezone.now()
+    start = end - timedelta(days=ANALYTICS_WINDOWS[window])
+    timings = {}
+
+    phase_started = time.perf_counter()
+    company_ids, weights = basket_weights(index)
+    days, closes = load_closes(company_ids, start, end)
+    timings['load'] = round((time.perf_counter() - phase_started) * 1000, 2)
+
+    result = {
+        'index_id': index.id,
+        'window': window,
+        'from': start,
+        'to': end,
+        'weighting': 'target' if index.current_version_id else 'equal',
+        'constituents': len(company_ids),
+    }
+
+    # Constituents without any bar in the window are left out and the rest reweighted
+    priced = ~np.isnan(closes).all(axis=0) if len(days) else np.zeros(len(company_ids), dtype=bool)
+    result['priced_constituents'] = int(priced.sum())
+    if len(days) < 2 or not priced.any():
+        result['error'] = 'Not enough price history in this window'
+        result['timings_ms'] = timings
+        return result
+
+    phase_started = time.perf_counter()
+    weights = weights[priced] / weights[priced].sum()
+    stats = performance(days, closes[:, priced], weights, settings.ANALYTICS_RISK_FREE_RATE)
+    timings['compute'] = round((time.perf_counter() - phase_started) * 1000, 2)
+
+    names = {
+        company_id: (symbol, name)
+        for company_id, symbol, name in Company.objects.filter(
+            id__in=company_ids[priced].tolist()
+        ).values_list('id', 'symbol', 'name')
+    }
+    contributions = [
+        {
+            'company_id': int(company_id),
+            'symbol': names.get(company_id, ('', ''))[0],
+            'name': names.get(company_id, ('', ''))[1],
+            'weight': _round(weight),
+            'return': _round(constituent_return),
+            'contribution': _round(contribution),
+        }
+        for company_id, weight, constituent_return, contribution in zip(
+            company_ids[priced].tolist(), weights, stats['constituent_returns'], stats['contributions']
+        )
+    ]
+    contributions.sort(key=lambda item: item['contribution'], reverse=True)
+
+    result.update({
+        'first_day': _day(days[0]),
+        'last_day': _day(days[-1]),
+        'days': len(days),
+        'cumulative_return': _round(stats['cumulative_return']),
+        'annualized_return': _round(stats['annualized_return']),
+        'annualized_volatility': _round(stats['annualized_volatility']),
+        'max_drawdown': {
+            'value': _round(stats['max_drawdown']),
+            'peak': _day(days[stats['drawdown_peak']]),
+            'trough': _day(days[stats['drawdown_trough']]),
+        },
+        'sharpe_ratio': _round(stats['sharpe_ratio']),
+        'risk_free_rate': settings.ANALYTICS_RISK_FREE_RATE,
+        'contributions': contributions,
+    })
+    timings['total'] = round((time.perf_counter() - started) * 1000, 2)
+    result['timings_ms'] = timings
+    return result
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class IndexesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'indexes'
+
+    def ready(self):
+        import indexes.signals  # Import signals to connect them
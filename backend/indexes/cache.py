@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'indexes'
+
+# Version keys; bumping a version orphans every response cached under it
+LIST_VERSION = f'{PREFIX}:list:version'
+PRICES_VERSION = f'{PREFIX}:prices:version'
+STATS_VERSION = f'{PREFIX}:stats:version'
+
+METRIC_KEYS = ['hits', 'misses', 'invalidations', 'rebuilds', 'rebuild_us']
+
+# Rebuild latencies seen by this process, for percentiles
+_recent_rebuilds = deque(maxlen=1000)
+_recent_lock = threading.Lock()
+
+
+def _detail_version_key(index_id):
+    return f'{PREFIX}:detail:{index_id}:version'
+
+
+def _stats_version_key(index_id):
+    return f'{PREFIX}:stats:{index_id}:version'
+
+
+def _new_version():
+    # Clock-based so a version evicted from the cache never restarts at a value already used
+    return int(time.time() * 1000)
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key) or _new_version()
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def _count(metric, delta=1):
+    key = f'{PREFIX}:metrics:{metric}'
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            pass
+
+
+def normalize_params(query_params):
+    """Stable hash of the query string: sorted keys and values, paging included"""
+    items = sorted((key, value) for key in query_params for value in query_params.getlist(key))
+    return hashlib.md5(urlencode(items).encode()).hexdigest()
+
+
+def list_key(request):
+    return f'{PREFIX}:list:{_get_version(LIST_VERSION)}:{normalize_params(request.query_params)}'
+
+
+def detail_key(request, index_id):
+    return (
+        f'{PREFIX}:detail:{index_id}:{_get_version(_detail_version_key(index_id))}:'
+        f'{_get_version(PRICES_VERSION)}:{normalize_params(request.query_params)}'
+    )
+
+
+def stats_key(index_id):
+    # Only constituent changes and price refreshes of its companies bump it
+    return (
+        f'{PREFIX}:stats:{index_id}:{_get_version(_stats_version_key(index_id))}:'
+        f'{_get_version(STATS_VERSION)}'
+    )
+
+
+def analytics_key(index_id, window):
+    # Same versions as the statistics: constituents and their prices
+    return (
+        f'{PREFIX}:analytics:{index_id}:{window}:{_get_version(_stats_version_key(index_id))}:'
+        f'{_get_version(STATS_VERSION)}'
+    )
+
+
+def cached_response(key, build):
+    """
+    Return the cached response data for key, or call build() to produce a
+    Response and cache its data when it is a 200.
+    """
+    data = cache.get(key)
+    if data is not None:
+        _count('hits')
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _count('misses')
+    started = time.perf_counter()
+    response = build()
+    elapsed_us = int((time.perf_counter() - started) * 1_000_000)
+    if response.status_code == 200:
+        cache.set(key, response.data, timeout=settings.INDEX_CACHE_TIMEOUT)
+        _count('rebuilds')
+        _count('rebuild_us', elapsed_us)
+        with _recent_lock:
+            _recent_rebuilds.append(elapsed_us / 1000)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def invalidate_list():
+    _bump(LIST_VERSION)
+    _count('invalidations')
+
+
+def invalidate_index(index_id):
+    """Drop the cached detail of one index and every cached listing"""
+    _bump(_detail_version_key(index_id))
+    invalidate_list()
+
+
+def invalidate_details(index_ids):
+    """Drop the cached detail of the given indexes, which embeds their companies"""
+    for index_id in index_ids:
+        _bump(_detail_version_key(index_id))
+    _count('invalidations')
+
+
+def invalidate_prices():
+    """Company prices are embedded in detail responses only"""
+    _bump(PRICES_VERSION)
+    _count('invalidations')
+
+
+def invalidate_stats(index_ids=None):
+    """Drop the cached constituent statistics of the given indexes (None: of all)"""
+    if index_ids is None:
+        _bump(STATS_VERSION)
+    else:
+        for index_id in index_ids:
+            _bump(_stats_version_key(index_id))
+    _count('invalidations')
+
+
+def invalidate_all():
+    _bump(LIST_VERSION)
+    _bump(PRICES_VERSION)
+    _bump(STATS_VERSION)
+    _count('invalidations')
+
+
+def get_metrics():
+    counters = cache.get_many([f'{PREFIX}:metrics:{metric}' for metric in METRIC_KEYS])
+    values = {metric: counters.get(f'{PREFIX}:metrics:{metric}', 0) for metric in METRIC_KEYS}
+    lookups = values['hits'] + values['misses']
+    with _recent_lock:
+        recent = sorted(_recent_rebuilds)
+
+    def pick(fraction):
+        return round(recent[min(int(fraction * len(recent)), len(recent) - 1)], 2) if recent else None
+
+    return {
+        'hits': values['hits'],
+        'misses': values['misses'],
+        'hit_rate': round(values['hits'] / lookups, 4) if lookups else None,
+        'invalidations': values['invalidations'],
+        'rebuilds': values['rebuilds'],
+        'rebuild_ms_avg': round(values['rebuild_us'] / values['rebuilds'] / 1000, 2) if values['rebuilds'] else None,
+        'rebuild_ms_p50': pick(0.5),
+        'rebuild_ms_p95': pick(0.95),
+        'timeout': settings.INDEX_CACHE_TIMEOUT,
+    }
@@ -0,0 +1,107 @@
+import logging
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from accounts.models import CustomUser
+from investments.models import Investment
+from .models import Index, PlatformCounter
+
+logger = logging.getLogger(__name__)
+
+INDEXES = 'indexes'
+INVESTMENTS = 'investments'
+USERS = 'users'
+
+# Tables large enough that planner statistics are worth using instead
+APPROXIMATE_TABLES = {
+    INVESTMENTS: Investment,
+    USERS: CustomUser,
+}
+
+
+def index_status_counter(status):
+    return f'{INDEXES}:{status}'
+
+
+def counter_names():
+    return [INDEXES, INVESTMENTS, USERS] + [
+        index_status_counter(status) for status, label in Index.STATUS_CHOICES
+    ]
+
+
+def adjust(changes):
+    """
+    Apply {counter name: delta} in the caller's transaction, so a rolled
+    back write never moves a counter. Counters that were never reconciled
+    are left alone; the first read counts them.
+    """
+    for name, delta in changes.items():
+        if delta:
+            PlatformCounter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def count_exact():
+    """Exact values of every counter, from the tables themselves"""
+    values = {name: 0 for name in counter_names()}
+    for status, total in Index.objects.order_by().values_list('status').annotate(total=Count('pk')):
+        values[index_status_counter(status)] = total
+        values[INDEXES] += total
+    values[INVESTMENTS] = Investment.objects.count()
+    values[USERS] = CustomUser.objects.count()
+    return values
+
+
+def reconcile_counters():
+    """
+    Recount every counter and overwrite the stored values.
+    Returns the drift found, {counter name: exact - stored}.
+    """
+    with transaction.atomic():
+        # Lock the stored counters so increments wait for the recount
+        stored = dict(PlatformCounter.objects.select_for_update().values_list('name', 'value'))
+        exact = count_exact()
+        now = timezone.now()
+        for name, value in exact.items():
+            PlatformCounter.objects.update_or_create(
+                name=name, defaults={'value': value, 'reconciled_at': now}
+            )
+
+    drift = {name: value - stored.get(name, 0) for name, value in exact.items() if value != stored.get(name, 0)}
+    if drift:
+        logger.warning(f"Reconciled platform counters, drift: {drift}")
+    else:
+        logger.info("Reconciled platform counters, no drift")
+    return drift
+
+
+def approximate_counts(names):
+    """
+    Row estimates of large tables from Postgres planner statistics
+    (pg_class.reltuples), refreshed by ANALYZE/autovacuum. Tables that were
+    never analysed, and other databases, are left out.
+    """
+    tables = {APPROXIMATE_TABLES[name]._meta.db_table: name for name in names if name in APPROXIMATE_TABLES}
+    if connection.vendor != 'postgresql' or not tables:
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relname = ANY(%s)",
+            [list(tables)]
+        )
+        return {tables[relname]: int(reltuples) for relname, reltuples in cursor.fetchall() if reltuples >= 0}
+
+
+def read_counters(approximate=False):
+    """
+    Current counter values in one indexed read. Missing counters (a fresh
+    database) are reconciled first; approximate swaps the large table
+    totals for planner estimates.
+    """
+    names = counter_names()
+    values = dict(PlatformCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    if len(values) < len(names):
+        reconcile_counters()
+        values = dict(PlatformCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    if approximate:
+        values.update(approximate_counts(names))
+    return values
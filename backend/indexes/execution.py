@@ -0,0 +1,277 @@
+import logging
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from companies.models import Company
+from investments.models import Investment, InvestmentPosition
+from voting.analytics import basket_size, get_vote_distribution
+from voting.models import CompanyVoteCount
+from .lifecycle import LifecycleError
+from .models import Index
+from .versions import record_version
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+QUANTITY_STEP = Decimal('0.00000001')
+DEFAULT_PRICE = Decimal('1.0')
+
+
+class ExecutionError(LifecycleError):
+    """The index cannot be executed in its current state"""
+
+
+def quantize(value, step=CENT):
+    # Matches the rounding Postgres applies when storing numeric columns
+    return value.quantize(step, rounding=ROUND_HALF_UP)
+
+
+class ExecutionPlan:
+    """
+    Outcome of the voting analysis for one index: the companies that make
+    the final basket and the equal weight every investment gets in each.
+    """
+
+    def __init__(self, index, min_companies, max_companies, mode_votes, num_companies,
+                 vote_distribution, companies):
+        self.index = index
+        self.min_companies = min_companies
+        self.max_companies = max_companies
+        self.mode_votes = mode_votes
+        self.num_companies = num_companies
+        self.vote_distribution = vote_distribution
+        self.companies = companies
+        self.weight = Decimal('100.0') / Decimal(len(companies))
+        # Investments of the same amount get the same allocation
+        self._allocations = {}
+
+    def allocate(self, amount):
+        """
+        Positions of an investment of `amount` as (company, amount, quantity,
+        price) tuples, plus the value those positions are worth now.
+        """
+        if amount in self._allocations:
+            return self._allocations[amount]
+        allocations = []
+        total_value = Decimal('0')
+        for company in self.companies:
+            allocated = (amount * self.weight) / Decimal('100.0')
+            quantity = Decimal('0')
+            if company.current_price and company.current_price > 0:
+                quantity = allocated / company.current_price
+            price = company.current_price or DEFAULT_PRICE
+            allocations.append((company, allocated, quantity, price))
+            total_value += quantize(quantity, QUANTITY_STEP) * price
+        self._allocations[amount] = (allocations, total_value)
+        return allocations, total_value
+
+    def valued_investment(self, investment_id, amount, now):
+        """The ACTIVE investment with the values update_current_value would store"""
+        allocations, total_value = self.allocate(amount)
+        investment = Investment(pk=investment_id, amount=amount, status='ACTIVE', last_updated=now)
+        investment.current_value = total_value if total_value > 0 else amount
+        investment.calculate_profit_loss()
+        investment.current_value = quantize(investment.current_value)
+        investment.profit_loss = quantize(investment.profit_loss)
+        investment.profit_loss_percentage = quantize(investment.profit_loss_percentage)
+        return investment
+
+    def analysis(self):
+        return {
+            'min_votes_per_user': self.min_companies,
+            'max_votes_per_user': self.max_companies,
+            'most_common_votes_per_user': self.mode_votes,
+            'final_selected_count': self.num_companies,
+            'vote_distribution': self.vote_distribution
+        }
+
+
+def plan_execution(index, company_ids=None):
+    """
+    Analyse the votes of an index and choose its final companies.
+    company_ids pins the selection made by an earlier, interrupted attempt.
+    Raises ExecutionError when the index is not ready to execute.
+    """
+    if index.status != 'VOTING':
+        raise ExecutionError(f'Index must be in voting status to execute. Current status: {index.status}')
+
+    company_votes = CompanyVoteCount.objects.filter(index=index).order_by('-total_weight')
+    total_companies_with_votes = company_votes.count()
+    if not total_companies_with_votes:
+        raise ExecutionError('No votes have been cast for this index')
+
+    # The basket size is bounded by the votes each user may cast
+    min_companies = index.min_votes_per_user
+    max_companies = index.max_votes_per_user
+    if total_companies_with_votes < min_companies:
+        raise ExecutionError(f'Not enough companies received votes. Need at least {min_companies} companies.')
+
+    # Prefer the most common voting pattern, within [min, max]
+    vote_distribution = get_vote_distribution(index)
+    mode_votes, num_companies = basket_size(index, vote_distribution, total_companies_with_votes)
+
+    if company_ids is None:
+        company_ids = list(company_votes[:num_companies].values_list('company', flat=True))
+    companies = list(Company.objects.filter(id__in=company_ids))
+    if not companies:
+        raise ExecutionError('Failed to determine top companies')
+
+    return ExecutionPlan(index, min_companies, max_companies, mode_votes, num_companies,
+                         vote_distribution, companies)
+
+
+class IndexExecutor:
+    """
+    Executes a voted index as a handful of set-based statements per chunk.
+
+    The plan (voting analysis and final companies) is computed once for the
+    index. The VOTED investments are then processed in chunks of about
+    batch_size positions, each in its own short transaction: the chunk is
+    locked, its old positions are removed with one DELETE, the new ones are
+    inserted with bulk_create and the investments move to ACTIVE with
+    bulk_update. A last transaction records the constituent version and
+    switches the index to EXECUTED.
+
+    Only investments still VOTED are picked up, so an interrupted execution
+    resumes where it stopped when run again with the same company_ids. A
+    dry run stops after the allocation and writes nothing.
+    """
+
+    def __init__(self, index, batch_size=None, progress=None):
+        self.index = index
+        self.batch_size = batch_size or settings.EXECUTION_BATCH_SIZE
+        # Called as progress(processed, total) after every committed chunk
+        self.progress = progress
+        self.timings = {}
+
+    def _timed(self, phase, started):
+        self.timings[phase] = round(self.timings.get(phase, 0) + (time.perf_counter() - started) * 1000, 2)
+
+    def build(self, plan, investments, now):
+        """New positions and investment updates for (id, amount) pairs"""
+        positions = []
+        updates = []
+        for investment_id, amount in investments:
+            allocations = plan.allocate(amount)[0]
+            positions.extend(
+                InvestmentPosition(
+                    investment_id=investment_id,
+                    company_id=company.id,
+                    amount=allocated,
+                    quantity=quantity,
+                    purchase_price=price,
+                    current_price=price,
+                    weight=plan.weight
+                )
+                for company, allocated, quantity, price in allocations
+            )
+            updates.append(plan.valued_investment(investment_id, amount, now))
+        return positions, updates
+
+    def execute_chunk(self, plan, investment_ids, now):
+        """Reallocate one chunk of investments in a single transaction"""
+        with transaction.atomic():
+            phase_started = time.perf_counter()
+            investments = list(
+                Investment.objects.select_for_update().filter(
+                    pk__in=investment_ids, status='VOTED'
+                ).values_list('id', 'amount')
+            )
+            self._timed('load', phase_started)
+            if not investments:
+                return 0, []
+
+            phase_started = time.perf_counter()
+            InvestmentPosition.objects.filter(investment_id__in=[pk for pk, amount in investments]).delete()
+            self._timed('delete', phase_started)
+
+            phase_started = time.perf_counter()
+            positions, updates = self.build(plan, investments, now)
+            self._timed('allocate', phase_started)
+
+            phase_started = time.perf_counter()
+            InvestmentPosition.objects.bulk_create(positions, batch_size=self.batch_size)
+            self._timed('insert', phase_started)
+
+            phase_started = time.perf_counter()
+            Investment.objects.bulk_update(
+                updates,
+                ['status', 'current_value', 'profit_loss', 'profit_loss_percentage', 'last_updated'],
+                batch_size=settings.REVALUATION_BATCH_SIZE
+            )
+            self._timed('update', phase_started)
+        return len(positions), updates
+
+    def execute(self, dry_run=False, company_ids=None):
+        """Run the pipeline; returns a dict describing what was (or would be) done"""
+        started = time.perf_counter()
+        now = timezone.now()
+        self.timings = {}
+
+        phase_started = time.perf_counter()
+        plan = plan_execution(self.index, company_ids)
+        self._timed('plan', phase_started)
+
+        if dry_run:
+            phase_started = time.perf_counter()
+            investments = list(
+                Investment.objects.filter(index=self.index, status='VOTED').values_list('id', 'amount')
+            )
+            self._timed('load', phase_started)
+            phase_started = time.perf_counter()
+            updates = [plan.valued_investment(investment_id, amount, now) for investment_id, amount in investments]
+            self._timed('allocate', phase_started)
+            position_count = len(updates) * len(plan.companies)
+            return self._result(plan, position_count, updates, started, dry_run=True)
+
+        investment_ids = list(
+            Investment.objects.filter(index=self.index, status='VOTED').order_by('pk').values_list('pk', flat=True)
+        )
+        chunk_size = max(1, self.batch_size // len(plan.companies))
+        position_count = 0
+        updates = []
+        for offset in range(0, len(investment_ids), chunk_size):
+            chunk_positions, chunk_updates = self.execute_chunk(
+                plan, investment_ids[offset:offset + chunk_size], now
+            )
+            position_count += chunk_positions
+            updates.extend(chunk_updates)
+            if self.progress:
+                self.progress(min(offset + chunk_size, len(investment_ids)), len(investment_ids))
+
+        with transaction.atomic():
+            # Lock the index so two executions cannot both finish it
+            phase_started = time.perf_counter()
+            index = Index.objects.select_for_update().get(pk=self.index.pk)
+            if index.status != 'VOTING':
+                raise ExecutionError(f'Index must be in voting status to execute. Current status: {index.status}')
+            # Snapshot the universe and vote results, then keep only the
+            # selected companies; set() touches just the difference
+            record_version(index, plan.companies, plan.weight)
+            index.companies.set(plan.companies)
+            index.status = 'EXECUTED'
+            index.save()
+            self._timed('index', phase_started)
+
+        self.index = index
+        result = self._result(plan, position_count, updates, started, dry_run=False)
+        logger.info(
+            f"Executed index {index.id}: {result['investments']} investments, "
+            f"{result['positions']} positions in {result['elapsed_ms']} ms {self.timings}"
+        )
+        return result
+
+    def _result(self, plan, position_count, updates, started, dry_run):
+        return {
+            'dry_run': dry_run,
+            'plan': plan,
+            'investments': len(updates),
+            'positions': position_count,
+            'weight': quantize(plan.weight),
+            'total_amount': sum((investment.amount for investment in updates), Decimal('0.00')),
+            'total_value': sum((investment.current_value for investment in updates), Decimal('0.00')),
+            'timings_ms': dict(self.timings),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
@@ -0,0 +1,132 @@
+import logging
+import time
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from investments.models import Investment
+from jobs.queue import enqueue
+from .models import Index, IndexTransition
+
+logger = logging.getLogger(__name__)
+
+
+# Date-driven transitions: (transition, status it leaves, date column that
+# makes it due, job carrying it out or None when applied directly)
+TRANSITIONS = [
+    ('activate', 'DRAFT', 'investment_start_date', None),
+    ('start_voting', 'ACTIVE', 'voting_start_date', 'start_voting'),
+    ('execute', 'VOTING', 'voting_end_date', 'execute_index'),
+]
+
+
+class LifecycleError(Exception):
+    """An index cannot move to the requested status; retrying will not help"""
+
+
+def activate(index):
+    """Move a DRAFT index to ACTIVE under a row lock"""
+    with transaction.atomic():
+        index = Index.objects.select_for_update().get(pk=index.pk)
+        if index.status != 'DRAFT':
+            raise LifecycleError(f'Index must be in draft status to activate. Current status: {index.status}')
+        index.status = 'ACTIVE'
+        index.save()
+    return index
+
+
+def start_voting(index, batch_size=None, progress=None):
+    """
+    Start the voting phase of an ACTIVE index.
+
+    The index switches to VOTING first, under a row lock, which closes it
+    to new investments. Its ACTIVE investments are then marked VOTED in ID
+    chunks of batch_size, one short UPDATE each. Running it again on an
+    index already in VOTING marks only the investments still ACTIVE, so an
+    interrupted run can simply be retried. progress(processed, total) is
+    called after every chunk. Returns the number of investments marked.
+    """
+    started = time.perf_counter()
+    batch_size = batch_size or settings.EXECUTION_BATCH_SIZE
+
+    with transaction.atomic():
+        index = Index.objects.select_for_update().get(pk=index.pk)
+        if index.status not in ('ACTIVE', 'VOTING'):
+            raise LifecycleError(f'Index must be in active status to start voting. Current status: {index.status}')
+        if index.status == 'ACTIVE':
+            index.status = 'VOTING'
+            index.save()
+
+    investment_ids = list(
+        Investment.objects.filter(index=index, status='ACTIVE').order_by('pk').values_list('pk', flat=True)
+    )
+    updated = 0
+    for offset in range(0, len(investment_ids), batch_size):
+        updated += Investment.objects.filter(
+            pk__in=investment_ids[offset:offset + batch_size],
+            status='ACTIVE'
+        ).update(status='VOTED')
+        if progress:
+            progress(min(offset + batch_size, len(investment_ids)), len(investment_ids))
+
+    logger.info(
+        f"Started voting for index {index.id}: {updated} investments marked VOTED "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return updated
+
+
+def due_transitions(now=None):
+    """
+    Indexes whose next lifecycle date has passed, as (index, transition,
+    job type, due_at) tuples. One query; every branch of the OR is served
+    by a partial index on its status.
+    """
+    now = now or timezone.now()
+    condition = Q()
+    for transition, status, column, job_type in TRANSITIONS:
+        condition |= Q(status=status, **{f'{column}__lte': now})
+    indexes = Index.objects.filter(condition).only(
+        'id', 'status', *(column for transition, status, column, job_type in TRANSITIONS)
+    ).order_by('pk')
+
+    due = []
+    for index in indexes:
+        for transition, status, column, job_type in TRANSITIONS:
+            if index.status == status:
+                due.append((index, transition, job_type, getattr(index, column)))
+    return due
+
+
+def apply_due_transitions(now=None):
+    """
+    Take every due lifecycle transition once. The transition is recorded
+    (unique per index, transition and due date) in the same transaction
+    that activates the index or queues its job, so concurrent passes and
+    later passes skip it; a failed job is not retried automatically.
+    Returns the transitions taken as (index ID, transition) pairs.
+    """
+    applied = []
+    for index, transition, job_type, due_at in due_transitions(now):
+        try:
+            with transaction.atomic():
+                record = IndexTransition.objects.create(index=index, transition=transition, due_at=due_at)
+                if job_type is None:
+                    activate(index)
+                else:
+                    record.job, created = enqueue(
+                        job_type, {'index_id': index.id}, dedupe_key=f'{job_type}:{index.id}'
+                    )
+                    record.save(update_fields=['job'])
+        except IntegrityError:
+            # Already taken by an earlier or concurrent pass
+            continue
+        except Exception as e:
+            logger.exception(f"Could not {transition} index {index.id}: {str(e)}")
+            continue
+        applied.append((index.id, transition))
+
+    if applied:
+        logger.info(f"Applied index lifecycle transitions: {applied}")
+    return applied
+
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from indexes.lifecycle import apply_due_transitions, due_transitions
+
+
+class Command(BaseCommand):
+    help = 'Take the index lifecycle transitions whose dates have passed (the scheduler does this on every poll)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List the due transitions without taking them')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for index, transition, job_type, due_at in due_transitions():
+                self.stdout.write(f"  index {index.id}: {transition} (due {due_at.isoformat()})")
+            return
+
+        applied = apply_due_transitions()
+        for index_id, transition in applied:
+            self.stdout.write(f"  index {index_id}: {transition}")
+        self.stdout.write(self.style.SUCCESS(f"Applied {len(applied)} transitions"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from indexes.counters import read_counters, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the platform counters served by /indexes/stats/ and correct any drift'
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters()
+        if drift:
+            for name, delta in sorted(drift.items()):
+                self.stdout.write(f"  {name}: {delta:+d}")
+        self.stdout.write(self.style.SUCCESS(f"Counters reconciled: {read_counters()}"))
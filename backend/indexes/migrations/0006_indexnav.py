@@ -0,0 +1,30 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indexes', '0005_alter_index_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexNav',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(verbose_name='Timestamp')),
+                ('nav', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='Net Asset Value')),
+                ('constituent_count', models.PositiveIntegerField(default=0, verbose_name='Constituents')),
+                ('priced_count', models.PositiveIntegerField(default=0, verbose_name='Priced Constituents')),
+                ('index', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nav_history', to='indexes.index', verbose_name='Index')),
+            ],
+            options={
+                'verbose_name': 'Index NAV',
+                'verbose_name_plural': 'Index NAVs',
+                'db_table': 'index_nav',
+                'ordering': ['timestamp'],
+                'unique_together': {('index', 'timestamp')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indexes', '0006_indexnav'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='index',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField(), verbose_name='Search Vector'),
+        ),
+        migrations.AddIndex(
+            model_name='index',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='indexes_search_gin'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indexes', '0007_index_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Name')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Value')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True, verbose_name='Reconciled At')),
+            ],
+            options={
+                'verbose_name': 'Platform Counter',
+                'verbose_name_plural': 'Platform Counters',
+                'db_table': 'platform_counters',
+                'ordering': ['name'],
+            },
+        ),
+    ]
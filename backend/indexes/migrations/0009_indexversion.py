@@ -0,0 +1,60 @@
+# Generated by Django 5.1.7 on 2026-10-17 12:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0010_company_search_vector'),
+        ('indexes', '0008_platformcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(verbose_name='Version')),
+                ('universe_size', models.PositiveIntegerField(default=0, verbose_name='Universe Size')),
+                ('selected_count', models.PositiveIntegerField(default=0, verbose_name='Selected Companies')),
+                ('total_vote_weight', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='Total Vote Weight')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('index', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='indexes.index', verbose_name='Index')),
+            ],
+            options={
+                'verbose_name': 'Index Version',
+                'verbose_name_plural': 'Index Versions',
+                'db_table': 'index_versions',
+                'ordering': ['index', '-version'],
+                'unique_together': {('index', 'version')},
+            },
+        ),
+        migrations.AddField(
+            model_name='index',
+            name='current_version',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='indexes.indexversion', verbose_name='Current Version'),
+        ),
+        migrations.CreateModel(
+            name='IndexConstituent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField(verbose_name='Rank')),
+                ('vote_weight', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='Vote Weight')),
+                ('vote_count', models.PositiveIntegerField(default=0, verbose_name='Vote Count')),
+                ('target_weight', models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='Target Weight')),
+                ('selected', models.BooleanField(default=False, verbose_name='Selected')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_constituents', to='companies.company', verbose_name='Company')),
+                ('version', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='constituents', to='indexes.indexversion', verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Index Constituent',
+                'verbose_name_plural': 'Index Constituents',
+                'db_table': 'index_constituents',
+                'ordering': ['version', 'rank'],
+                'indexes': [models.Index(fields=['company', 'version'], name='index_constituent_company_idx')],
+                'unique_together': {('version', 'company'), ('version', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-17 13:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indexes', '0009_indexversion'),
+        ('jobs', '0002_alter_job_job_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transition', models.CharField(choices=[('activate', 'Activate'), ('start_voting', 'Start voting'), ('execute', 'Execute')], max_length=20, verbose_name='Transition')),
+                ('due_at', models.DateTimeField(verbose_name='Due At')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Index Transition',
+                'verbose_name_plural': 'Index Transitions',
+                'db_table': 'index_transitions',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='index',
+            index=models.Index(condition=models.Q(('status', 'DRAFT')), fields=['investment_start_date'], name='index_due_activation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='index',
+            index=models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['voting_start_date'], name='index_due_voting_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='index',
+            index=models.Index(condition=models.Q(('status', 'VOTING')), fields=['voting_end_date'], name='index_due_execution_idx'),
+        ),
+        migrations.AddField(
+            model_name='indextransition',
+            name='index',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='indexes.index', verbose_name='Index'),
+        ),
+        migrations.AddField(
+            model_name='indextransition',
+            name='job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='jobs.job', verbose_name='Job'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='indextransition',
+            unique_together={('index', 'transition', 'due_at')},
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-18 00:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0010_company_search_vector'),
+        ('indexes', '0011_cache_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='indexconstituent',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='index_constituents', to='companies.company', verbose_name='Company'),
+        ),
+    ]
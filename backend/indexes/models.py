@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Q
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from companies.models import Company
@@ -50,14 +53,41 @@ class Index(models.Model):
         default='DRAFT',
         verbose_name=_('Status')
     )
+    # Constituent snapshot that `companies` currently reflects, set at execution
+    current_version = models.ForeignKey(
+        'IndexVersion',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Current Version')
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Name words rank above description words
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('name', weight='A', config='english') +
+            SearchVector('description', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name=_('Search Vector')
+    )
 
     class Meta:
         db_table = 'indexes'
         verbose_name = _('Index')
         verbose_name_plural = _('Indexes')
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='indexes_search_gin'),
+            # Partial indexes for the scheduler's due-transition scan; each
+            # holds only the indexes waiting in the status it advances
+            models.Index(fields=['investment_start_date'], condition=Q(status='DRAFT'), name='index_due_activation_idx'),
+            models.Index(fields=['voting_start_date'], condition=Q(status='ACTIVE'), name='index_due_voting_idx'),
+            models.Index(fields=['voting_end_date'], condition=Q(status='VOTING'), name='index_due_execution_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -101,3 +131,203 @@ class Index(models.Model):
             return count.total_weight
         except CompanyVoteCount.DoesNotExist:
             return 0
+
+
+class IndexNav(models.Model):
+    """
+    Value of a unit basket (one share of every constituent) of an index,
+    materialized once per price refresh.
+    """
+    index = models.ForeignKey(
+        Index,
+        on_delete=models.CASCADE,
+        related_name='nav_history',
+        verbose_name=_('Index')
+    )
+    timestamp = models.DateTimeField(verbose_name=_('Timestamp'))
+    nav = models.DecimalField(max_digits=20, decimal_places=2, verbose_name=_('Net Asset Value'))
+    constituent_count = models.PositiveIntegerField(default=0, verbose_name=_('Constituents'))
+    priced_count = models.PositiveIntegerField(default=0, verbose_name=_('Priced Constituents'))
+
+    class Meta:
+        db_table = 'index_nav'
+        verbose_name = _('Index NAV')
+        verbose_name_plural = _('Index NAVs')
+        ordering = ['timestamp']
+        unique_together = ['index', 'timestamp']
+
+    def __str__(self):
+        return f"{self.index_id} @ {self.timestamp}: {self.nav}"
+
+
+class ImmutableQuerySet(models.QuerySet):
+    """Refuses the bulk update() and delete() that would bypass the models' guards"""
+
+    def update(self, **kwargs):
+        raise ValueError('Index versions are immutable')
+
+    def delete(self):
+        raise ValueError('Index versions are immutable')
+
+
+class IndexVersion(models.Model):
+    """
+    An immutable snapshot of an index's constituents, written when the index
+    is executed: the whole pre-vote universe with each company's vote tally,
+    rank and target weight. Audits and history read it instead of
+    recomputing votes.
+
+    save(), delete() and the default manager's update()/delete() refuse to
+    change a stored version; only deleting the index removes its versions.
+    """
+    index = models.ForeignKey(
+        Index,
+        on_delete=models.CASCADE,
+        related_name='versions',
+        verbose_name=_('Index')
+    )
+    version = models.PositiveIntegerField(verbose_name=_('Version'))
+    universe_size = models.PositiveIntegerField(default=0, verbose_name=_('Universe Size'))
+    selected_count = models.PositiveIntegerField(default=0, verbose_name=_('Selected Companies'))
+    total_vote_weight = models.DecimalField(
+        max_digits=20, decimal_places=2, default=0, verbose_name=_('Total Vote Weight')
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ImmutableQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'index_versions'
+        verbose_name = _('Index Version')
+        verbose_name_plural = _('Index Versions')
+        ordering = ['index', '-version']
+        unique_together = ['index', 'version']
+
+    def __str__(self):
+        return f"{self.index_id} v{self.version}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Index versions are immutable')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Index versions are immutable')
+
+
+class IndexConstituent(models.Model):
+    """
+    One company of an index version, with the vote result that placed it.
+    Immutable like its version; a company that appears in any version
+    cannot be deleted.
+    """
+    version = models.ForeignKey(
+        IndexVersion,
+        on_delete=models.CASCADE,
+        related_name='constituents',
+        verbose_name=_('Version')
+    )
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.PROTECT,
+        related_name='index_constituents',
+        verbose_name=_('Company')
+    )
+    # 1 = most vote weight; companies without votes follow by symbol
+    rank = models.PositiveIntegerField(verbose_name=_('Rank'))
+    vote_weight = models.DecimalField(
+        max_digits=20, decimal_places=2, default=0, verbose_name=_('Vote Weight')
+    )
+    vote_count = models.PositiveIntegerField(default=0, verbose_name=_('Vote Count'))
+    # Percentage of the index; 0 for companies that were not selected
+    target_weight = models.DecimalField(
+        max_digits=7, decimal_places=4, default=0, verbose_name=_('Target Weight')
+    )
+    selected = models.BooleanField(default=False, verbose_name=_('Selected'))
+
+    objects = ImmutableQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'index_constituents'
+        verbose_name = _('Index Constituent')
+        verbose_name_plural = _('Index Constituents')
+        ordering = ['version', 'rank']
+        unique_together = [['version', 'company'], ['version', 'rank']]
+        indexes = [
+            models.Index(fields=['company', 'version'], name='index_constituent_company_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.version} #{self.rank} {self.company_id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Index versions are immutable')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Index versions are immutable')
+
+
+class IndexTransition(models.Model):
+    """
+    A date-driven lifecycle transition taken by the scheduler. Unique per
+    index, transition and due date, so each one is applied exactly once
+    however many processes run the scheduler pass.
+    """
+    TRANSITION_CHOICES = [
+        ('activate', _('Activate')),
+        ('start_voting', _('Start voting')),
+        ('execute', _('Execute')),
+    ]
+
+    index = models.ForeignKey(
+        Index,
+        on_delete=models.CASCADE,
+        related_name='transitions',
+        verbose_name=_('Index')
+    )
+    transition = models.CharField(max_length=20, choices=TRANSITION_CHOICES, verbose_name=_('Transition'))
+    # The date column value that made the transition due
+    due_at = models.DateTimeField(verbose_name=_('Due At'))
+    # Background job carrying out the transition; activation is applied directly
+    job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Job')
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'index_transitions'
+        verbose_name = _('Index Transition')
+        verbose_name_plural = _('Index Transitions')
+        ordering = ['-created_at']
+        unique_together = ['index', 'transition', 'due_at']
+
+    def __str__(self):
+        return f"{self.index_id} {self.transition} due {self.due_at}"
+
+
+class PlatformCounter(models.Model):
+    """
+    A platform-wide row count (indexes, indexes per status, investments,
+    users), kept current by signals and periodically reconciled against
+    the real tables.
+    """
+    name = models.CharField(max_length=50, primary_key=True, verbose_name=_('Name'))
+    value = models.BigIntegerField(default=0, verbose_name=_('Value'))
+    updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Reconciled At'))
+
+    class Meta:
+        db_table = 'platform_counters'
+        verbose_name = _('Platform Counter')
+        verbose_name_plural = _('Platform Counters')
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
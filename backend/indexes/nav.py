@@ -0,0 +1,64 @@
+import logging
+from django.db.models import Count, Sum
+from django.utils import timezone
+from companies.history import bucket_start
+from .models import Index, IndexNav
+
+logger = logging.getLogger(__name__)
+
+NAV_STATUSES = ['ACTIVE', 'EXECUTED']
+NAV_RESOLUTIONS = ['raw', '1h', '1d']
+
+
+def record_index_navs(timestamp=None):
+    """
+    Store the unit-basket NAV of every ACTIVE/EXECUTED index.
+    One aggregate over Index.companies joined with Company.current_price
+    computes all indexes, followed by a single bulk insert.
+    """
+    timestamp = timestamp or timezone.now()
+    rows = Index.objects.filter(status__in=NAV_STATUSES).annotate(
+        nav=Sum('companies__current_price'),
+        constituent_count=Count('companies'),
+        priced_count=Count('companies__current_price')
+    ).values_list('id', 'nav', 'constituent_count', 'priced_count')
+
+    navs = [
+        IndexNav(
+            index_id=index_id,
+            timestamp=timestamp,
+            nav=nav,
+            constituent_count=constituent_count,
+            priced_count=priced_count
+        )
+        for index_id, nav, constituent_count, priced_count in rows
+        if nav is not None
+    ]
+    IndexNav.objects.bulk_create(navs, ignore_conflicts=True)
+    logger.info(f"Recorded NAV for {len(navs)} indexes")
+    return len(navs)
+
+
+def get_nav_history(index, start, end, resolution='raw'):
+    """
+    Return stored NAV points for an index between start and end.
+    For 1h/1d resolutions the last NAV of each bucket is returned.
+    """
+    points = IndexNav.objects.filter(
+        index=index, timestamp__gte=start, timestamp__lt=end
+    ).values_list('timestamp', 'nav', 'constituent_count')
+
+    if resolution == 'raw':
+        return [
+            {'timestamp': timestamp, 'nav': nav, 'constituents': constituents}
+            for timestamp, nav, constituents in points
+        ]
+
+    buckets = {}
+    for timestamp, nav, constituents in points:
+        # Points are ordered by timestamp, so the last write per bucket wins
+        buckets[bucket_start(timestamp, resolution)] = (nav, constituents)
+    return [
+        {'timestamp': bucket, 'nav': nav, 'constituents': constituents}
+        for bucket, (nav, constituents) in buckets.items()
+    ]
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Index
+from .models import Index, IndexConstituent, IndexVersion
 from companies.models import Company
 from companies.serializers import CompanySerializer
 from investments.models import Investment
@@ -37,18 +37,76 @@ class IndexSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
             'company_count',
-            'total_investment'
+            'total_investment',
+            'current_version'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'current_version']
 
     def get_company_count(self, obj):
+        # Annotated by IndexViewSet.get_queryset; fall back for fresh instances
+        if hasattr(obj, 'company_count'):
+            return obj.company_count
         return obj.companies.count()
 
     def get_total_investment(self, obj):
+        if hasattr(obj, 'total_investment'):
+            return obj.total_investment or 0
         total = Investment.objects.filter(
             index=obj,
             status__in=['ACTIVE', 'VOTED']
         ).aggregate(
             total=Sum('amount')
         )['total'] or 0
-        return total
\ No newline at end of file
+        return total
+
+
+class IndexCardSerializer(IndexSerializer):
+    """Slim representation for index listings; constituents come from the constituents endpoint"""
+
+    class Meta(IndexSerializer.Meta):
+        fields = [
+            'id',
+            'name',
+            'description',
+            'min_companies',
+            'max_companies',
+            'min_votes_per_user',
+            'max_votes_per_user',
+            'investment_start_date',
+            'investment_end_date',
+            'voting_start_date',
+            'voting_end_date',
+            'lock_period_months',
+            'status',
+            'created_at',
+            'updated_at',
+            'company_count',
+            'total_investment'
+        ]
+
+
+class IndexVersionSerializer(serializers.ModelSerializer):
+    is_current = serializers.SerializerMethodField()
+
+    class Meta:
+        model = IndexVersion
+        fields = ['id', 'version', 'universe_size', 'selected_count', 'total_vote_weight', 'created_at', 'is_current']
+        read_only_fields = fields
+
+    def get_is_current(self, obj):
+        return obj.pk == self.context.get('current_version_id')
+
+
+class IndexConstituentSerializer(serializers.ModelSerializer):
+    company_id = serializers.IntegerField(source='company.id', read_only=True)
+    company_name = serializers.CharField(source='company.name', read_only=True)
+    company_symbol = serializers.CharField(source='company.symbol', read_only=True)
+    sector = serializers.CharField(source='company.sector', read_only=True)
+
+    class Meta:
+        model = IndexConstituent
+        fields = [
+            'rank', 'company_id', 'company_name', 'company_symbol', 'sector',
+            'vote_weight', 'vote_count', 'target_weight', 'selected'
+        ]
+        read_only_fields = fields
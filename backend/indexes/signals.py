@@ -0,0 +1,125 @@
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from companies.signals import companies_changed
+from updates.signals import prices_changed
+from .models import Index
+from . import counters
+from .cache import invalidate_all, invalidate_details, invalidate_index, invalidate_prices, invalidate_stats
+
+
+# Platform counter of each counted model, by model label
+COUNTED_MODELS = {
+    'investments.Investment': counters.INVESTMENTS,
+    'accounts.CustomUser': counters.USERS,
+}
+
+
+@receiver(post_save, sender=Index)
+@receiver(post_delete, sender=Index)
+def invalidate_index_cache(sender, instance, **kwargs):
+    """Any change to an index affects its detail and every listing"""
+    invalidate_index(instance.pk)
+
+
+@receiver(m2m_changed, sender=Index.companies.through)
+def invalidate_index_companies(sender, instance, action, reverse, pk_set, **kwargs):
+    """Constituent changes alter company_count and the nested companies"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_index(instance.pk)
+        invalidate_stats([instance.pk])
+        return
+    # company.index_set.add(...): instance is the company, pk_set holds index IDs
+    if pk_set is None:
+        # The cleared indexes are no longer known, drop everything
+        invalidate_all()
+        return
+    for index_id in pk_set:
+        invalidate_index(index_id)
+    invalidate_stats(pk_set)
+
+
+@receiver(post_save, sender='investments.Investment')
+@receiver(post_delete, sender='investments.Investment')
+def invalidate_index_investments(sender, instance, **kwargs):
+    """Investments feed total_investment of their index"""
+    invalidate_index(instance.index_id)
+
+
+@receiver(prices_changed)
+def invalidate_index_prices(sender, company_ids, **kwargs):
+    """Detail responses embed current company prices"""
+    invalidate_prices()
+    # Constituent statistics only of the indexes holding a repriced company
+    invalidate_stats(set(
+        Index.companies.through.objects.filter(company_id__in=company_ids).values_list('index_id', flat=True)
+    ))
+
+
+def invalidate_constituents(company_ids):
+    """Detail responses and statistics of the indexes holding the companies"""
+    index_ids = set(
+        Index.companies.through.objects.filter(company_id__in=company_ids).values_list('index_id', flat=True)
+    )
+    if index_ids:
+        invalidate_details(index_ids)
+        invalidate_stats(index_ids)
+
+
+@receiver(post_save, sender='companies.Company')
+def invalidate_company_cache(sender, instance, created, **kwargs):
+    """Edited name, market cap, sector or price of a constituent"""
+    if not created:
+        invalidate_constituents([instance.pk])
+
+
+@receiver(companies_changed)
+def invalidate_imported_companies(sender, company_ids, **kwargs):
+    invalidate_constituents(company_ids)
+
+
+@receiver(post_delete, sender='companies.Company')
+def invalidate_deleted_company_stats(sender, instance, **kwargs):
+    """Its index memberships are already gone, so drop every cached statistic and detail"""
+    invalidate_stats()
+    invalidate_prices()
+
+
+@receiver(post_init, sender=Index)
+def remember_index_status(sender, instance, **kwargs):
+    # Read from __dict__ so instances loaded with only() don't fetch the status
+    instance._counted_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Index)
+def count_saved_index(sender, instance, created, **kwargs):
+    """Platform counters: a new index, or an index that changed status"""
+    previous = instance._counted_status
+    if created:
+        counters.adjust({counters.INDEXES: 1, counters.index_status_counter(instance.status): 1})
+    elif previous is not None and previous != instance.status:
+        counters.adjust({
+            counters.index_status_counter(previous): -1,
+            counters.index_status_counter(instance.status): 1
+        })
+    instance._counted_status = instance.status
+
+
+@receiver(post_delete, sender=Index)
+def count_deleted_index(sender, instance, **kwargs):
+    counters.adjust({counters.INDEXES: -1, counters.index_status_counter(instance.status): -1})
+
+
+@receiver(post_save, sender='investments.Investment')
+@receiver(post_save, sender='accounts.CustomUser')
+def count_created_row(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust({COUNTED_MODELS[sender._meta.label]: 1})
+
+
+@receiver(post_delete, sender='investments.Investment')
+@receiver(post_delete, sender='accounts.CustomUser')
+def count_deleted_row(sender, instance, **kwargs):
+    counters.adjust({COUNTED_MODELS[sender._meta.label]: -1})
+
@@ -0,0 +1,90 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from companies.models import Company
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+SECTOR_LABELS = dict(Company.SECTOR_CHOICES)
+
+
+def _company(row):
+    return {'id': row[0], 'name': row[1], 'symbol': row[2], 'price': row[4]}
+
+
+def _hhi(values, total):
+    """Herfindahl-Hirschman index of the shares values/total, from 0 to 10000"""
+    if not total:
+        return None
+    return round(sum((float(value / total) * 100) ** 2 for value in values), 2)
+
+
+def compute_constituent_stats(index_id):
+    """
+    Statistics over the constituents of an index from a single query: one
+    pass over its companies gives the count, market cap, price mean/min/max
+    (with the companies holding them), per-sector weights and the
+    market-cap concentration (HHI) of companies and sectors.
+    """
+    rows = Company.objects.filter(index=index_id).order_by('id').values_list(
+        'id', 'name', 'symbol', 'sector', 'current_price', 'market_cap'
+    )
+
+    total_companies = 0
+    total_market_cap = Decimal('0')
+    price_sum = Decimal('0')
+    priced = 0
+    highest = lowest = None
+    market_caps = []
+    sectors = defaultdict(lambda: {'companies': 0, 'market_cap': Decimal('0')})
+
+    for row in rows:
+        sector, price, market_cap = row[3], row[4], row[5]
+        total_companies += 1
+        sectors[sector]['companies'] += 1
+        if market_cap is not None:
+            total_market_cap += market_cap
+            sectors[sector]['market_cap'] += market_cap
+            market_caps.append(market_cap)
+        if price is not None:
+            priced += 1
+            price_sum += price
+            if highest is None or price > highest[4]:
+                highest = row
+            if lowest is None or price < lowest[4]:
+                lowest = row
+
+    sector_stats = [
+        {
+            'sector': sector,
+            'label': SECTOR_LABELS.get(sector, sector),
+            'companies': values['companies'],
+            'market_cap': values['market_cap'],
+            # Share of the index by market cap, and with every company weighted equally
+            'weight': round(float(values['market_cap'] / total_market_cap) * 100, 2) if total_market_cap else None,
+            'equal_weight': round(values['companies'] / total_companies * 100, 2),
+        }
+        for sector, values in sectors.items()
+    ]
+    sector_stats.sort(key=lambda item: (-item['market_cap'], -item['companies'], item['sector']))
+
+    company_hhi = _hhi(market_caps, total_market_cap)
+    stats = {
+        'total_companies': total_companies,
+        'priced_companies': priced,
+        'total_market_cap': total_market_cap,
+        'average_price': (price_sum / priced).quantize(CENT) if priced else 0,
+        'sectors': sector_stats,
+        'concentration': {
+            'hhi': company_hhi,
+            'sector_hhi': _hhi([item['market_cap'] for item in sector_stats], total_market_cap),
+            # Number of equally weighted companies with the same concentration
+            'effective_companies': round(10000 / company_hhi, 2) if company_hhi else None,
+            'equal_weight_hhi': round(10000 / total_companies, 2) if total_companies else None,
+        },
+    }
+    if highest is not None:
+        stats['highest_price'] = _company(highest)
+        stats['lowest_price'] = _company(lowest)
+    return stats
@@ -1,3 +1,395 @@
+import io
+import math
+import statistics
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+import numpy as np
+from django.db import transaction
+from django.db.models import F, ProtectedError
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import CustomUser
+from companies.catalog import import_catalog
+from companies.models import Company, PriceBar
+from investments.models import Investment
+from jobs.models import Job
+from . import counters
+from .analytics import compute_index_analytics, load_closes
+from .execution import IndexExecutor
+from .lifecycle import apply_due_transitions
+from .models import Index, IndexConstituent, IndexNav, IndexTransition, IndexVersion, PlatformCounter
+from .nav import get_nav_history, record_index_navs
+from .versions import record_version
 
-# Create your tests here.
+
+class IndexTestCase(TestCase):
+    """An index over three companies and an authenticated API client"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('user', 'user@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.companies = [
+            Company.objects.create(name=f'Company {symbol}', symbol=symbol, current_price=Decimal('10.00'))
+            for symbol in ['AAA', 'BBB', 'CCC']
+        ]
+        self.index = Index.objects.create(name='Index', description='Test index')
+        self.index.companies.set(self.companies)
+
+
+class IndexNavTests(IndexTestCase):
+    """Unit-basket NAV points and their hourly/daily buckets"""
+
+    def setUp(self):
+        super().setUp()
+        Index.objects.filter(pk=self.index.pk).update(status='ACTIVE')
+
+    def at(self, day, hour, minute):
+        return datetime(2025, 3, day, hour, minute, tzinfo=dt_timezone.utc)
+
+    def record(self, timestamp, price):
+        Company.objects.filter(pk=self.companies[0].pk).update(current_price=Decimal(price))
+        return record_index_navs(timestamp)
+
+    def test_records_active_indexes_only(self):
+        Company.objects.filter(pk=self.companies[2].pk).update(current_price=None)
+        Index.objects.create(name='Draft', description='Not live yet').companies.set(self.companies)
+        self.assertEqual(record_index_navs(self.at(3, 10, 0)), 1)
+        nav = IndexNav.objects.get()
+        self.assertEqual((nav.index_id, nav.nav, nav.constituent_count, nav.priced_count), (self.index.pk, Decimal('20.00'), 3, 2))
+
+    def test_buckets_keep_the_last_point(self):
+        self.record(self.at(3, 10, 5), '10.00')
+        self.record(self.at(3, 10, 40), '15.00')
+        self.record(self.at(3, 11, 10), '20.00')
+        self.record(self.at(4, 9, 0), '25.00')
+        start, end = self.at(3, 0, 0), self.at(5, 0, 0)
+
+        self.assertEqual([point['nav'] for point in get_nav_history(self.index, start, end)], [
+            Decimal('30.00'), Decimal('35.00'), Decimal('40.00'), Decimal('45.00')
+        ])
+        self.assertEqual(
+            [(point['timestamp'], point['nav']) for point in get_nav_history(self.index, start, end, '1h')],
+            [(self.at(3, 10, 0), Decimal('35.00')), (self.at(3, 11, 0), Decimal('40.00')), (self.at(4, 9, 0), Decimal('45.00'))]
+        )
+        self.assertEqual(
+            [(point['timestamp'], point['nav']) for point in get_nav_history(self.index, start, end, '1d')],
+            [(self.at(3, 0, 0), Decimal('40.00')), (self.at(4, 0, 0), Decimal('45.00'))]
+        )
+
+        response = self.client.get(f'/indexes/{self.index.pk}/nav/', {
+            'from': '2025-03-03', 'to': '2025-03-05', 'resolution': '1d'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([point['nav'] for point in response.data['data']], [Decimal('40.00'), Decimal('45.00')])
+
+
+class ConstituentStatsTests(IndexTestCase):
+    """Sector weights and market-cap concentration on /indexes/{id}/companies_stats/"""
+
+    def setUp(self):
+        super().setUp()
+        for company, sector, market_cap, price in zip(self.companies, ['TECH', 'TECH', 'FIN'], [600, 200, 200], [10, 20, 30]):
+            Company.objects.filter(pk=company.pk).update(
+                sector=sector, market_cap=Decimal(market_cap), current_price=Decimal(price)
+            )
+        # Counts towards the equal weights but holds no market cap and no price
+        self.index.companies.add(Company.objects.create(name='Company DDD', symbol='DDD', sector='OTHER', current_price=None))
+
+    def test_sector_weights_and_concentration(self):
+        response = self.client.get(f'/indexes/{self.index.pk}/companies_stats/')
+        self.assertEqual(response.status_code, 200)
+        stats = response.data
+        self.assertEqual((stats['total_companies'], stats['priced_companies']), (4, 3))
+        self.assertEqual(stats['total_market_cap'], Decimal('1000'))
+        self.assertEqual(stats['average_price'], Decimal('20.00'))
+        self.assertEqual((stats['highest_price']['symbol'], stats['lowest_price']['symbol']), ('CCC', 'AAA'))
+
+        self.assertEqual(
+            [(item['sector'], item['companies'], item['weight'], item['equal_weight']) for item in stats['sectors']],
+            [('TECH', 2, 80.0, 50.0), ('FIN', 1, 20.0, 25.0), ('OTHER', 1, 0.0, 25.0)]
+        )
+        self.assertEqual(sum(item['weight'] for item in stats['sectors']), 100.0)
+        # Shares 60/20/20 by company and 80/20/0 by sector
+        self.assertEqual(stats['concentration'], {
+            'hhi': 4400.0, 'sector_hhi': 6800.0, 'effective_companies': 2.27, 'equal_weight_hhi': 2500.0,
+        })
+
+
+class IndexAnalyticsTests(IndexTestCase):
+    """Risk and return of the equal-weight basket over daily bars"""
+
+    NOW = datetime(2025, 3, 8, tzinfo=dt_timezone.utc)
+
+    def day(self, number):
+        return datetime(2025, 3, 3, tzinfo=dt_timezone.utc) + timedelta(days=number)
+
+    def add_bars(self, company, closes):
+        for day, close in closes.items():
+            close = Decimal(close)
+            PriceBar.objects.create(
+                company=company, resolution=PriceBar.RESOLUTION_DAY, bucket_start=day,
+                open=close, high=close, low=close, close=close, tick_count=1, first_tick_at=day, last_tick_at=day
+            )
+
+    def add_basket(self):
+        # AAA has no bar on the third day; BBB is first priced on it; CCC has no bars at all
+        self.add_bars(self.companies[0], {self.day(0): 10, self.day(1): 12, self.day(3): 9, self.day(4): 11})
+        self.add_bars(self.companies[1], {self.day(2): 20, self.day(3): 20, self.day(4): 30})
+
+    def test_gaps_are_forward_filled_and_late_bars_stay_empty(self):
+        self.add_basket()
+        company_ids = np.array(sorted(company.pk for company in self.companies), dtype=np.int64)
+        days, closes = load_closes(company_ids, self.day(0), self.NOW)
+        self.assertEqual([date(1970, 1, 1) + timedelta(days=int(day)) for day in days], [self.day(number).date() for number in range(5)])
+        np.testing.assert_array_equal(closes, [
+            [10, np.nan, np.nan], [12, np.nan, np.nan], [12, 20, np.nan], [9, 20, np.nan], [11, 30, np.nan],
+        ])
+
+    def test_basket_returns_and_drawdown(self):
+        self.add_basket()
+        result = compute_index_analytics(self.index, '1m', now=self.NOW)
+        # CCC is left out and AAA/BBB reweighted to halves; BBB is held flat until its first bar:
+        # AAA relative 1, 1.2, 1.2, 0.9, 1.1 and BBB 1, 1, 1, 1, 1.5 give 1, 1.1, 1.1, 0.95, 1.3
+        self.assertEqual((result['weighting'], result['constituents'], result['priced_constituents']), ('equal', 3, 2))
+        self.assertEqual((result['first_day'], result['last_day'], result['days']), (self.day(0).date(), self.day(4).date(), 5))
+        self.assertEqual(result['cumulative_return'], 0.3)
+        self.assertEqual(result['max_drawdown'], {
+            'value': round(0.95 / 1.1 - 1, 6), 'peak': self.day(1).date(), 'trough': self.day(3).date(),
+        })
+
+        returns = [0.1, 0.0, 0.95 / 1.1 - 1, 1.3 / 0.95 - 1]
+        volatility = statistics.stdev(returns) * math.sqrt(252)
+        self.assertAlmostEqual(result['annualized_volatility'], volatility, places=5)
+        self.assertAlmostEqual(result['sharpe_ratio'], statistics.mean(returns) * 252 / volatility, places=5)
+
+        self.assertEqual(
+            [(item['symbol'], item['weight'], item['return'], item['contribution']) for item in result['contributions']],
+            [('BBB', 0.5, 0.5, 0.25), ('AAA', 0.5, 0.1, 0.05)]
+        )
+
+    def test_returns_are_annualized_over_calendar_days(self):
+        # 21% over two years (730 days) is 10% a year
+        self.add_bars(self.companies[0], {self.day(0) - timedelta(days=730): 100, self.day(0): 121})
+        result = compute_index_analytics(self.index, '3y', now=self.NOW)
+        self.assertEqual((result['cumulative_return'], result['annualized_return']), (0.21, 0.1))
+        # A single return has no volatility and so no Sharpe ratio
+        self.assertEqual((result['annualized_volatility'], result['sharpe_ratio']), (None, None))
+
+    def test_not_enough_history(self):
+        self.add_bars(self.companies[0], {self.day(0): 10})
+        result = compute_index_analytics(self.index, '1m', now=self.NOW)
+        self.assertEqual((result['error'], result['priced_constituents']), ('Not enough price history in this window', 1))
+        self.assertNotIn('cumulative_return', result)
+
+        # An index without any bars in the window is refused by the API
+        PriceBar.objects.all().delete()
+        response = self.client.get(f'/indexes/{self.index.pk}/analytics/', {'window': '1m'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['priced_constituents'], 0)
+
+
+class IndexCacheTests(IndexTestCase):
+    """Cached detail responses are dropped when an embedded company changes"""
+
+    def get_detail(self):
+        return self.client.get(f'/indexes/{self.index.pk}/')
+
+    def test_repeated_detail_is_served_from_cache(self):
+        self.assertEqual(self.get_detail()['X-Cache'], 'MISS')
+        self.assertEqual(self.get_detail()['X-Cache'], 'HIT')
+
+    def test_company_edit_invalidates_detail(self):
+        self.get_detail()
+        company = self.companies[0]
+        company.name = 'Renamed'
+        company.save()
+        response = self.get_detail()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Renamed', [item['name'] for item in response.data['companies']])
+
+    def test_catalog_import_invalidates_detail(self):
+        self.get_detail()
+        result = import_catalog(io.StringIO('Symbol,Company Name\nAAA,Imported Name\n'))
+        self.assertEqual(result.updated, 1)
+        response = self.get_detail()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Imported Name', [item['name'] for item in response.data['companies']])
+
+    def test_company_delete_invalidates_detail(self):
+        self.get_detail()
+        self.companies[2].delete()
+        response = self.get_detail()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['companies']), 2)
+
+
+class IndexUpdateTests(IndexTestCase):
+    """Responses to updates report the counts after the update"""
+
+    def test_patch_company_ids_reports_the_new_count(self):
+        response = self.client.patch(
+            f'/indexes/{self.index.pk}/', {'company_ids': [self.companies[0].pk]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['company_count'], 1)
+        self.assertEqual([item['symbol'] for item in response.data['companies']], ['AAA'])
+
+    def test_put_reports_the_new_count(self):
+        data = self.client.get(f'/indexes/{self.index.pk}/').data
+        payload = {key: value for key, value in data.items() if value is not None and key not in (
+            'id', 'companies', 'company_count', 'total_investment', 'created_at', 'updated_at', 'current_version'
+        )}
+        payload['company_ids'] = [company.pk for company in self.companies[:2]]
+        response = self.client.put(f'/indexes/{self.index.pk}/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['company_count'], 2)
+        self.assertEqual(self.client.get(f'/indexes/{self.index.pk}/').data['company_count'], 2)
+
+
+class IndexVersionTests(IndexTestCase):
+    """Recorded versions cannot be changed or lose their companies"""
+
+    def setUp(self):
+        super().setUp()
+        self.version = record_version(self.index, self.companies[:2], Decimal('50'))
+        self.index.save()
+
+    def test_constituent_companies_are_protected(self):
+        with self.assertRaises(ProtectedError):
+            self.companies[0].delete()
+        response = self.client.delete(f'/companies/companies/{self.companies[0].pk}/')
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(Company.objects.filter(pk=self.companies[0].pk).exists())
+
+    def test_bulk_update_and_delete_are_refused(self):
+        constituents = IndexConstituent.objects.filter(version=self.version)
+        versions = IndexVersion.objects.filter(pk=self.version.pk)
+        for queryset, changes in ((constituents, {'rank': 99}), (versions, {'selected_count': 3})):
+            with self.assertRaises(ValueError):
+                queryset.update(**changes)
+            with self.assertRaises(ValueError):
+                queryset.delete()
+        with self.assertRaises(ValueError):
+            self.version.delete()
+        self.assertEqual(sorted(constituents.values_list('rank', flat=True)), [1, 2, 3])
+
+    def test_deleting_the_index_removes_its_versions(self):
+        self.index.delete()
+        self.assertFalse(IndexVersion.objects.exists())
+        self.assertFalse(IndexConstituent.objects.exists())
+
+
+class PlatformCounterTests(IndexTestCase):
+    """Maintained counters agree with a recount"""
+
+    def setUp(self):
+        super().setUp()
+        counters.read_counters()
+
+    def test_counters_follow_writes(self):
+        other = Index.objects.create(name='Other', description='Another index')
+        self.index.status = 'ACTIVE'
+        self.index.save()
+        Investment.objects.create(user=self.user, index=self.index, amount=Decimal('100.00'))
+        CustomUser.objects.create_user('second', 'second@example.com', 'password')
+        other.delete()
+        self.assertEqual(counters.read_counters(), counters.count_exact())
+
+    def test_rolled_back_write_leaves_counters_alone(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Index.objects.create(name='Other', description='Another index')
+                raise RuntimeError('rollback')
+        self.assertEqual(counters.read_counters(), counters.count_exact())
+
+    def test_reconcile_corrects_drift(self):
+        PlatformCounter.objects.filter(name=counters.INDEXES).update(value=F('value') + 5)
+        self.assertEqual(counters.reconcile_counters(), {counters.INDEXES: -5})
+        self.assertEqual(counters.read_counters(), counters.count_exact())
+        self.assertEqual(counters.reconcile_counters(), {})
+
+    def test_stats_are_served_from_counters(self):
+        response = self.client.get('/indexes/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_indexes'], 1)
+        self.assertEqual(response.data['draft_indexes'], 1)
+
+
+class LifecycleTransitionTests(IndexTestCase):
+    """Due lifecycle transitions are taken exactly once"""
+
+    def setUp(self):
+        super().setUp()
+        self.past = timezone.now() - timedelta(hours=1)
+
+    def test_due_activation_is_applied_once(self):
+        Index.objects.filter(pk=self.index.pk).update(investment_start_date=self.past)
+        self.assertEqual(apply_due_transitions(), [(self.index.pk, 'activate')])
+        self.assertEqual(apply_due_transitions(), [])
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.status, 'ACTIVE')
+        self.assertEqual(IndexTransition.objects.count(), 1)
+
+    def test_due_voting_queues_one_job_while_it_waits(self):
+        Index.objects.filter(pk=self.index.pk).update(status='ACTIVE', voting_start_date=self.past)
+        self.assertEqual(apply_due_transitions(), [(self.index.pk, 'start_voting')])
+        # The job has not run yet, so the index is still due; the recorded transition keeps it from queueing twice
+        self.assertEqual(apply_due_transitions(), [])
+        self.assertEqual(Job.objects.filter(job_type='start_voting').count(), 1)
+        self.assertEqual(IndexTransition.objects.get().job, Job.objects.get())
+
+    def test_failed_transition_is_retried_on_the_next_pass(self):
+        Index.objects.filter(pk=self.index.pk).update(status='ACTIVE', voting_start_date=self.past)
+        with mock.patch('indexes.lifecycle.enqueue', side_effect=RuntimeError('queue down')):
+            self.assertEqual(apply_due_transitions(), [])
+        self.assertFalse(IndexTransition.objects.exists())
+        self.assertEqual(apply_due_transitions(), [(self.index.pk, 'start_voting')])
+
+    def test_moved_date_is_a_new_transition(self):
+        Index.objects.filter(pk=self.index.pk).update(status='ACTIVE', voting_start_date=self.past)
+        apply_due_transitions()
+        Job.objects.update(status='failed')
+        Index.objects.filter(pk=self.index.pk).update(voting_start_date=self.past + timedelta(minutes=30))
+        self.assertEqual(apply_due_transitions(), [(self.index.pk, 'start_voting')])
+        self.assertEqual(IndexTransition.objects.count(), 2)
+
+
+class IndexExecutionTests(IndexTestCase):
+    """The bulk execution pipeline stores what update_current_value would"""
+
+    def setUp(self):
+        super().setUp()
+        for company, price in zip(self.companies, ['3.33', '7.77', '12.34']):
+            company.current_price = Decimal(price)
+            company.save()
+        Index.objects.filter(pk=self.index.pk).update(status='VOTING', min_votes_per_user=1, max_votes_per_user=3)
+        for amount in ['333.33', '100.01', '250.00', '1.00', '9999.99']:
+            investment = Investment.objects.create(user=self.user, index=self.index, amount=Decimal(amount), status='ACTIVE')
+            response = self.client.post('/voting/votes/submit_votes/', {
+                'index_id': self.index.id,
+                'investment_id': investment.id,
+                'company_ids': [company.id for company in self.companies],
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+        self.index.refresh_from_db()
+
+    def values(self):
+        return list(Investment.objects.order_by('pk').values_list('current_value', 'profit_loss', 'profit_loss_percentage'))
+
+    def test_values_match_update_current_value(self):
+        result = IndexExecutor(self.index).execute()
+        self.assertEqual(result['investments'], 5)
+        executed = self.values()
+        for investment in Investment.objects.order_by('pk'):
+            investment.update_current_value()
+        self.assertEqual(self.values(), executed)
+        self.assertEqual(set(Investment.objects.values_list('status', flat=True)), {'ACTIVE'})
+
+    def test_dry_run_writes_nothing(self):
+        before = self.values()
+        IndexExecutor(self.index).execute(dry_run=True)
+        self.assertEqual(self.values(), before)
+        self.assertEqual(Index.objects.get(pk=self.index.pk).status, 'VOTING')
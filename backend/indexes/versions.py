@@ -0,0 +1,62 @@
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from django.db.models import Max
+from companies.models import Company
+from voting.models import CompanyVoteCount
+from .models import IndexConstituent, IndexVersion
+
+logger = logging.getLogger(__name__)
+
+WEIGHT_STEP = Decimal('0.0001')
+
+
+def record_version(index, selected_companies, weight):
+    """
+    Snapshot the constituents of an index about to be executed as its next
+    version: every company of the pre-vote universe with its vote tally,
+    a rank (selected companies first, then by vote weight) and its target
+    weight. Must run in the execution transaction, with the index row
+    locked and before index.companies is narrowed to the winners. Points
+    index.current_version at the new version (the caller saves the index).
+    """
+    selected = {company.id for company in selected_companies}
+    tallies = {
+        company_id: (total_weight, vote_count)
+        for company_id, total_weight, vote_count in CompanyVoteCount.objects.filter(
+            index=index
+        ).values_list('company_id', 'total_weight', 'vote_count')
+    }
+    universe_ids = set(index.companies.values_list('id', flat=True)) | set(tallies) | selected
+    symbols = dict(Company.objects.filter(id__in=universe_ids).values_list('id', 'symbol'))
+
+    def rank_key(company_id):
+        vote_weight = tallies.get(company_id, (Decimal('0'), 0))[0]
+        return (company_id not in selected, -vote_weight, symbols.get(company_id, ''), company_id)
+
+    target_weight = weight.quantize(WEIGHT_STEP, rounding=ROUND_HALF_UP)
+    latest = IndexVersion.objects.filter(index=index).aggregate(latest=Max('version'))['latest'] or 0
+    version = IndexVersion.objects.create(
+        index=index,
+        version=latest + 1,
+        universe_size=len(universe_ids),
+        selected_count=len(selected),
+        total_vote_weight=sum((total_weight for total_weight, vote_count in tallies.values()), Decimal('0'))
+    )
+    IndexConstituent.objects.bulk_create([
+        IndexConstituent(
+            version=version,
+            company_id=company_id,
+            rank=rank,
+            vote_weight=tallies.get(company_id, (Decimal('0'), 0))[0],
+            vote_count=tallies.get(company_id, (Decimal('0'), 0))[1],
+            target_weight=target_weight if company_id in selected else Decimal('0'),
+            selected=company_id in selected
+        )
+        for rank, company_id in enumerate(sorted(universe_ids, key=rank_key), start=1)
+    ])
+    index.current_version = version
+    logger.info(
+        f"Recorded version {version.version} of index {index.id}: "
+        f"{len(selected)} of {len(universe_ids)} companies selected"
+    )
+    return version
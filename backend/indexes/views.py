@@ -2,59 +2,133 @@ from django.shortcuts import render, get_object_or_404
 from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Avg, Q, Sum, F, ExpressionWrapper, FloatField
-from .models import Index
-from .serializers import IndexSerializer
+from django.db.models import Count, Sum, F, ExpressionWrapper, FloatField, OuterRef, Subquery, DecimalField
+from django.db.models.functions import Coalesce
+from .models import Index, IndexConstituent, IndexVersion
+from .serializers import IndexSerializer, IndexCardSerializer, IndexConstituentSerializer, IndexVersionSerializer
+from companies.serializers import CompanySerializer
+from companies.search import build_search_query, search_companies, symbol_similarity_threshold
+from django.contrib.postgres.search import SearchRank
+from .nav import NAV_RESOLUTIONS, get_nav_history
+from .cache import analytics_key, cached_response, detail_key, get_metrics, list_key, stats_key
+from .analytics import ANALYTICS_WINDOWS, DEFAULT_WINDOW, compute_index_analytics
+from .stats import compute_constituent_stats
+from . import counters
+from .counters import read_counters
+from .execution import ExecutionError, IndexExecutor, plan_execution
+from jobs.queue import enqueue
+from voting.analytics import basket_size, get_vote_distribution, rebuild_vote_distribution
+from voting.models import CompanyVoteCount
+from jobs.serializers import JobSerializer
+from django.urls import reverse
 from rest_framework.pagination import PageNumberPagination
 from companies.models import Company
 from decimal import Decimal
-from accounts.models import CustomUser
 from investments.models import Investment
+from companies.history import parse_history_bound
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+logger = logging.getLogger(__name__)
 
 class IndexPagination(PageNumberPagination):
     page_size = 9  # Show 9 indexes per page (3x3 grid)
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+class ConstituentPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
 class IndexViewSet(viewsets.ModelViewSet):
     serializer_class = IndexSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = IndexPagination
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return IndexCardSerializer
+        return IndexSerializer
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            list_key(request),
+            lambda: super(IndexViewSet, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            detail_key(request, kwargs['pk']),
+            lambda: super(IndexViewSet, self).retrieve(request, *args, **kwargs)
+        )
+
+    def perform_update(self, serializer):
+        index = serializer.save()
+        # company_count and total_investment were annotated before the update; let the serializer recount
+        for annotation in ('company_count', 'total_investment'):
+            if hasattr(index, annotation):
+                delattr(index, annotation)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def cache_metrics(self, request):
+        """Hit rate and rebuild latency of the index list/detail response cache"""
+        return Response(get_metrics())
+
     def get_queryset(self):
-        queryset = Index.objects.all()
+        # Investment totals come from a correlated subquery so they are not
+        # multiplied by the join used to count companies
+        total_investment = Subquery(
+            Investment.objects.filter(
+                index=OuterRef('pk'),
+                status__in=['ACTIVE', 'VOTED']
+            ).values('index').annotate(total=Sum('amount')).values('total'),
+            output_field=DecimalField(max_digits=20, decimal_places=2)
+        )
+        queryset = Index.objects.defer('search_vector').annotate(
+            company_count=Count('companies', distinct=True),
+            total_investment=Coalesce(total_investment, Decimal('0.00'), output_field=DecimalField(max_digits=20, decimal_places=2))
+        )
+        if self.action != 'list':
+            queryset = queryset.prefetch_related('companies')
         
         # Filter by status
         status = self.request.query_params.get('status', None)
         if status != None:
             queryset = queryset.filter(status=status)
         
-        # Filter by search term
+        # Filter by search term (full-text over name and description)
         search = self.request.query_params.get('search', '')
+        ranked = False
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search)
-            )
+            query = build_search_query(search)
+            if query is None:
+                queryset = queryset.none()
+            else:
+                queryset = queryset.filter(search_vector=query).annotate(
+                    search_rank=SearchRank(F('search_vector'), query)
+                )
+                ranked = True
         
         # Filter by min/max companies
         min_companies = self.request.query_params.get('min_companies', None)
         if min_companies:
-            queryset = queryset.annotate(
-                num_companies=Count('companies')
-            ).filter(num_companies__gte=min_companies)
+            queryset = queryset.filter(company_count__gte=min_companies)
         
         max_companies = self.request.query_params.get('max_companies', None)
         if max_companies:
-            queryset = queryset.annotate(
-                num_companies=Count('companies')
-            ).filter(num_companies__lte=max_companies)
+            queryset = queryset.filter(company_count__lte=max_companies)
         
-        # Order by
-        order_by = self.request.query_params.get('order_by', '-created_at')
+        # Order by; searches default to relevance
+        order_by = self.request.query_params.get('order_by')
         valid_order_fields = ['created_at', '-created_at', 'name', '-name']
         if order_by in valid_order_fields:
             queryset = queryset.order_by(order_by)
+        elif ranked and order_by is None:
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        elif order_by is None:
+            queryset = queryset.order_by('-created_at')
         
         return queryset
 
@@ -110,65 +184,123 @@ class IndexViewSet(viewsets.ModelViewSet):
         index.save()
         return Response(self.get_serializer(index).data)
 
+    @action(detail=True, methods=['get'])
+    def constituents(self, request, pk=None):
+        """
+        Paginated companies of an index.
+        Query params: search (name or symbol), sector, page, page_size.
+        """
+        index = get_object_or_404(Index, pk=pk)
+        companies = index.companies.order_by('name')
+        
+        search = request.query_params.get('search', '')
+        if search:
+            companies = search_companies(companies, search)
+        sector = request.query_params.get('sector')
+        if sector:
+            companies = companies.filter(sector=sector)
+        
+        paginator = ConstituentPagination()
+        with symbol_similarity_threshold():
+            page = paginator.paginate_queryset(companies, request, view=self)
+            return paginator.get_paginated_response(CompanySerializer(page, many=True).data)
+
     @action(detail=True, methods=['get'])
     def companies_stats(self, request, pk=None):
-        """Get statistics about the companies in an index"""
+        """
+        Get statistics about the companies in an index: count, market cap,
+        price mean/min/max, sector weights and concentration (HHI).
+        Cached per index until its constituents or their prices change.
+        """
+        index = get_object_or_404(Index.objects.only('id'), pk=pk)
+        return cached_response(
+            stats_key(index.id),
+            lambda: Response(compute_constituent_stats(index.id))
+        )
+
+    @action(detail=True, methods=['get'])
+    def analytics(self, request, pk=None):
+        """
+        Risk and return of the index basket over daily closes: cumulative and
+        annualized return, annualized volatility, max drawdown, Sharpe ratio
+        and per-constituent contribution.
+        Query params: window (1m, 3m, 6m, 1y or 3y; default 1y).
+        Cached per index and window until the next price refresh.
+        """
+        index = get_object_or_404(Index.objects.only('id', 'current_version'), pk=pk)
+        window = request.query_params.get('window', DEFAULT_WINDOW)
+        if window not in ANALYTICS_WINDOWS:
+            return Response(
+                {'error': f'window must be one of {", ".join(ANALYTICS_WINDOWS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def build():
+            try:
+                result = compute_index_analytics(index, window)
+            except Exception as e:
+                logger.error(f"Error computing analytics for index {index.id}: {str(e)}")
+                return Response(
+                    {'error': f'Error computing analytics: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            if 'error' in result:
+                return Response(result, status=status.HTTP_400_BAD_REQUEST)
+            return Response(result)
+
+        return cached_response(analytics_key(index.id, window), build)
+
+    @action(detail=True, methods=['get'])
+    def nav(self, request, pk=None):
+        """
+        Get the NAV time series of an index's unit basket.
+        Query params: from, to (ISO date or datetime) and resolution (raw, 1h or 1d).
+        """
         index = self.get_object()
-        companies = index.companies.all()
-        
-        # Calculate averages
-        avg_price = companies.aggregate(Avg('current_price'))['current_price__avg'] or 0
-        
-        stats = {
-            'total_companies': companies.count(),
-            'total_market_cap': companies.aggregate(Sum('market_cap'))['market_cap__sum'] or 0,
-            'average_price': avg_price,
-            'highest_price': companies.order_by('-current_price').first(),
-            'lowest_price': companies.order_by('current_price').first(),
-        }
-        
-        # Format the response
-        response_data = {
-            'total_companies': stats['total_companies'],
-            'total_market_cap': stats['total_market_cap'] or 0,
-            'average_price': stats['average_price'],
-        }
-        
-        if stats['highest_price']:
-            response_data['highest_price'] = {
-                'name': stats['highest_price'].name,
-                'symbol': stats['highest_price'].symbol,
-                'price': stats['highest_price'].current_price
-            }
-            
-        if stats['lowest_price']:
-            response_data['lowest_price'] = {
-                'name': stats['lowest_price'].name,
-                'symbol': stats['lowest_price'].symbol,
-                'price': stats['lowest_price'].current_price
-            }
-            
-        return Response(response_data)
+        resolution = request.query_params.get('resolution', 'raw')
+        if resolution not in NAV_RESOLUTIONS:
+            return Response(
+                {'error': f'resolution must be one of {", ".join(NAV_RESOLUTIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            end = parse_history_bound(request.query_params['to']) if 'to' in request.query_params else timezone.now()
+            start = parse_history_bound(request.query_params['from']) if 'from' in request.query_params else end - timedelta(days=30)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'index_id': index.id,
+            'resolution': resolution,
+            'from': start,
+            'to': end,
+            'data': get_nav_history(index, start, end, resolution)
+        })
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Get overall statistics for all indexes"""
-        # Query all indexes and get counts
-        indexes = Index.objects.all()
+        """
+        Get overall statistics for all indexes.
+        Served from the platform counters in one read; approximate=true
+        takes the investment and user totals from Postgres planner
+        statistics instead.
+        """
+        approximate = request.query_params.get('approximate', '').lower() == 'true'
+        counts = read_counters(approximate=approximate)
         
-        # Get statistics
         stats = {
-            'total_indexes': indexes.count(),
-            'active_indexes': indexes.filter(status='ACTIVE').count(),
-            'draft_indexes': indexes.filter(status='DRAFT').count(),
-            'archived_indexes': indexes.filter(status='ARCHIVED').count(),
-            'total_investments': Investment.objects.count(),
-            'total_users': CustomUser.objects.count()
+            'total_indexes': counts[counters.INDEXES],
+            'active_indexes': counts[counters.index_status_counter('ACTIVE')],
+            'draft_indexes': counts[counters.index_status_counter('DRAFT')],
+            'archived_indexes': counts[counters.index_status_counter('ARCHIVED')],
+            'total_investments': counts[counters.INVESTMENTS],
+            'total_users': counts[counters.USERS]
         }
         
         return Response(stats)
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def execute(self, request, pk=None):
         """
         Execute an index after voting is complete.
@@ -178,167 +310,65 @@ class IndexViewSet(viewsets.ModelViewSet):
         3. Update the index to include only those companies
         4. Reallocate all investments to these companies
         5. Change the index status to 'EXECUTED'
+
+        The work runs as a background job: the response is 202 with the job,
+        whose progress is reported at /jobs/{id}/. With dry_run=true (body or
+        query string) the plan and its timing breakdown are returned at once
+        without writing anything. Administrators only, so whoever queued
+        the job can always see it.
         """
         index = self.get_object()
+        dry_run = str(request.data.get('dry_run', request.query_params.get('dry_run', ''))).lower() == 'true'
         
-        # Validate index status
-        if index.status != 'VOTING':
-            return Response(
-                {'error': f'Index must be in voting status to execute. Current status: {index.status}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Get vote counts for companies in this index
-        from voting.models import CompanyVoteCount, Vote
-        
-        # Get all companies that received votes, ordered by vote weight
-        company_votes = CompanyVoteCount.objects.filter(
-            index=index
-        ).order_by('-total_weight')
-        
-        if not company_votes.exists():
-            return Response(
-                {'error': 'No votes have been cast for this index'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # 1. Determine the optimal number of companies to include
-        
-        # Get min and max bounds for the number of companies
-        min_companies = index.min_votes_per_user  # Minimum is the min votes per user
-        max_companies = index.max_votes_per_user  # Maximum is the max votes per user
-        
-        # Check if we even have enough companies with votes
-        total_companies_with_votes = company_votes.count()
-        if total_companies_with_votes < min_companies:
-            return Response(
-                {'error': f'Not enough companies received votes. Need at least {min_companies} companies.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Analyze voting patterns to find the most common number of votes per user
-        # This helps us determine the most natural number of companies to include
-        vote_counts_per_user = {}
-        
-        # First, get all users who voted
-        users_who_voted = Vote.objects.filter(
-            index=index
-        ).values_list('user', flat=True).distinct()
-        
-        # Count how many companies each user voted for
-        for user_id in users_who_voted:
-            companies_voted_by_user = Vote.objects.filter(
-                index=index, 
-                user_id=user_id
-            ).values_list('company', flat=True).distinct().count()
-            
-            if companies_voted_by_user in vote_counts_per_user:
-                vote_counts_per_user[companies_voted_by_user] += 1
-            else:
-                vote_counts_per_user[companies_voted_by_user] = 1
-        
-        # Find the most common pattern (mode of votes per user)
-        mode_votes = min_companies  # Default to min if no clear pattern
-        if vote_counts_per_user:
-            mode_votes = max(vote_counts_per_user.items(), key=lambda x: x[1])[0]
-        
-        # Choose the number of companies based on our rules
-        # 1. At least min_companies
-        # 2. At most max_companies
-        # 3. Prefer the most common voting pattern if within bounds
-        num_companies = max(min(mode_votes, max_companies), min_companies)
-        
-        # Limit to available companies
-        num_companies = min(num_companies, total_companies_with_votes)
-        
-        # 2. Get the top N companies by vote weight
-        top_companies = list(company_votes[:num_companies].values_list('company', flat=True))
-        
-        if not top_companies:
-            return Response(
-                {'error': 'Failed to determine top companies'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Fetch the actual Company objects
-        from companies.models import Company
-        top_companies = Company.objects.filter(id__in=top_companies)
-        
-        # 3. Update the index to include only these companies
-        from django.db import transaction
         try:
-            with transaction.atomic():
-                # Update the index's companies to only include the top voted ones
-                index.companies.clear()
-                index.companies.add(*top_companies)
-                
-                # 4. Reallocate all investments
-                from investments.models import Investment, InvestmentPosition
-                from decimal import Decimal
-                
-                # Get all investments in VOTED status
-                investments = Investment.objects.filter(
-                    index=index, 
-                    status='VOTED'
-                )
-                
-                # Calculate equal weight for each company
-                weight_per_company = Decimal('100.0') / Decimal(len(top_companies))
-                
-                # Reallocate each investment
-                for investment in investments:
-                    # Clear existing positions
-                    investment.positions.all().delete()
-                    
-                    # Create new positions for each top company
-                    for company in top_companies:
-                        # Calculate allocation for this company
-                        amount = (investment.amount * weight_per_company) / Decimal('100.0')
-                        
-                        # Calculate quantity based on current price
-                        quantity = Decimal('0')
-                        if company.current_price and company.current_price > 0:
-                            quantity = amount / company.current_price
-                        
-                        # Create the position
-                        InvestmentPosition.objects.create(
-                            investment=investment,
-                            company=company,
-                            amount=amount,
-                            quantity=quantity,
-                            purchase_price=company.current_price or Decimal('1.0'),
-                            current_price=company.current_price or Decimal('1.0'),
-                            weight=weight_per_company
-                        )
-                    
-                    # Update investment status and current value
-                    investment.status = 'ACTIVE'  # Change back to active from VOTED
-                    investment.update_current_value()
-                
-                # 5. Update index status to executed
-                index.status = 'EXECUTED'
-                index.save()
-                
-                return Response({
-                    'status': 'success',
-                    'message': f'Index execution completed successfully with {len(top_companies)} companies',
-                    'number_of_companies_selected': len(top_companies),
-                    'voting_pattern_analysis': {
-                        'min_votes_per_user': min_companies,
-                        'max_votes_per_user': max_companies,
-                        'most_common_votes_per_user': mode_votes,
-                        'final_selected_count': num_companies,
-                        'vote_distribution': vote_counts_per_user
-                    },
-                    'top_companies': [{'id': c.id, 'name': c.name, 'symbol': c.symbol} for c in top_companies],
-                    'index': self.get_serializer(index).data
-                })
-                
+            if not dry_run:
+                # Validate up front so obvious errors are reported synchronously
+                plan_execution(index)
+                return self._queued(request, 'execute_index', index, 'Index execution queued')
+            result = IndexExecutor(index).execute(dry_run=True)
+        except ExecutionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
+            logger.error(f"Error executing index {index.id}: {str(e)}")
             return Response(
                 {'error': f'Error executing index: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        
+        plan = result['plan']
+        return Response({
+            'status': 'success',
+            'dry_run': True,
+            'message': f'Dry run: execution would select {len(plan.companies)} companies',
+            'number_of_companies_selected': len(plan.companies),
+            'voting_pattern_analysis': plan.analysis(),
+            'top_companies': [{'id': c.id, 'name': c.name, 'symbol': c.symbol} for c in plan.companies],
+            'execution': {
+                'investments': result['investments'],
+                'positions': result['positions'],
+                'weight_per_company': result['weight'],
+                'total_amount': result['total_amount'],
+                'total_value': result['total_value'],
+                'timings_ms': result['timings_ms'],
+                'elapsed_ms': result['elapsed_ms'],
+            },
+        })
+
+    def _queued(self, request, job_type, index, message):
+        """Queue a lifecycle job for index (once) and answer 202 Accepted"""
+        job, created = enqueue(
+            job_type,
+            {'index_id': index.id},
+            dedupe_key=f'{job_type}:{index.id}',
+            user=request.user
+        )
+        return Response({
+            'status': 'success',
+            'message': message if created else 'The same job is already queued or running',
+            'job_id': job.id,
+            'job_url': reverse('job-detail', kwargs={'pk': job.id}),
+            'job': JobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=True, methods=['post'])
     def set_draft(self, request, pk=None):
@@ -368,6 +398,20 @@ class IndexViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Executed indexes keep their final tally in the current version
+        if index.current_version_id:
+            constituents = IndexConstituent.objects.filter(
+                version_id=index.current_version_id, vote_count__gt=0
+            ).select_related('company')
+            return Response([{
+                'company_id': constituent.company.id,
+                'company_name': constituent.company.name,
+                'company_symbol': constituent.company.symbol,
+                'sector': constituent.company.sector,
+                'total_weight': constituent.vote_weight,
+                'vote_count': constituent.vote_count
+            } for constituent in constituents])
+        
         # Get all companies in this index with their vote weights
         from voting.models import CompanyVoteCount
         vote_counts = CompanyVoteCount.objects.filter(index=index).select_related('company')
@@ -387,13 +431,89 @@ class IndexViewSet(viewsets.ModelViewSet):
         
         return Response(data)
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['get'])
+    def versions(self, request, pk=None):
+        """Constituent versions recorded for this index, newest first"""
+        index = get_object_or_404(Index.objects.only('id', 'current_version'), pk=pk)
+        versions = IndexVersion.objects.filter(index=index).order_by('-version')
+        return Response({
+            'index_id': index.id,
+            'current_version': index.current_version_id,
+            'versions': IndexVersionSerializer(
+                versions, many=True, context={'current_version_id': index.current_version_id}
+            ).data
+        })
+
+    @action(detail=True, methods=['get'], url_path=r'versions/(?P<version>\d+)')
+    def version_constituents(self, request, pk=None, version=None):
+        """
+        Constituents of one version in rank order, with their vote tallies
+        and target weights. Query params: selected=true for the winners only.
+        """
+        index_version = get_object_or_404(IndexVersion.objects.select_related('index'), index_id=pk, version=version)
+        constituents = index_version.constituents.select_related('company').order_by('rank')
+        if request.query_params.get('selected', '').lower() == 'true':
+            constituents = constituents.filter(selected=True)
+        
+        return Response({
+            'index_id': index_version.index_id,
+            'version': IndexVersionSerializer(
+                index_version, context={'current_version_id': index_version.index.current_version_id}
+            ).data,
+            'constituents': IndexConstituentSerializer(constituents, many=True).data
+        })
+
+    @action(detail=True, methods=['get'])
+    def vote_distribution(self, request, pk=None):
+        """
+        Voting pattern of this index: how many users voted for each number
+        of companies, and the basket size execution would choose from it.
+        Administrators can pass refresh=true to recount it from the votes.
+        """
+        index = self.get_object()
+        
+        if index.status not in ['VOTING', 'EXECUTED', 'ARCHIVED']:
+            return Response(
+                {'error': f'Vote distribution not available. Index status: {index.status}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            if request.query_params.get('refresh', '').lower() == 'true' and request.user.is_staff:
+                distribution = rebuild_vote_distribution(index)
+            else:
+                distribution = get_vote_distribution(index)
+            companies_with_votes = CompanyVoteCount.objects.filter(index=index).count()
+            mode_votes, num_companies = basket_size(index, distribution, companies_with_votes)
+        except Exception as e:
+            logger.error(f"Error reading vote distribution for index {index.id}: {str(e)}")
+            return Response(
+                {'error': f'Error reading vote distribution: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        return Response({
+            'status': 'success',
+            'index_id': index.id,
+            'total_voters': sum(distribution.values()),
+            'min_votes_per_user': index.min_votes_per_user,
+            'max_votes_per_user': index.max_votes_per_user,
+            'most_common_votes_per_user': mode_votes,
+            'companies_with_votes': companies_with_votes,
+            'final_selected_count': num_companies,
+            'vote_distribution': distribution
+        })
+
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def start_voting(self, request, pk=None):
         """
         Start the voting phase for an index.
         This will:
         1. Change the index status to 'voting'
         2. Mark all active investments as 'VOTED'
+
+        The work runs as a background job; the response is 202 with the job.
+        Administrators only.
         """
         index = self.get_object()
         
@@ -404,31 +524,8 @@ class IndexViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Execute the start of voting inside a transaction
-        from django.db import transaction
         try:
-            with transaction.atomic():
-                # 1. Update all active investments to VOTED status
-                from investments.models import Investment
-                investments = Investment.objects.filter(
-                    index=index, 
-                    status='ACTIVE'
-                )
-                
-                investment_count = investments.count()
-                investments.update(status='VOTED')
-                
-                # 2. Change index status to voting
-                index.status = 'VOTING'
-                index.save()
-                
-                return Response({
-                    'status': 'success',
-                    'message': f'Voting phase started successfully for index {index.name}',
-                    'investments_updated': investment_count,
-                    'index': self.get_serializer(index).data
-                })
-                
+            return self._queued(request, 'start_voting', index, 'Voting phase start queued')
         except Exception as e:
             return Response(
                 {'error': f'Error starting voting phase: {str(e)}'},
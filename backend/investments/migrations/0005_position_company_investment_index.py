@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0004_update_voted_investments'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='investmentposition',
+            index=models.Index(fields=['company', 'investment'], name='position_company_inv_idx'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.db import models
 from django.conf import settings
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
@@ -10,6 +10,9 @@ from django.db import transaction
 from rest_framework import serializers
 import uuid
 
+# Money is stored in cents; halves round away from zero, as PostgreSQL numeric does
+CENT = Decimal('0.01')
+
 class Investment(models.Model):
     STATUS_CHOICES = [
         ('PENDING', _('Pending')),
@@ -144,7 +147,7 @@ class Investment(models.Model):
         if self.current_value and self.amount:
             self.profit_loss = self.current_value - self.amount
             if self.amount > 0:
-                self.profit_loss_percentage = (self.profit_loss / self.amount) * 100
+                self.profit_loss_percentage = ((self.profit_loss / self.amount) * 100).quantize(CENT, rounding=ROUND_HALF_UP)
             return self.profit_loss
         return Decimal('0.00')
 
@@ -160,7 +163,7 @@ class Investment(models.Model):
         )
         
         # If total_value is 0, use the original amount
-        self.current_value = total_value if total_value > 0 else self.amount
+        self.current_value = total_value.quantize(CENT, rounding=ROUND_HALF_UP) if total_value > 0 else self.amount
         self.calculate_profit_loss()
         self.save()
         return self.current_value
@@ -272,6 +275,8 @@ class InvestmentPosition(models.Model):
         verbose_name_plural = _('Investment Positions')
         indexes = [
             models.Index(fields=['investment', 'company']),
+            # Reverse index: which investments hold a given company
+            models.Index(fields=['company', 'investment'], name='position_company_inv_idx'),
         ]
 
     def __str__(self):
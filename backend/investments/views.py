@@ -191,7 +191,8 @@ class InvestmentViewSet(viewsets.ModelViewSet):
         
         # Find vote counts for this index
         try:
-            from voting.models import CompanyVoteCount, Vote
+            from voting.analytics import basket_size, get_vote_distribution
+            from voting.models import CompanyVoteCount
             
             # Check if index is in voting or has completed voting
             if investment.index.status not in ['VOTING', 'EXECUTED']:
@@ -222,39 +223,16 @@ class InvestmentViewSet(viewsets.ModelViewSet):
                     'error': f'Not enough companies received votes. Need at least {min_companies} companies.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Analyze voting patterns to find the most common number of votes per user
-            vote_counts_per_user = {}
-            
-            # First, get all users who voted
-            users_who_voted = Vote.objects.filter(
-                index=investment.index
-            ).values_list('user', flat=True).distinct()
-            
-            # Count how many companies each user voted for
-            for user_id in users_who_voted:
-                companies_voted_by_user = Vote.objects.filter(
-                    index=investment.index, 
-                    user_id=user_id
-                ).values_list('company', flat=True).distinct().count()
-                
-                if companies_voted_by_user in vote_counts_per_user:
-                    vote_counts_per_user[companies_voted_by_user] += 1
-                else:
-                    vote_counts_per_user[companies_voted_by_user] = 1
-            
-            # Find the most common pattern (mode of votes per user)
-            mode_votes = min_companies  # Default to min if no clear pattern
-            if vote_counts_per_user:
-                mode_votes = max(vote_counts_per_user.items(), key=lambda x: x[1])[0]
-            
-            # Choose the number of companies based on our rules
+            # Analyze voting patterns to find the most common number of votes per user,
+            # then choose the number of companies based on our rules
             # 1. At least min_companies
             # 2. At most max_companies
             # 3. Prefer the most common voting pattern if within bounds
-            num_companies = max(min(mode_votes, max_companies), min_companies)
-            
-            # Limit to available companies
-            num_companies = min(num_companies, total_companies_with_votes)
+            # 4. Limit to available companies
+            vote_counts_per_user = get_vote_distribution(investment.index)
+            mode_votes, num_companies = basket_size(
+                investment.index, vote_counts_per_user, total_companies_with_votes
+            )
             
             # 2. Get the top N companies by vote weight
             top_companies = list(company_votes[:num_companies])
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'job_type', 'status', 'processed', 'total', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['job_type', 'status']
+    ordering = ['-created_at']
+    readonly_fields = ['checkpoint', 'result', 'error', 'locked_by', 'heartbeat_at', 'started_at', 'finished_at']
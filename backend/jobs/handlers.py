@@ -0,0 +1,132 @@
+import logging
+from django.db import transaction
+from accounts.replay import PortfolioReplayer
+from accounts.snapshots import snapshot_portfolios
+from companies.history import parse_history_bound
+from indexes.counters import reconcile_counters as reconcile_platform_counters
+from indexes.execution import IndexExecutor, plan_execution
+from indexes.lifecycle import LifecycleError, start_voting as start_index_voting
+from indexes.models import Index
+from updates.revaluation import revalue_investments
+from .queue import save_checkpoint
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentJobError(Exception):
+    """The job cannot succeed; it is failed without further attempts"""
+
+
+def _index(job):
+    index = Index.objects.filter(pk=job.params.get('index_id')).first()
+    if index is None:
+        raise PermanentJobError(f"Index {job.params.get('index_id')} does not exist")
+    return index
+
+
+def execute_index(job, progress):
+    """
+    Execute a voted index. The selected companies are saved in the job
+    checkpoint before any write, so a retry reallocates the remaining
+    investments into the same basket.
+    """
+    index = _index(job)
+    if index.status == 'EXECUTED':
+        # An earlier attempt (or another request) already finished the work
+        return {'index_id': index.id, 'skipped': 'Index is already executed'}
+
+    try:
+        company_ids = job.checkpoint.get('company_ids')
+        if company_ids is None:
+            company_ids = [company.id for company in plan_execution(index).companies]
+            save_checkpoint(job, company_ids=company_ids)
+        result = IndexExecutor(index, progress=progress).execute(company_ids=company_ids)
+    except LifecycleError as e:
+        raise PermanentJobError(str(e)) from e
+
+    plan = result['plan']
+    return {
+        'index_id': index.id,
+        'company_ids': company_ids,
+        'voting_pattern_analysis': plan.analysis(),
+        'investments': result['investments'],
+        'positions': result['positions'],
+        'weight_per_company': str(result['weight']),
+        'total_amount': str(result['total_amount']),
+        'total_value': str(result['total_value']),
+        'timings_ms': result['timings_ms'],
+        'elapsed_ms': result['elapsed_ms'],
+    }
+
+
+def start_voting(job, progress):
+    """Move an index to VOTING; re-running marks only investments still ACTIVE"""
+    index = _index(job)
+    try:
+        updated = start_index_voting(index, progress=progress)
+    except LifecycleError as e:
+        raise PermanentJobError(str(e)) from e
+    return {'index_id': index.id, 'investments_updated': updated}
+
+
+def revaluation(job, progress):
+    """Revalue investments at current prices; recomputing is naturally idempotent"""
+    try:
+        result = revalue_investments(
+            status=job.params.get('status', 'ACTIVE'),
+            company_ids=job.params.get('company_ids'),
+            engine=job.params.get('engine')
+        )
+    except ValueError as e:
+        raise PermanentJobError(str(e)) from e
+    progress(result.investments_updated, result.investments_updated)
+    return result.as_dict()
+
+
+def portfolio_snapshot(job, progress):
+    """
+    Refresh portfolio totals and append a history point. The checkpoint is
+    written in the snapshot's transaction, so a retry after a crash never
+    appends the same point twice.
+    """
+    if 'rows_written' in job.checkpoint:
+        return {'rows_written': job.checkpoint['rows_written'], 'skipped': 'Snapshot already written'}
+    with transaction.atomic():
+        rows_written = snapshot_portfolios(job.params.get('company_ids'))
+        save_checkpoint(job, rows_written=rows_written)
+    progress(rows_written, rows_written)
+    return {'rows_written': rows_written}
+
+
+def portfolio_replay(job, progress):
+    """Rebuild portfolio history over a date range; resumes from the replay checkpoint"""
+    params = job.params
+    try:
+        start = parse_history_bound(params['from'])
+        end = parse_history_bound(params['to'])
+    except (KeyError, TypeError, ValueError) as e:
+        raise PermanentJobError(f"portfolio_replay needs ISO 'from' and 'to' dates: {e}") from e
+    if start >= end:
+        raise PermanentJobError("'from' must be before 'to'")
+
+    checkpoint = PortfolioReplayer(
+        start, end, params.get('first_user_id'), params.get('last_user_id')
+    ).run()
+    progress(checkpoint.rows_written, checkpoint.rows_written)
+    return {'key': checkpoint.key, 'rows_written': checkpoint.rows_written, 'finished': checkpoint.finished}
+
+
+def reconcile_counters(job, progress):
+    """Recount the platform counters; reports the drift that was corrected"""
+    drift = reconcile_platform_counters()
+    return {'drift': drift}
+
+
+HANDLERS = {
+    'execute_index': execute_index,
+    'start_voting': start_voting,
+    'revaluation': revaluation,
+    'portfolio_snapshot': portfolio_snapshot,
+    'portfolio_replay': portfolio_replay,
+    'reconcile_counters': reconcile_counters,
+}
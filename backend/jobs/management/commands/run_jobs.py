@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from jobs.handlers import HANDLERS
+from jobs.worker import JobWorker
+
+
+class Command(BaseCommand):
+    help = 'Run the background job worker in the foreground'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run at most one due job and exit')
+        parser.add_argument('--burst', action='store_true', help='Run due jobs until the queue is empty, then exit')
+        parser.add_argument('--types', help=f"Comma-separated job types to run (default all: {', '.join(HANDLERS)})")
+        parser.add_argument('--worker-id', help='Name recorded on claimed jobs (default host:pid)')
+        parser.add_argument('--poll-interval', type=float, default=None, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        job_types = None
+        if options['types']:
+            job_types = [job_type.strip() for job_type in options['types'].split(',') if job_type.strip()]
+            unknown = [job_type for job_type in job_types if job_type not in HANDLERS]
+            if unknown:
+                raise CommandError(f"Unknown job types: {', '.join(unknown)}")
+
+        worker = JobWorker(worker_id=options['worker_id'], job_types=job_types, poll_interval=options['poll_interval'])
+
+        if options['once']:
+            job = worker.run_once()
+            if job is None:
+                self.stdout.write('No job due')
+            else:
+                job.refresh_from_db()
+                self.stdout.write(f"Job {job.pk} ({job.job_type}): {job.status}")
+            return
+
+        try:
+            worker.run_forever(burst=options['burst'])
+        except KeyboardInterrupt:
+            worker.stop()
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='job_type',
+            field=models.CharField(choices=[('execute_index', 'Execute index'), ('start_voting', 'Start voting'), ('revaluation', 'Revaluation'), ('portfolio_snapshot', 'Portfolio snapshot'), ('portfolio_replay', 'Portfolio history replay'), ('reconcile_counters', 'Reconcile platform counters')], max_length=50),
+        ),
+    ]
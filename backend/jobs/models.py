@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A unit of background work, queued in the database and run by the
+    run_jobs worker. processed/total report progress while it runs and
+    checkpoint keeps whatever a retry needs to resume idempotently.
+    """
+    TYPE_CHOICES = [
+        ('execute_index', 'Execute index'),
+        ('start_voting', 'Start voting'),
+        ('revaluation', 'Revaluation'),
+        ('portfolio_snapshot', 'Portfolio snapshot'),
+        ('portfolio_replay', 'Portfolio history replay'),
+        ('reconcile_counters', 'Reconcile platform counters'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['queued', 'running']
+
+    job_type = models.CharField(max_length=50, choices=TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    params = models.JSONField(default=dict, blank=True)
+    # At most one queued or running job per key, e.g. execute_index:12
+    dedupe_key = models.CharField(max_length=100, blank=True, default='')
+    checkpoint = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=Q(status__in=['queued', 'running']) & ~Q(dedupe_key=''),
+                name='job_active_dedupe_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.job_type} job {self.pk} ({self.status})"
+
+    @property
+    def progress(self):
+        """Fraction of the work done, when the total is known"""
+        if self.status == 'succeeded':
+            return 1.0
+        if not self.total:
+            return None
+        return round(min(self.processed / self.total, 1.0), 4)
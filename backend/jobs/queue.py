@@ -0,0 +1,132 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(job_type, params=None, dedupe_key='', user=None, max_attempts=None, run_after=None):
+    """
+    Queue a job and return (job, created).
+
+    While a job with the same dedupe_key is queued or running that job is
+    returned instead, so repeated requests (double clicks, retried HTTP
+    calls) queue the work only once.
+    """
+    if dedupe_key:
+        existing = Job.objects.filter(dedupe_key=dedupe_key, status__in=Job.ACTIVE_STATUSES).first()
+        if existing is not None:
+            return existing, False
+
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(
+                job_type=job_type,
+                params=params or {},
+                dedupe_key=dedupe_key,
+                created_by=user if user is not None and user.is_authenticated else None,
+                max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+                run_after=run_after or timezone.now()
+            )
+    except IntegrityError:
+        # A concurrent request queued the same key first
+        return Job.objects.get(dedupe_key=dedupe_key, status__in=Job.ACTIVE_STATUSES), False
+
+    logger.info(f"Queued {job_type} job {job.pk}")
+    return job, True
+
+
+def claim_next(worker_id, job_types=None):
+    """
+    Lock the next due job, mark it running and return it (None when idle).
+    SKIP LOCKED lets any number of workers poll the same table.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = Job.objects.select_for_update(skip_locked=True).filter(status='queued', run_after__lte=now)
+        if job_types:
+            jobs = jobs.filter(job_type__in=job_types)
+        job = jobs.order_by('run_after', 'pk').first()
+        if job is None:
+            return None
+
+        job.status = 'running'
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.heartbeat_at = now
+        job.started_at = job.started_at or now
+        job.save(update_fields=['status', 'attempts', 'locked_by', 'heartbeat_at', 'started_at'])
+    return job
+
+
+def requeue_stale(lease_seconds=None):
+    """
+    Recover jobs whose worker stopped sending heartbeats: they are queued
+    again, or failed once they used up their attempts. Returns the count.
+    """
+    cutoff = timezone.now() - timedelta(seconds=lease_seconds or settings.JOB_LEASE_SECONDS)
+    stale = Job.objects.filter(status='running', heartbeat_at__lt=cutoff)
+    recovered = 0
+    for job in stale.only('pk', 'attempts', 'max_attempts', 'locked_by'):
+        if job.attempts >= job.max_attempts:
+            changes = {'status': 'failed', 'error': f'Worker {job.locked_by} stopped responding', 'finished_at': timezone.now()}
+        else:
+            changes = {'status': 'queued', 'error': f'Worker {job.locked_by} stopped responding, retrying'}
+        # Matching locked_by skips jobs that a live worker touched meanwhile
+        recovered += Job.objects.filter(
+            pk=job.pk, status='running', locked_by=job.locked_by, heartbeat_at__lt=cutoff
+        ).update(locked_by='', **changes)
+    if recovered:
+        logger.warning(f"Recovered {recovered} stale jobs")
+    return recovered
+
+
+def heartbeat(job, worker_id):
+    """Extend the lease of a running job; False once the worker lost it"""
+    return bool(
+        Job.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(heartbeat_at=timezone.now())
+    )
+
+
+def report_progress(job, worker_id, processed, total=None):
+    """Store progress (and renew the lease) for a running job"""
+    changes = {'processed': processed, 'heartbeat_at': timezone.now()}
+    if total is not None:
+        changes['total'] = total
+    Job.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(**changes)
+    job.processed = processed
+    if total is not None:
+        job.total = total
+
+
+def save_checkpoint(job, **values):
+    """Merge values into the job checkpoint; retries of the job see them"""
+    job.checkpoint = {**job.checkpoint, **values}
+    Job.objects.filter(pk=job.pk).update(checkpoint=job.checkpoint)
+
+
+def complete(job, worker_id, result):
+    """Mark a job succeeded with its result"""
+    changes = {'status': 'succeeded', 'result': result or {}, 'error': '', 'finished_at': timezone.now()}
+    if job.total is not None:
+        changes['processed'] = job.total
+    return Job.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(**changes)
+
+
+def fail(job, worker_id, error, retry=True):
+    """
+    Record a failed attempt. Retryable failures are queued again after an
+    exponential backoff until max_attempts is reached.
+    """
+    now = timezone.now()
+    if retry and job.attempts < job.max_attempts:
+        delay = settings.JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+        changes = {'status': 'queued', 'run_after': now + timedelta(seconds=delay), 'locked_by': ''}
+        logger.warning(f"Job {job.pk} attempt {job.attempts} failed, retrying in {delay}s: {error}")
+    else:
+        changes = {'status': 'failed', 'finished_at': now}
+        logger.error(f"Job {job.pk} failed after {job.attempts} attempts: {error}")
+    return Job.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(error=error, **changes)
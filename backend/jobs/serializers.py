@@ -0,0 +1,26 @@
+from rest_framework import serializers
+from .models import Job
+
+class JobSerializer(serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            'id',
+            'job_type',
+            'status',
+            'params',
+            'processed',
+            'total',
+            'progress',
+            'attempts',
+            'max_attempts',
+            'result',
+            'error',
+            'run_after',
+            'created_at',
+            'started_at',
+            'finished_at'
+        ]
+        read_only_fields = fields
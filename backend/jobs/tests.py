@@ -0,0 +1,149 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import CustomUser
+from companies.models import Company
+from indexes.models import Index
+from investments.models import Investment, InvestmentPosition
+from .handlers import HANDLERS, PermanentJobError
+from .models import Job
+from .queue import claim_next, enqueue, requeue_stale
+from .worker import JobWorker
+
+
+class JobQueueTests(TestCase):
+    """Queueing, retry and lease recovery of background jobs"""
+
+    def setUp(self):
+        self.worker = JobWorker(worker_id='test-worker')
+
+    def run_due(self, job):
+        """Make a job due now and run it"""
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.worker.run_once()
+        job.refresh_from_db()
+        return job
+
+    def test_enqueue_returns_the_active_job_for_a_key(self):
+        first, created = enqueue('revaluation', dedupe_key='revaluation:all')
+        second, created_again = enqueue('revaluation', dedupe_key='revaluation:all')
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first.pk, second.pk)
+
+        Job.objects.filter(pk=first.pk).update(status='succeeded')
+        third, created = enqueue('revaluation', dedupe_key='revaluation:all')
+        self.assertTrue(created)
+        self.assertNotEqual(third.pk, first.pk)
+
+    def test_failures_are_retried_with_backoff_until_max_attempts(self):
+        job, created = enqueue('revaluation', max_attempts=2)
+        with mock.patch.dict(HANDLERS, {'revaluation': mock.Mock(side_effect=RuntimeError('boom'))}):
+            job = self.run_due(job)
+            self.assertEqual((job.status, job.attempts), ('queued', 1))
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertIsNone(claim_next('other-worker'))
+
+            job = self.run_due(job)
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIn('boom', job.error)
+
+    def test_permanent_errors_are_not_retried(self):
+        job, created = enqueue('revaluation')
+        with mock.patch.dict(HANDLERS, {'revaluation': mock.Mock(side_effect=PermanentJobError('bad params'))}):
+            job = self.run_due(job)
+        self.assertEqual((job.status, job.attempts), ('failed', 1))
+
+    def test_success_stores_the_result(self):
+        job, created = enqueue('revaluation')
+        with mock.patch.dict(HANDLERS, {'revaluation': mock.Mock(return_value={'investments_updated': 3})}):
+            job = self.run_due(job)
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.result, {'investments_updated': 3})
+
+    def test_jobs_of_a_dead_worker_are_requeued(self):
+        job, created = enqueue('revaluation', max_attempts=2)
+        claimed = claim_next('dead-worker')
+        self.assertEqual(claimed.pk, job.pk)
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale(lease_seconds=60), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ('queued', ''))
+
+        claim_next('dead-worker')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        requeue_stale(lease_seconds=60)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+
+class IndexLifecycleJobTests(TestCase):
+    """execute and start_voting queue jobs that the worker runs once"""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.user = CustomUser.objects.create_user('user', 'user@example.com', 'password')
+        self.companies = [
+            Company.objects.create(name=f'Company {symbol}', symbol=symbol, current_price=Decimal('10.00'))
+            for symbol in ['AAA', 'BBB', 'CCC', 'DDD']
+        ]
+        self.index = Index.objects.create(
+            name='Index', description='Test index', status='ACTIVE', min_votes_per_user=1, max_votes_per_user=3
+        )
+        self.index.companies.set(self.companies)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def run_jobs(self):
+        JobWorker(worker_id='test-worker').run_forever(burst=True)
+
+    def test_lifecycle_actions_are_for_administrators(self):
+        client = self.client_for(self.user)
+        self.assertEqual(client.post(f'/indexes/{self.index.pk}/start_voting/').status_code, 403)
+        self.assertEqual(client.post(f'/indexes/{self.index.pk}/execute/').status_code, 403)
+
+    def test_voting_and_execution_run_once(self):
+        admin = self.client_for(self.admin)
+        response = admin.post(f'/indexes/{self.index.pk}/start_voting/')
+        self.assertEqual(response.status_code, 202)
+        self.run_jobs()
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.status, 'VOTING')
+
+        self.investment = Investment.objects.create(
+            user=self.user, index=self.index, amount=Decimal('300.00'), status='ACTIVE'
+        )
+        response = self.client_for(self.user).post('/voting/votes/submit_votes/', {
+            'index_id': self.index.id,
+            'investment_id': self.investment.id,
+            'company_ids': [company.id for company in self.companies[:2]],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        response = admin.post(f'/indexes/{self.index.pk}/execute/')
+        self.assertEqual(response.status_code, 202)
+        again = admin.post(f'/indexes/{self.index.pk}/execute/')
+        self.assertEqual(again.data['job_id'], response.data['job_id'])
+        self.run_jobs()
+
+        job = admin.get(f"/jobs/{response.data['job_id']}/").data
+        self.assertEqual(job['status'], 'succeeded')
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.status, 'EXECUTED')
+        positions = InvestmentPosition.objects.filter(investment=self.investment)
+        self.assertEqual(sorted(positions.values_list('company__symbol', flat=True)), ['AAA', 'BBB'])
+
+        # A retried job finds the work done and leaves the positions alone
+        retry, created = enqueue('execute_index', {'index_id': self.index.id})
+        self.run_jobs()
+        retry.refresh_from_db()
+        self.assertEqual(retry.status, 'succeeded')
+        self.assertIn('skipped', retry.result)
+        self.assertEqual(positions.count(), 2)
@@ -0,0 +1,80 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import permissions, status
+from .models import Job
+from .queue import enqueue
+from .serializers import JobSerializer
+
+# Job types that may be queued directly; index lifecycle jobs are queued
+# by their index endpoints, which validate the index first
+DIRECT_JOB_TYPES = ['revaluation', 'portfolio_snapshot', 'portfolio_replay', 'reconcile_counters']
+
+
+def visible_jobs(user):
+    """Staff see every job, other users the jobs they started"""
+    jobs = Job.objects.all()
+    if not user.is_staff:
+        jobs = jobs.filter(created_by=user)
+    return jobs
+
+
+class JobListView(APIView):
+    """
+    GET: recent jobs. Query params: type, status, limit (default 50, max 500).
+    POST (admin): queue a revaluation, portfolio_snapshot, portfolio_replay
+    or reconcile_counters job from {"job_type": ..., "params": {...}}.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), 500)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+
+        jobs = visible_jobs(request.user)
+        if request.query_params.get('type'):
+            jobs = jobs.filter(job_type=request.query_params['type'])
+        if request.query_params.get('status'):
+            jobs = jobs.filter(status=request.query_params['status'])
+        return Response({
+            'status': 'success',
+            'jobs': JobSerializer(jobs[:limit], many=True).data
+        })
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return Response({'error': 'Only administrators can queue jobs'}, status=status.HTTP_403_FORBIDDEN)
+
+        job_type = request.data.get('job_type')
+        params = request.data.get('params') or {}
+        if job_type not in DIRECT_JOB_TYPES:
+            return Response({
+                'error': f"job_type must be one of: {', '.join(DIRECT_JOB_TYPES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(params, dict):
+            return Response({'error': 'params must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            job, created = enqueue(job_type, params, dedupe_key=request.data.get('dedupe_key', ''), user=request.user)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({
+            'status': 'success',
+            'message': f'{job_type} job queued' if created else f'{job_type} job already queued',
+            'job_id': job.id,
+            'job': JobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class JobDetailView(APIView):
+    """Status, progress (processed/total) and result of one job"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        job = visible_jobs(request.user).filter(pk=pk).first()
+        if job is None:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(JobSerializer(job).data)
@@ -0,0 +1,114 @@
+import logging
+import os
+import socket
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from .handlers import HANDLERS, PermanentJobError
+from .queue import claim_next, complete, fail, heartbeat, report_progress, requeue_stale
+
+logger = logging.getLogger(__name__)
+
+
+class Heartbeat(threading.Thread):
+    """
+    Renews the lease of a running job from a side thread (with its own
+    database connection) while the handler is busy in a long statement.
+    """
+
+    def __init__(self, job, worker_id, interval):
+        super().__init__(daemon=True)
+        self.job = job
+        self.worker_id = worker_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    if not heartbeat(self.job, self.worker_id):
+                        logger.warning(f"Job {self.job.pk} is no longer held by {self.worker_id}")
+                        return
+                except Exception as e:
+                    logger.warning(f"Heartbeat for job {self.job.pk} failed: {str(e)}")
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class JobWorker:
+    """
+    Runs queued jobs one at a time.
+
+    Every poll first recovers jobs whose worker stopped sending heartbeats,
+    then claims the next due job. Handler failures are retried with backoff
+    up to the job's max_attempts; PermanentJobError fails the job at once.
+    """
+
+    def __init__(self, worker_id=None, job_types=None, poll_interval=None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.job_types = job_types
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self.running = False
+
+    def run_once(self):
+        """Run the next due job, if any; returns it"""
+        requeue_stale()
+        job = claim_next(self.worker_id, self.job_types)
+        if job is None:
+            return None
+        self.run(job)
+        return job
+
+    def run(self, job):
+        handler = HANDLERS.get(job.job_type)
+        if handler is None:
+            fail(job, self.worker_id, f"Unknown job type: {job.job_type}", retry=False)
+            return
+
+        def progress(processed, total=None):
+            report_progress(job, self.worker_id, processed, total)
+
+        logger.info(f"Running {job.job_type} job {job.pk} (attempt {job.attempts}/{job.max_attempts})")
+        started = time.perf_counter()
+        beat = Heartbeat(job, self.worker_id, settings.JOB_HEARTBEAT_INTERVAL)
+        beat.start()
+        try:
+            result = handler(job, progress)
+        except PermanentJobError as e:
+            fail(job, self.worker_id, str(e), retry=False)
+        except Exception as e:
+            logger.exception(f"Job {job.pk} raised: {str(e)}")
+            fail(job, self.worker_id, f"{type(e).__name__}: {str(e)}", retry=True)
+        else:
+            complete(job, self.worker_id, result)
+            logger.info(f"Job {job.pk} succeeded in {(time.perf_counter() - started) * 1000:.0f} ms")
+        finally:
+            beat.stop()
+
+    def run_forever(self, burst=False):
+        """Poll until stopped; with burst, exit as soon as the queue is empty"""
+        self.running = True
+        logger.info(f"Job worker {self.worker_id} started")
+        while self.running:
+            try:
+                job = self.run_once()
+            except Exception as e:
+                logger.exception(f"Job worker error: {str(e)}")
+                job = None
+            finally:
+                # Workers live for days; don't keep a connection the server may drop
+                connection.close_if_unusable_or_obsolete()
+            if job is None:
+                if burst:
+                    break
+                time.sleep(self.poll_interval)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    def stop(self):
+        self.running = False
@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import UpdateLog, UpdateRun, UpdateSpan
 
-# Register your models here.
+class UpdateSpanInline(admin.TabularInline):
+    model = UpdateSpan
+    extra = 0
+    readonly_fields = ['phase', 'started_at', 'duration_ms', 'rows_read', 'rows_written', 'errors', 'extra']
+
+@admin.register(UpdateRun)
+class UpdateRunAdmin(admin.ModelAdmin):
+    list_display = ['update_type', 'trigger', 'status', 'started_at', 'duration_ms']
+    list_filter = ['update_type', 'trigger', 'status']
+    ordering = ['-started_at']
+    inlines = [UpdateSpanInline]
+
+@admin.register(UpdateLog)
+class UpdateLogAdmin(admin.ModelAdmin):
+    list_display = ['update_type', 'status', 'last_updated']
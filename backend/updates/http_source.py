@@ -0,0 +1,310 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from urllib.parse import quote, urlsplit
+from django.conf import settings
+from django.utils import timezone
+from companies.models import Company
+from .runs import percentile
+from .sources import PriceSource, quotes_from_json
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the fetch latency histogram buckets
+LATENCY_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class QuoteFetchError(Exception):
+    """A quote request failed; retryable errors are retried with backoff"""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LatencyHistogram:
+    """
+    Latencies of every request attempt of one fetch, bucketed for storage on
+    the run span. Failed attempts are included and also counted by outcome
+    ('ok', 'error' or 'timeout'), so a run full of timeouts does not look fast.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.samples = []
+        self.outcomes = {'ok': 0, 'error': 0, 'timeout': 0}
+
+    def observe(self, elapsed_ms, outcome='ok'):
+        self.samples.append(elapsed_ms)
+        self.outcomes[outcome] += 1
+
+    def as_dict(self):
+        counts = {f'le_{bound}': 0 for bound in self.buckets}
+        counts['inf'] = 0
+        for sample in self.samples:
+            bound = next((b for b in self.buckets if sample <= b), None)
+            counts[f'le_{bound}' if bound is not None else 'inf'] += 1
+        return {
+            'count': len(self.samples),
+            'outcomes': dict(self.outcomes),
+            'buckets': counts,
+            'p50': percentile(self.samples, 50),
+            'p90': percentile(self.samples, 90),
+            'p99': percentile(self.samples, 99),
+            'max': max(self.samples) if self.samples else None,
+        }
+
+
+class ConnectionPool:
+    """Idle keep-alive connections to one host, reused across requests"""
+
+    def __init__(self, host, port, use_ssl, size):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.size = size
+        self.idle = []
+        self.opened = 0
+
+    async def acquire(self):
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.use_ssl or None)
+
+    def release(self, connection, reusable):
+        reader, writer = connection
+        if reusable and len(self.idle) < self.size and not writer.is_closing():
+            self.idle.append(connection)
+        else:
+            writer.close()
+
+    def close(self):
+        for reader, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, headers, body)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise QuoteFetchError('Connection closed before response')
+    parts = status_line.decode('latin-1').split(' ', 2)
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise QuoteFetchError(f"Malformed status line: {status_line!r}")
+    status = int(parts[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                await reader.readline()  # Trailing CRLF
+                break
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+        body = bytes(body)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+        headers['connection'] = 'close'
+    return status, headers, body
+
+
+class AsyncQuoteClient:
+    """
+    Minimal asyncio HTTP/1.1 client for quote APIs.
+
+    A semaphore bounds the number of requests in flight, each host keeps a
+    pool of keep-alive connections, and failed requests are retried with
+    exponential backoff and jitter, without holding a slot while waiting.
+    """
+
+    def __init__(self, concurrency, retries, backoff, timeout, headers=None):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.pools = {}
+        self.histogram = LatencyHistogram()
+        self.retried = 0
+
+    def _pool(self, parts):
+        use_ssl = parts.scheme == 'https'
+        port = parts.port or (443 if use_ssl else 80)
+        key = (parts.hostname, port, use_ssl)
+        if key not in self.pools:
+            self.pools[key] = ConnectionPool(parts.hostname, port, use_ssl, self.concurrency)
+        return self.pools[key]
+
+    async def _exchange(self, pool, request):
+        """Send one request on a pooled connection; returns (status, body)"""
+        connection = await pool.acquire()
+        try:
+            reader, writer = connection
+            writer.write(request)
+            await writer.drain()
+            status, headers, body = await read_response(reader)
+        except BaseException:
+            # Includes the cancellation from a timeout: the connection is in an unknown state
+            pool.release(connection, reusable=False)
+            raise
+        pool.release(connection, reusable=headers.get('connection', '').lower() != 'close')
+        return status, body
+
+    async def _request(self, url):
+        parts = urlsplit(url)
+        pool = self._pool(parts)
+        target = parts.path or '/'
+        if parts.query:
+            target += f'?{parts.query}'
+        lines = [f'GET {target} HTTP/1.1', f'Host: {parts.netloc}', 'Connection: keep-alive',
+                 'Accept: application/json']
+        lines += [f'{name}: {value}' for name, value in self.headers.items()]
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            # Connecting, writing and reading share one deadline, so a stalled peer can't hang the fetch
+            status, body = await asyncio.wait_for(self._exchange(pool, request), self.timeout)
+            if status == 200:
+                outcome = 'ok'
+        except asyncio.TimeoutError as e:
+            # Caught first: TimeoutError is an OSError
+            outcome = 'timeout'
+            raise QuoteFetchError(f"{type(e).__name__} after {self.timeout}s")
+        except (OSError, EOFError, ValueError) as e:
+            raise QuoteFetchError(f"{type(e).__name__}: {e}")
+        finally:
+            self.histogram.observe(round((time.perf_counter() - started) * 1000, 2), outcome)
+
+        if status != 200:
+            raise QuoteFetchError(f"HTTP {status} from {parts.netloc}", retryable=status in RETRYABLE_STATUSES)
+        return body
+
+    async def get_json(self, url):
+        for attempt in range(self.retries + 1):
+            try:
+                # A slot is held only while the request is in flight, never during the backoff
+                async with self.semaphore:
+                    body = await self._request(url)
+                return json.loads(body)
+            except QuoteFetchError as e:
+                if not e.retryable or attempt == self.retries:
+                    raise
+                self.retried += 1
+                delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.debug(f"Retrying {url} in {delay:.2f}s after {e}")
+                await asyncio.sleep(delay)
+            except ValueError as e:
+                raise QuoteFetchError(f"Invalid JSON from {url}: {e}", retryable=False)
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+
+
+class HttpPriceSource(PriceSource):
+    """
+    Fetches quotes for the company catalog from an HTTP quote API.
+
+    Symbols are requested in batches as GET {url}?symbols=A,B,C, many
+    batches in flight at once. The response may use any layout accepted by
+    quotes_from_json. Batches that still fail after retries are skipped
+    and counted; the fetch only fails when every batch did.
+    """
+    name = 'http'
+
+    def __init__(self, url, batch_size=100, concurrency=8, retries=3, backoff=0.5, timeout=10,
+                 symbols=None, headers=None):
+        self.url = url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.symbols = symbols
+        self.headers = headers
+        self.stats = None
+
+    @classmethod
+    def from_settings(cls):
+        if not settings.PRICE_SOURCE_URL:
+            raise ValueError('PRICE_SOURCE_URL must be set to use HttpPriceSource')
+        headers = {}
+        if settings.PRICE_SOURCE_API_KEY:
+            headers['Authorization'] = f'Bearer {settings.PRICE_SOURCE_API_KEY}'
+        return cls(
+            settings.PRICE_SOURCE_URL,
+            batch_size=settings.PRICE_HTTP_BATCH_SIZE,
+            concurrency=settings.PRICE_HTTP_CONCURRENCY,
+            retries=settings.PRICE_HTTP_RETRIES,
+            backoff=settings.PRICE_HTTP_BACKOFF,
+            timeout=settings.PRICE_HTTP_TIMEOUT,
+            headers=headers
+        )
+
+    def batch_urls(self, symbols):
+        separator = '&' if '?' in self.url else '?'
+        return [
+            f"{self.url}{separator}symbols={quote(','.join(symbols[offset:offset + self.batch_size]), safe=',')}"
+            for offset in range(0, len(symbols), self.batch_size)
+        ]
+
+    def fetch(self):
+        symbols = self.symbols
+        if symbols is None:
+            symbols = list(Company.objects.filter(is_active=True).order_by('symbol').values_list('symbol', flat=True))
+        if not symbols:
+            return []
+        return asyncio.run(self._fetch_all(self.batch_urls(symbols)))
+
+    async def _fetch_all(self, urls):
+        started = time.perf_counter()
+        fetched_at = timezone.now()
+        client = AsyncQuoteClient(self.concurrency, self.retries, self.backoff, self.timeout, self.headers)
+        try:
+            results = await asyncio.gather(*[client.get_json(url) for url in urls], return_exceptions=True)
+        finally:
+            client.close()
+
+        quotes = []
+        failed = 0
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                failed += 1
+                logger.warning(f"Quote batch failed: {result}")
+                continue
+            quotes.extend(quotes_from_json(result, fetched_at))
+
+        self.stats = {
+            'requests': len(urls),
+            'failed_requests': failed,
+            'retries': client.retried,
+            'connections': sum(pool.opened for pool in client.pools.values()),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+            'latency_ms': client.histogram.as_dict(),
+        }
+        if urls and failed == len(urls):
+            raise QuoteFetchError(f"All {failed} quote requests failed")
+        return quotes
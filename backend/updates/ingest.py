@@ -0,0 +1,266 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, Value, When
+from django.db.models.functions import Round
+from django.utils import timezone
+from companies.models import Company
+from companies.history import record_ticks
+from .signals import prices_changed
+from .sources import PRICE_QUANTUM
+
+logger = logging.getLogger(__name__)
+
+# Re-read rows slightly older than the snapshot watermark to tolerate clock skew between writers
+SNAPSHOT_OVERLAP = timedelta(minutes=1)
+
+
+class PhaseStats:
+    """Row and error counts reported by the code running inside a phase"""
+
+    def __init__(self, name, started_at):
+        self.name = name
+        self.started_at = started_at
+        self.duration_ms = 0
+        self.rows_read = 0
+        self.rows_written = 0
+        self.errors = 0
+        self.extra = {}
+
+
+class PhaseTimer:
+    """Collects wall-clock timings (in milliseconds) and row counts for named phases of a run"""
+
+    def __init__(self):
+        self.timings = {}
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        stats = PhaseStats(name, timezone.now())
+        started = time.perf_counter()
+        try:
+            yield stats
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            stats.duration_ms = round(elapsed, 2)
+            self.phases.append(stats)
+            self.timings[name] = round(self.timings.get(name, 0) + elapsed, 2)
+
+
+class IngestResult:
+    """Outcome of a single ingestion run"""
+
+    def __init__(self):
+        self.fetched = 0
+        self.applied = 0
+        self.unknown_symbols = []
+        self.changed_ids = set()  # Companies whose current price moved in this run
+        self.timings = {}
+
+    def summary(self):
+        text = f"Fetched {self.fetched} quotes, applied {self.applied} prices ({len(self.changed_ids)} changed)"
+        if self.unknown_symbols:
+            text += f", {len(self.unknown_symbols)} unknown symbols"
+        return text
+
+
+class PriceSnapshot:
+    """
+    In-memory copy of the last applied price of every company, keyed by symbol.
+
+    Each refresh only re-reads companies whose updated_at moved past the
+    newest one already seen, so prices written by other processes (the
+    ticks endpoint, the admin, catalog imports) are picked up with one small
+    query. Writes that don't bump updated_at (QuerySet.update() without it,
+    raw SQL) are invisible to that diff; a full re-read every
+    PRICE_SNAPSHOT_FULL_REFRESH seconds catches them.
+    """
+
+    def __init__(self):
+        self.companies = {}  # symbol -> (company id, current price)
+        self.symbols = {}  # company id -> symbol
+        self.watermark = None
+        self.full_refreshed_at = None  # time.monotonic() of the last full re-read
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            now = time.monotonic()
+            full = (
+                self.watermark is None
+                or now - self.full_refreshed_at >= settings.PRICE_SNAPSHOT_FULL_REFRESH
+            )
+            companies = Company.objects.all()
+            if full:
+                # Rebuilt aside and swapped in, so concurrent lookups never see a partial snapshot
+                prices, symbols, watermark = {}, {}, None
+            else:
+                companies = companies.filter(updated_at__gte=self.watermark - SNAPSHOT_OVERLAP)
+                prices, symbols, watermark = self.companies, self.symbols, self.watermark
+            for company_id, symbol, price, updated_at in companies.values_list(
+                'id', 'symbol', 'current_price', 'updated_at'
+            ).iterator(chunk_size=5000):
+                previous = symbols.get(company_id)
+                if previous is not None and previous != symbol:
+                    prices.pop(previous, None)
+                symbols[company_id] = symbol
+                prices[symbol] = (company_id, price)
+                if watermark is None or updated_at > watermark:
+                    watermark = updated_at
+            self.companies, self.symbols, self.watermark = prices, symbols, watermark
+            if full:
+                self.full_refreshed_at = now
+
+    def lookup(self, symbol):
+        return self.companies.get(symbol)
+
+    def apply(self, prices):
+        """Record {company id: price} as applied"""
+        with self._lock:
+            for company_id, price in prices.items():
+                symbol = self.symbols.get(company_id)
+                if symbol is not None:
+                    self.companies[symbol] = (company_id, price)
+
+    def clear(self):
+        with self._lock:
+            self.companies, self.symbols, self.watermark = {}, {}, None
+            self.full_refreshed_at = None
+
+
+# Shared by every ingestion in this process
+price_snapshot = PriceSnapshot()
+
+
+def write_price_changes(prices, now):
+    """
+    Write {company id: new price} in a single UPDATE.
+
+    The new price is selected with a CASE on the primary key and reused to
+    derive initial_price and price_change from the stored initial_price in
+    the same statement, mirroring Company.save(). Returns the number of
+    rows updated.
+    """
+    if not prices:
+        return 0
+
+    decimal_field = DecimalField(max_digits=20, decimal_places=2)
+    new_price = Case(
+        *[When(pk=company_id, then=Value(price)) for company_id, price in prices.items()],
+        output_field=decimal_field
+    )
+    # A company without an initial price starts tracking from the new price
+    initial_price = Case(
+        When(Q(initial_price__isnull=True) | Q(initial_price__lte=0), then=new_price),
+        default=F('initial_price'),
+        output_field=decimal_field
+    )
+    price_change = Round((new_price - initial_price) * 100 / initial_price, 2)
+
+    return Company.objects.filter(pk__in=list(prices)).update(
+        current_price=new_price,
+        initial_price=initial_price,
+        price_change=price_change,
+        updated_at=now
+    )
+
+
+class PriceIngestor:
+    """
+    In-process price ingestion engine.
+
+    Pulls quotes from a PriceSource, diffs them against the in-memory
+    PriceSnapshot and writes only the companies whose price moved, in a
+    single UPDATE per batch. The IDs of those companies are published with
+    the prices_changed signal for downstream consumers.
+    """
+
+    def __init__(self, source, batch_size=None, timer=None, snapshot=None):
+        self.source = source
+        self.batch_size = batch_size or settings.PRICE_INGEST_BATCH_SIZE
+        self.timer = timer or PhaseTimer()
+        self.snapshot = snapshot or price_snapshot
+
+    def run(self):
+        result = IngestResult()
+        timer = self.timer
+
+        # 1. Fetch quotes from the source
+        with timer.phase('fetch') as phase:
+            quotes = list(self.source.fetch())
+            phase.rows_read = len(quotes)
+            if self.source.stats:
+                phase.extra.update(self.source.stats)
+        result.fetched = len(quotes)
+
+        # 2. Keep only the latest quote for each symbol
+        with timer.phase('parse') as phase:
+            latest = {}
+            for quote in quotes:
+                previous = latest.get(quote.symbol)
+                if previous is None or quote.timestamp >= previous.timestamp:
+                    latest[quote.symbol] = quote
+            phase.rows_read = len(quotes)
+            phase.rows_written = len(latest)
+
+        # 3. Match symbols against the snapshot, refreshed with the rows changed since the last run
+        with timer.phase('match') as phase:
+            self.snapshot.refresh()
+            companies = {}
+            for symbol in latest:
+                entry = self.snapshot.lookup(symbol)
+                if entry is not None:
+                    companies[symbol] = entry
+            result.unknown_symbols = sorted(set(latest) - set(companies))
+            phase.rows_read = len(companies)
+            phase.extra['unknown_symbols'] = len(result.unknown_symbols)
+
+        # 4. Write only the prices that moved
+        with timer.phase('apply') as phase:
+            now = timezone.now()
+            changes = {}
+            for symbol, (company_id, current_price) in companies.items():
+                price = latest[symbol].price.quantize(PRICE_QUANTUM)
+                if price > 0 and price != current_price:
+                    changes[company_id] = price
+
+            written = 0
+            items = list(changes.items())
+            with transaction.atomic():
+                for offset in range(0, len(items), self.batch_size):
+                    written += write_price_changes(dict(items[offset:offset + self.batch_size]), now)
+                transaction.on_commit(lambda: self.snapshot.apply(changes))
+            result.applied = len(companies)
+            result.changed_ids = set(changes)
+            phase.rows_read = len(companies)
+            phase.rows_written = written
+
+        # 5. Append every matched quote to the price history and roll up bars
+        with timer.phase('history') as phase:
+            ticks = {}
+            for quote in quotes:
+                entry = companies.get(quote.symbol)
+                if entry is not None:
+                    ticks[(entry[0], quote.timestamp)] = quote.price.quantize(PRICE_QUANTUM)
+            phase.rows_read = len(ticks)
+            phase.rows_written = record_ticks(
+                (company_id, price, timestamp)
+                for (company_id, timestamp), price in ticks.items()
+            )
+
+        result.timings = timer.timings
+        if result.unknown_symbols:
+            logger.warning(f"{len(result.unknown_symbols)} quoted symbols are not in the company catalog")
+        logger.info(f"{result.summary()} in {sum(result.timings.values()):.0f} ms")
+
+        if result.changed_ids:
+            prices_changed.send(sender=self.__class__, company_ids=result.changed_ids, timestamp=now)
+        return result
@@ -0,0 +1,66 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from updates.valuation import PositionBook, VectorizedValuationEngine, compute_values
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the vectorized valuation engine: the compute kernel alone on a synthetic book, '
+        'or with --live a complete engine run (load, compute, write) on the live book, rolled back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--positions', type=int, default=1_000_000)
+        parser.add_argument('--investments', type=int, default=10_000)
+        parser.add_argument('--companies', type=int, default=3_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--live', action='store_true', help='Load ACTIVE investments from the database instead')
+
+    def handle(self, *args, **options):
+        if options['live']:
+            self.benchmark_live(options['repeat'])
+            return
+
+        book = self.synthetic_book(options['positions'], options['investments'], options['companies'])
+        durations = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            compute_values(book)
+            durations.append((time.perf_counter() - started) * 1000)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Compute kernel only, {book.position_count} positions / {len(book.investment_ids)} investments: "
+            f"best {min(durations):.1f} ms, median {float(np.median(durations)):.1f} ms"
+        ))
+
+    def benchmark_live(self, repeat):
+        durations = []
+        for _ in range(repeat):
+            engine = VectorizedValuationEngine()
+            # The engine's batch commits become savepoints; nothing is kept
+            with transaction.atomic():
+                started = time.perf_counter()
+                result = engine.run()
+                durations.append((time.perf_counter() - started) * 1000)
+                transaction.set_rollback(True)
+            self.stdout.write(f"Run: {engine.timings} ({result.investments_updated} investments changed)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Full engine run on the live book: "
+            f"best {min(durations):.1f} ms, median {float(np.median(durations)):.1f} ms"
+        ))
+
+    def synthetic_book(self, position_count, investment_count, company_count):
+        rng = np.random.default_rng(0)
+        return PositionBook(
+            investment_ids=np.arange(1, investment_count + 1, dtype=np.int64),
+            amounts=np.full(investment_count, 1000.0),
+            current_values=np.full(investment_count, 1000.0),
+            investment_idx=np.sort(rng.integers(0, investment_count, position_count)),
+            company_idx=rng.integers(0, company_count, position_count),
+            quantities=rng.uniform(0.01, 10, position_count),
+            position_prices=rng.uniform(1, 500, position_count),
+            company_prices=rng.uniform(1, 500, company_count)
+        )
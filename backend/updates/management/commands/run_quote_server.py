@@ -0,0 +1,44 @@
+import asyncio
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from companies.models import Company
+from updates.quote_server import QuoteServer
+from updates.sources import FilePriceSource
+
+
+class Command(BaseCommand):
+    help = 'Run a local stand-in quote API for testing the HTTP price source offline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--file', help='Serve prices from this CSV/JSON file (default: current company prices)')
+        parser.add_argument('--latency-ms', type=float, default=0, help='Average simulated latency per request')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+        parser.add_argument('--drift', type=float, default=0.0, help='Max relative price move per request, e.g. 0.01')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            path = Path(options['file'])
+            if not path.exists():
+                raise CommandError(f"Price file not found: {path}")
+            prices = {quote.symbol: quote.price for quote in FilePriceSource(path).fetch()}
+        else:
+            prices = dict(Company.objects.filter(current_price__isnull=False).values_list('symbol', 'current_price'))
+        if not prices:
+            raise CommandError('No prices to serve')
+
+        server = QuoteServer(
+            prices,
+            latency_ms=options['latency_ms'],
+            error_rate=options['error_rate'],
+            drift=options['drift']
+        )
+        self.stdout.write(
+            f"Serving {len(prices)} symbols on http://{options['host']}:{options['port']}/quotes "
+            f"(set PRICE_SOURCE_CLASS=updates.http_source.HttpPriceSource and PRICE_SOURCE_URL to use it)"
+        )
+        try:
+            asyncio.run(server.serve_forever(options['host'], options['port']))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from updates.scheduler import PriceScheduler
+
+
+class Command(BaseCommand):
+    help = 'Run the single-leader stock price scheduler in the foreground'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run at most one pending refresh and exit')
+        parser.add_argument('--interval', type=int, default=None, help='Seconds between refreshes')
+
+    def handle(self, *args, **options):
+        scheduler = PriceScheduler(interval=options['interval'])
+
+        if options['once']:
+            ran = scheduler.run_pending()
+            scheduler.lock.release()
+            self.stdout.write('Refresh completed' if ran else 'Nothing to do: not leader or slot already claimed')
+            return
+
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            scheduler.stop()
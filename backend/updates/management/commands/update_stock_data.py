@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from updates.ingest import PriceIngestor
+from updates.sources import FilePriceSource, get_price_source
+
+
+class Command(BaseCommand):
+    help = 'Load the latest stock prices into the company catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Read prices from this CSV/JSON file instead of the configured source')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per bulk update statement')
+
+    def handle(self, *args, **options):
+        source = FilePriceSource(options['file']) if options['file'] else get_price_source()
+
+        try:
+            result = PriceIngestor(source, batch_size=options['batch_size']).run()
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(result.summary()))
+        for phase, elapsed in result.timings.items():
+            self.stdout.write(f"  {phase}: {elapsed:.1f} ms")
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('updates', '0002_updatelog_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='updatelog',
+            name='run_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
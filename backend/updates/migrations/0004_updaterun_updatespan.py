@@ -0,0 +1,48 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('updates', '0003_updatelog_run_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpdateRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('update_type', models.CharField(max_length=50)),
+                ('run_id', models.CharField(blank=True, max_length=64, null=True)),
+                ('trigger', models.CharField(choices=[('scheduler', 'Scheduler'), ('manual', 'Manual'), ('ticks', 'Price ticks')], default='manual', max_length=20)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('success', 'Success'), ('error', 'Error')], default='running', max_length=20)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_ms', models.FloatField(blank=True, null=True)),
+                ('summary', models.TextField(blank=True, default='')),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['update_type', '-started_at'], name='update_run_type_started_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UpdateSpan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phase', models.CharField(max_length=50)),
+                ('started_at', models.DateTimeField()),
+                ('duration_ms', models.FloatField()),
+                ('rows_read', models.IntegerField(default=0)),
+                ('rows_written', models.IntegerField(default=0)),
+                ('errors', models.IntegerField(default=0)),
+                ('extra', models.JSONField(blank=True, default=dict)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spans', to='updates.updaterun')),
+            ],
+            options={
+                'ordering': ['started_at'],
+            },
+        ),
+    ]
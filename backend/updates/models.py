@@ -6,6 +6,60 @@ class UpdateLog(models.Model):
     last_updated = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=20, default='success')
     details = models.TextField(blank=True, null=True)
+    timings = models.JSONField(default=dict, blank=True)  # Per-phase durations in ms of the last run
+    run_id = models.CharField(max_length=64, blank=True, null=True)  # Scheduler slot claimed by the last run
 
     def __str__(self):
-        return f"{self.update_type} - {self.last_updated}"
\ No newline at end of file
+        return f"{self.update_type} - {self.last_updated}"
+
+
+class UpdateRun(models.Model):
+    """One execution of a price refresh, kept as history"""
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('error', 'Error'),
+    ]
+
+    TRIGGER_CHOICES = [
+        ('scheduler', 'Scheduler'),
+        ('manual', 'Manual'),
+        ('ticks', 'Price ticks'),
+    ]
+
+    update_type = models.CharField(max_length=50)
+    run_id = models.CharField(max_length=64, blank=True, null=True)  # Scheduler slot, if any
+    trigger = models.CharField(max_length=20, choices=TRIGGER_CHOICES, default='manual')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    summary = models.TextField(blank=True, default='')
+    error = models.TextField(blank=True, default='')
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['update_type', '-started_at'], name='update_run_type_started_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.update_type} run at {self.started_at} ({self.status})"
+
+
+class UpdateSpan(models.Model):
+    """Timing and row counts of one phase of an UpdateRun"""
+    run = models.ForeignKey(UpdateRun, on_delete=models.CASCADE, related_name='spans')
+    phase = models.CharField(max_length=50)
+    started_at = models.DateTimeField()
+    duration_ms = models.FloatField()
+    rows_read = models.IntegerField(default=0)
+    rows_written = models.IntegerField(default=0)
+    errors = models.IntegerField(default=0)
+    extra = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['started_at']
+
+    def __str__(self):
+        return f"{self.phase} ({self.duration_ms} ms)"
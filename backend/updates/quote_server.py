@@ -0,0 +1,99 @@
+import asyncio
+import json
+import logging
+import random
+from decimal import Decimal
+from urllib.parse import parse_qs, unquote, urlsplit
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteServer:
+    """
+    Stand-in quote API for testing HttpPriceSource offline.
+
+    Serves GET /quotes?symbols=A,B,C over HTTP/1.1 keep-alive with the
+    prices it was given, moving each price by a small random walk per
+    request when drift is set. latency_ms and error_rate simulate a slow
+    or flaky upstream (errors are answered with 503).
+    """
+
+    def __init__(self, prices, latency_ms=0, error_rate=0.0, drift=0.0, max_symbols=500):
+        self.prices = dict(prices)
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.drift = drift
+        self.max_symbols = max_symbols
+        self.requests = 0
+
+    def quote(self, symbol):
+        price = self.prices.get(symbol)
+        if price is None:
+            return None
+        if self.drift:
+            price = max(price * (1 + Decimal(str(random.uniform(-self.drift, self.drift)))), Decimal('0.01'))
+            price = self.prices[symbol] = price.quantize(Decimal('0.01'))
+        return {'symbol': symbol, 'price': str(price), 'timestamp': timezone.now().isoformat()}
+
+    async def respond(self, method, target):
+        """Return (status, payload) for one request"""
+        self.requests += 1
+        parts = urlsplit(target)
+        if method != 'GET' or parts.path.rstrip('/') != '/quotes':
+            return 404, {'error': 'Not found'}
+
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000 * random.uniform(0.5, 1.5))
+        if self.error_rate and random.random() < self.error_rate:
+            return 503, {'error': 'Simulated upstream failure'}
+
+        raw = parse_qs(parts.query).get('symbols', [''])[0]
+        symbols = [unquote(symbol).strip() for symbol in raw.split(',') if symbol.strip()]
+        if len(symbols) > self.max_symbols:
+            return 413, {'error': f'At most {self.max_symbols} symbols per request'}
+        quotes = [quote for quote in (self.quote(symbol) for symbol in symbols) if quote]
+        return 200, {'quotes': quotes}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target = (request_line.decode('latin-1').split(' ') + ['', ''])[:2]
+
+                keep_alive = True
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'connection' and value.strip().lower() == 'close':
+                        keep_alive = False
+
+                status, payload = await self.respond(method, target)
+                body = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        logger.info(f"Quote server listening on {host}:{server.sockets[0].getsockname()[1]}")
+        return server
+
+    async def serve_forever(self, host='127.0.0.1', port=8765):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,164 @@
+import logging
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DecimalField, Exists, F, OuterRef, Subquery, Sum, When
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+from companies.models import Company
+from investments.models import Investment, InvestmentPosition
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ['sql', 'vectorized']
+
+
+class RevaluationResult:
+    """Rows touched and time spent by a revaluation pass"""
+
+    def __init__(self, positions_updated=0, investments_updated=0, elapsed_ms=0, shards=None):
+        self.positions_updated = positions_updated
+        self.investments_updated = investments_updated
+        self.elapsed_ms = elapsed_ms
+        self.shards = shards or []  # Per-shard dicts when the book was sharded
+
+    def as_dict(self):
+        data = {
+            'positions_updated': self.positions_updated,
+            'investments_updated': self.investments_updated,
+            'elapsed_ms': self.elapsed_ms,
+        }
+        if self.shards:
+            data['shards'] = self.shards
+        return data
+
+
+def select_book(status='ACTIVE', company_ids=None, shard=None):
+    """
+    Return the (positions, investments) querysets a revaluation works on.
+
+    When company_ids is given only the positions holding those companies and
+    the investments that own them are selected; the company -> investment
+    lookup is served by the (company, investment) index on InvestmentPosition.
+    A shard (see updates.sharding) restricts both to its slice of the book.
+    """
+    positions = InvestmentPosition.objects.filter(
+        investment__status=status,
+        company__current_price__isnull=False
+    )
+    investments = Investment.objects.filter(
+        Exists(InvestmentPosition.objects.filter(investment=OuterRef('pk'))),
+        status=status
+    )
+    if company_ids is not None:
+        positions = positions.filter(company_id__in=company_ids)
+        investments = investments.filter(
+            pk__in=InvestmentPosition.objects.filter(
+                company_id__in=company_ids
+            ).values('investment_id')
+        )
+    if shard is not None:
+        positions = positions.filter(shard.q('investment__'))
+        investments = investments.filter(shard.q())
+    return positions, investments
+
+
+def reprice_positions(positions, now):
+    """Copy Company.current_price into the positions whose price moved"""
+    company_price = Subquery(
+        Company.objects.filter(pk=OuterRef('company_id')).values('current_price')[:1]
+    )
+    return positions.exclude(
+        current_price=F('company__current_price')
+    ).update(current_price=company_price, last_updated=now)
+
+
+def revalue_investments_sql(status='ACTIVE', company_ids=None, shard=None):
+    """
+    Revalue investments using set-based SQL.
+
+    1. Copy Company.current_price into all positions whose price moved
+    2. Write SUM(quantity * current_price) into Investment.current_value,
+       falling back to the invested amount when the total is not positive
+       (same rule as Investment.update_current_value)
+    3. Derive profit_loss and profit_loss_percentage from the new value
+    """
+    started = time.perf_counter()
+    now = timezone.now()
+
+    position_total = Subquery(
+        InvestmentPosition.objects.filter(
+            investment=OuterRef('pk')
+        ).values('investment').annotate(
+            total=Sum(F('quantity') * F('current_price'))
+        ).values('total'),
+        output_field=DecimalField(max_digits=20, decimal_places=2)
+    )
+    positions, investments = select_book(status, company_ids, shard)
+
+    with transaction.atomic():
+        positions_updated = reprice_positions(positions, now)
+
+        investments_updated = investments.update(
+            current_value=Case(
+                When(GreaterThan(position_total, 0), then=position_total),
+                default=F('amount')
+            ),
+            last_updated=now
+        )
+
+        investments.filter(amount__gt=0).update(
+            profit_loss=F('current_value') - F('amount'),
+            profit_loss_percentage=(F('current_value') - F('amount')) * 100 / F('amount')
+        )
+
+    return RevaluationResult(
+        positions_updated=positions_updated,
+        investments_updated=investments_updated,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2)
+    )
+
+
+def revalue_investments(status='ACTIVE', company_ids=None, engine=None, shards=None):
+    """
+    Revalue investments with the given status.
+
+    engine selects the implementation ('sql' or 'vectorized', defaulting to
+    settings.REVALUATION_ENGINE). When company_ids is given only investments
+    holding those companies are revalued; an empty collection is a no-op.
+    With more than one shard (default settings.REVALUATION_SHARDS) large
+    books are split across worker processes, see updates.sharding.
+    """
+    engine = engine or settings.REVALUATION_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown revaluation engine: {engine}")
+    shards = shards or settings.REVALUATION_SHARDS
+
+    if company_ids is not None:
+        company_ids = list(company_ids)
+        if not company_ids:
+            return RevaluationResult()
+
+    result = None
+    if shards > 1:
+        # Local import: sharding imports this module
+        from .sharding import revalue_sharded
+        result = revalue_sharded(status=status, company_ids=company_ids, engine=engine, shards=shards)
+
+    if result is None:
+        result = revalue_in_process(status=status, company_ids=company_ids, engine=engine)
+
+    logger.info(
+        f"Revalued {result.investments_updated} investments "
+        f"({result.positions_updated} positions repriced) in {result.elapsed_ms} ms [{engine}]"
+    )
+    return result
+
+
+def revalue_in_process(status='ACTIVE', company_ids=None, engine='sql', shard=None):
+    """Run one engine over the (optionally sharded) book in the current process"""
+    if engine == 'vectorized':
+        # Local import keeps NumPy off the import path of the SQL engine
+        from .valuation import VectorizedValuationEngine
+        return VectorizedValuationEngine(status=status, company_ids=company_ids, shard=shard).run()
+    return revalue_investments_sql(status=status, company_ids=company_ids, shard=shard)
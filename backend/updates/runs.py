@@ -0,0 +1,100 @@
+import logging
+import math
+import time
+from django.utils import timezone
+from .ingest import PhaseTimer
+from .models import UpdateRun, UpdateSpan
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = [50, 90, 99]
+
+
+class RunRecorder:
+    """
+    Records one refresh as an UpdateRun with a span per phase.
+
+    Phases are timed through the shared PhaseTimer (recorder.timer), which
+    the ingestor and the downstream steps report row counts into; the spans
+    are written in one batch when the run finishes.
+    """
+
+    def __init__(self, update_type, trigger='manual', run_id=None):
+        self.timer = PhaseTimer()
+        self._started = time.perf_counter()
+        self.run = UpdateRun.objects.create(
+            update_type=update_type,
+            trigger=trigger,
+            run_id=run_id,
+            started_at=timezone.now()
+        )
+
+    def phase(self, name):
+        return self.timer.phase(name)
+
+    def finish(self, status='success', summary='', error=''):
+        self.run.status = status
+        self.run.summary = summary
+        self.run.error = error
+        self.run.finished_at = timezone.now()
+        self.run.duration_ms = round((time.perf_counter() - self._started) * 1000, 2)
+        self.run.save(update_fields=['status', 'summary', 'error', 'finished_at', 'duration_ms'])
+
+        UpdateSpan.objects.bulk_create([
+            UpdateSpan(
+                run=self.run,
+                phase=stats.name,
+                started_at=stats.started_at,
+                duration_ms=stats.duration_ms,
+                rows_read=stats.rows_read,
+                rows_written=stats.rows_written,
+                errors=stats.errors,
+                extra=stats.extra
+            )
+            for stats in self.timer.phases
+        ])
+        return self.run
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(math.ceil(pct / 100 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def summarize_runs(runs):
+    """
+    Percentile summary of run durations and of each phase across runs.
+    runs must have their spans prefetched.
+    """
+    durations = [run.duration_ms for run in runs if run.duration_ms is not None]
+    phases = {}
+    for run in runs:
+        for span in run.spans.all():
+            stats = phases.setdefault(span.phase, {'durations': [], 'rows_read': [], 'rows_written': [], 'errors': 0})
+            stats['durations'].append(span.duration_ms)
+            stats['rows_read'].append(span.rows_read)
+            stats['rows_written'].append(span.rows_written)
+            stats['errors'] += span.errors
+
+    def describe(values):
+        return {f'p{pct}': percentile(values, pct) for pct in PERCENTILES}
+
+    return {
+        'runs': len(runs),
+        'errors': sum(1 for run in runs if run.status == 'error'),
+        'duration_ms': describe(durations),
+        'phases': {
+            name: {
+                'count': len(stats['durations']),
+                'errors': stats['errors'],
+                'duration_ms': describe(stats['durations']),
+                'rows_read': describe(stats['rows_read']),
+                'rows_written': describe(stats['rows_written']),
+            }
+            for name, stats in phases.items()
+        },
+    }
@@ -0,0 +1,200 @@
+import logging
+import random
+import threading
+from django.conf import settings
+from django.db import connection, connections
+from django.db.utils import ProgrammingError, OperationalError
+from django.utils import timezone
+from .models import UpdateLog
+
+logger = logging.getLogger(__name__)
+
+# Key for pg_try_advisory_lock; any constant shared by all processes works
+SCHEDULER_LOCK_KEY = 0x42554946
+
+
+class LeaderLock:
+    """
+    Session-level Postgres advisory lock used to elect a single scheduler.
+
+    The lock lives on a dedicated connection that is kept open for as long as
+    this process is leader, so closing the regular per-thread connection after
+    each run does not give up leadership. Other backends have no advisory
+    locks and are assumed to run a single process.
+    """
+
+    def __init__(self, key=SCHEDULER_LOCK_KEY):
+        self.key = key
+        self._connection = None
+
+    @property
+    def supported(self):
+        return connection.vendor == 'postgresql'
+
+    def acquire(self):
+        """Try to become leader; returns True if this process holds the lock"""
+        if not self.supported:
+            return True
+        if self._connection is not None:
+            return self._is_alive()
+
+        self._connection = connections.create_connection('default')
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [self.key])
+                acquired = cursor.fetchone()[0]
+        except Exception:
+            self.release()
+            raise
+        if not acquired:
+            self.release()
+        return acquired
+
+    def _is_alive(self):
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except (OperationalError, ProgrammingError):
+            logger.warning("Lost the scheduler lock connection, giving up leadership")
+            self.release()
+            return False
+
+    def release(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+def current_run_id(now, interval):
+    """Identifier of the refresh slot that now falls into"""
+    return str(int(now.timestamp() // interval))
+
+
+def claim_run(update_type, run_id):
+    """
+    Atomically record run_id as the latest run for update_type.
+    Returns False if another process already claimed the same slot.
+    """
+    update_log, created = UpdateLog.objects.get_or_create(
+        update_type=update_type,
+        defaults={'status': 'pending'}
+    )
+    claimed = UpdateLog.objects.filter(pk=update_log.pk).exclude(run_id=run_id).update(run_id=run_id)
+    return claimed == 1
+
+
+class PriceScheduler:
+    """
+    Runs the stock price refresh once per interval across all processes.
+
+    Every process may start a scheduler; the advisory lock elects a single
+    leader and the others wait as standbys. The leader claims each interval's
+    run ID in UpdateLog before refreshing, so even a failover in the middle
+    of an interval cannot produce a second refresh for the same slot. The
+    leader also queues periodic maintenance (see queue_maintenance).
+    """
+
+    def __init__(self, interval=None, jitter=None, poll_interval=None):
+        self.interval = interval or settings.PRICE_UPDATE_INTERVAL
+        self.jitter = settings.PRICE_SCHEDULER_JITTER if jitter is None else jitter
+        self.poll_interval = poll_interval or settings.PRICE_SCHEDULER_POLL_INTERVAL
+        self.lock = LeaderLock()
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_pending(self):
+        """Run the refresh if this process is leader and the current slot is unclaimed"""
+        if not self.lock.acquire():
+            return False
+
+        now = timezone.now()
+        self.queue_maintenance(now)
+
+        run_id = current_run_id(now, self.interval)
+        if not claim_run('stock_prices', run_id):
+            return False
+
+        # Local import: tasks imports this module for start_price_updater
+        from .tasks import update_stock_prices
+
+        logger.info(f"Scheduler starting price refresh run {run_id}")
+        try:
+            update_stock_prices(trigger='scheduler', run_id=run_id)
+        finally:
+            # Return the worker connection; the lock connection stays open
+            connection.close()
+        return True
+
+    def queue_maintenance(self, now):
+        """
+        Leader-only work besides the price refresh: take due index lifecycle
+        transitions on every poll, and queue the platform counter
+        reconciliation once per interval for the job worker.
+        """
+        # Local imports: jobs and indexes modules import updates modules
+        from indexes.lifecycle import apply_due_transitions
+        from jobs.queue import enqueue
+
+        if settings.INDEX_AUTO_TRANSITIONS:
+            apply_due_transitions(now)
+
+        run_id = current_run_id(now, settings.COUNTER_RECONCILE_INTERVAL)
+        if claim_run('platform_counters', run_id):
+            enqueue('reconcile_counters', dedupe_key='reconcile_counters')
+
+    def sleep(self):
+        delay = self.poll_interval + random.uniform(-self.jitter, self.jitter)
+        self._stop.wait(max(delay, 1))
+
+    def run_forever(self, startup_delay=0):
+        logger.info("Price scheduler started")
+        # Spread out processes that boot at the same time
+        self._stop.wait(startup_delay + random.uniform(0, self.jitter))
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.run_pending()
+                except (ProgrammingError, OperationalError) as e:
+                    # Database might not be ready yet
+                    logger.warning(f"Database not ready: {str(e)}")
+                    self.lock.release()
+                    connection.close()
+                except Exception as e:
+                    logger.exception(f"Error in price scheduler: {str(e)}")
+                    connection.close()
+                self.sleep()
+        finally:
+            self.lock.release()
+            connection.close()
+            logger.info("Price scheduler stopped")
+
+
+def start_scheduler_thread():
+    """Start a daemon thread running the price scheduler for this process"""
+    scheduler = PriceScheduler()
+    thread = threading.Thread(
+        target=scheduler.run_forever,
+        kwargs={'startup_delay': 10},  # Allow database initialization first
+        name='price-scheduler',
+        daemon=True
+    )
+    thread.start()
+    return scheduler
+
+
+def autostart_scheduler():
+    """
+    Start the scheduler thread in a server process that opted in with
+    PRICE_SCHEDULER_AUTOSTART. Only the WSGI/ASGI entry points call this, so
+    management commands, scripts, tests and worker processes never host it.
+    """
+    if not settings.PRICE_SCHEDULER_AUTOSTART:
+        return None
+    return start_scheduler_thread()
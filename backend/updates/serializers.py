@@ -0,0 +1,26 @@
+from rest_framework import serializers
+from .models import UpdateRun, UpdateSpan
+
+class UpdateSpanSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UpdateSpan
+        fields = ['phase', 'started_at', 'duration_ms', 'rows_read', 'rows_written', 'errors', 'extra']
+
+class UpdateRunSerializer(serializers.ModelSerializer):
+    spans = UpdateSpanSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = UpdateRun
+        fields = [
+            'id',
+            'update_type',
+            'run_id',
+            'trigger',
+            'status',
+            'started_at',
+            'finished_at',
+            'duration_ms',
+            'summary',
+            'error',
+            'spans'
+        ]
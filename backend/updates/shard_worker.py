@@ -0,0 +1,17 @@
+"""
+Initializer of the spawned revaluation shard workers.
+
+A spawned worker unpickles its initializer before Django is configured, so
+this module must not import models (updates.sharding does, via revaluation).
+"""
+import os
+
+
+def init_worker():
+    # The child inherits the parent's environment; it must never host the
+    # price scheduler, whatever PRICE_SCHEDULER_AUTOSTART the parent runs with
+    os.environ['PRICE_SCHEDULER_AUTOSTART'] = 'false'
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
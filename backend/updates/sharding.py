@@ -0,0 +1,130 @@
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Count, Q
+from .revaluation import RevaluationResult, revalue_in_process, select_book
+from .shard_worker import init_worker
+
+logger = logging.getLogger(__name__)
+
+SHARD_MODES = ['id', 'index']
+
+
+class Shard:
+    """
+    A slice of the investment book: an inclusive investment ID range or a
+    set of indexes. q(prefix) returns the matching filter, with prefix
+    'investment__' when filtering positions.
+    """
+
+    def __init__(self, number, low=None, high=None, index_ids=None):
+        self.number = number
+        self.low = low
+        self.high = high
+        self.index_ids = index_ids
+
+    def q(self, prefix=''):
+        if self.index_ids is not None:
+            return Q(**{f'{prefix}index_id__in': self.index_ids})
+        return Q(**{f'{prefix}pk__gte': self.low, f'{prefix}pk__lte': self.high})
+
+    def describe(self):
+        if self.index_ids is not None:
+            return f"{len(self.index_ids)} indexes"
+        return f"investments {self.low}-{self.high}"
+
+
+def plan_shards(investments, shards, mode='id'):
+    """
+    Split the selected investments into at most `shards` balanced shards.
+
+    'id' cuts the ID-ordered investments into ranges of equal size; 'index'
+    assigns whole indexes, largest first, to the least loaded shard.
+    """
+    if mode == 'index':
+        counts = investments.values('index_id').annotate(total=Count('pk')).order_by('-total')
+        buckets = [[] for _ in range(shards)]
+        loads = [0] * shards
+        for row in counts:
+            target = loads.index(min(loads))
+            buckets[target].append(row['index_id'])
+            loads[target] += row['total']
+        return [Shard(number, index_ids=ids) for number, ids in enumerate(b for b in buckets if b)]
+
+    ids = list(investments.order_by('pk').values_list('pk', flat=True))
+    if not ids:
+        return []
+    size = -(-len(ids) // shards)  # Ceiling division
+    plan = []
+    for offset in range(0, len(ids), size):
+        chunk = ids[offset:offset + size]
+        plan.append(Shard(len(plan), low=chunk[0], high=chunk[-1]))
+    return plan
+
+
+def revalue_shard(status, company_ids, engine, shard):
+    """Worker entry point: revalue one shard on the worker's own connection"""
+    started = time.perf_counter()
+    try:
+        result = revalue_in_process(status=status, company_ids=company_ids, engine=engine, shard=shard)
+    finally:
+        connections.close_all()
+    return {
+        'shard': shard.number,
+        'scope': shard.describe(),
+        'positions_updated': result.positions_updated,
+        'investments_updated': result.investments_updated,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def revalue_sharded(status='ACTIVE', company_ids=None, engine='sql', shards=None, mode=None):
+    """
+    Revalue the book across a pool of worker processes, one shard each.
+
+    Each worker is a freshly spawned interpreter that opens its own
+    database connection and commits its shard in batches. Returns None when
+    sharding does not apply (a small book, or a caller inside a transaction
+    the workers could not see), in which case the caller revalues in-process.
+    """
+    started = time.perf_counter()
+    shards = shards or settings.REVALUATION_SHARDS
+    mode = mode or settings.REVALUATION_SHARD_BY
+    if mode not in SHARD_MODES:
+        raise ValueError(f"Unknown shard mode: {mode}")
+
+    if connection.in_atomic_block:
+        logger.info("Sharded revaluation skipped inside a transaction")
+        return None
+
+    investments = select_book(status, company_ids)[1]
+    if investments.count() < settings.REVALUATION_SHARD_MIN_INVESTMENTS:
+        return None
+
+    plan = plan_shards(investments, shards, mode)
+    if len(plan) < 2:
+        return None
+
+    # Spawned, never forked: the web process runs the scheduler and request
+    # threads, whose sockets and locks a forked child would inherit mid-use
+    context = multiprocessing.get_context('spawn')
+
+    result = RevaluationResult()
+    with ProcessPoolExecutor(max_workers=len(plan), mp_context=context, initializer=init_worker) as executor:
+        futures = [executor.submit(revalue_shard, status, company_ids, engine, shard) for shard in plan]
+        for future in as_completed(futures):
+            shard_result = future.result()
+            result.shards.append(shard_result)
+            result.positions_updated += shard_result['positions_updated']
+            result.investments_updated += shard_result['investments_updated']
+            logger.info(
+                f"Revaluation shard {shard_result['shard'] + 1}/{len(plan)} ({shard_result['scope']}): "
+                f"{shard_result['investments_updated']} investments in {shard_result['elapsed_ms']} ms"
+            )
+
+    result.shards.sort(key=lambda shard_result: shard_result['shard'])
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    return result
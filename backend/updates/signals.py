@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by PriceIngestor after a run that moved at least one company price.
+# Arguments: company_ids (set of Company IDs whose current_price changed)
+# and timestamp (when the new prices were written).
+prices_changed = Signal()
@@ -0,0 +1,180 @@
+import csv
+import json
+import logging
+from collections import namedtuple
+from datetime import timezone as dt_timezone
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from pathlib import Path
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# A single price observation coming from a price source
+PriceQuote = namedtuple('PriceQuote', ['symbol', 'price', 'timestamp'])
+
+SYMBOL_COLUMNS = ['symbol', 'ticker', 'act symbol']
+PRICE_COLUMNS = ['price', 'current_price', 'close', 'last']
+TIMESTAMP_COLUMNS = ['timestamp', 'time', 'date']
+
+PRICE_QUANTUM = Decimal('0.01')
+# Price columns are numeric(20, 2): at most 18 integer digits
+MAX_PRICE = Decimal('999999999999999999.99')
+
+
+def parse_price(value):
+    """
+    Convert a raw price value to a Decimal rounded to cents, or None if it
+    is unusable: not a number, below one cent once rounded, or too large for
+    the price columns.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        price = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    # Range-check before rounding: quantizing 1e30 to cents raises
+    if not price.is_finite() or price <= 0 or price > MAX_PRICE:
+        return None
+    price = price.quantize(PRICE_QUANTUM, rounding=ROUND_HALF_UP)
+    if not PRICE_QUANTUM <= price <= MAX_PRICE:
+        return None
+    return price
+
+
+def parse_timestamp(value, default):
+    """
+    Convert a raw timestamp value to an aware datetime. Missing values give
+    default; malformed or impossible ones (e.g. February 30th) give None.
+    """
+    if not value:
+        return default
+    try:
+        parsed = parse_datetime(str(value).strip())
+    except ValueError:
+        return None
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def quotes_from_json(data, fetched_at):
+    """
+    Yield PriceQuotes from decoded JSON: a list of {"symbol", "price",
+    "timestamp"} objects, the same list under a "quotes" key, or a plain
+    {"SYMBOL": price} mapping.
+    """
+    if isinstance(data, dict) and isinstance(data.get('quotes'), list):
+        rows = data['quotes']
+    elif isinstance(data, dict):
+        rows = [{'symbol': symbol, 'price': price} for symbol, price in data.items()]
+    else:
+        rows = data
+
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        symbol = str(row.get('symbol') or row.get('ticker') or '').strip()
+        price = parse_price(row.get('price', row.get('current_price')))
+        if not symbol or price is None:
+            continue
+        yield PriceQuote(symbol, price, parse_timestamp(row.get('timestamp'), fetched_at) or fetched_at)
+
+
+class PriceSource:
+    """
+    Base class for price sources used by the ingestion engine.
+    Subclasses implement fetch() and yield PriceQuote tuples; sources that
+    measure themselves leave a dict of figures for the last fetch in stats.
+    """
+    name = 'base'
+    stats = None
+
+    @classmethod
+    def from_settings(cls):
+        """Build the source from Django settings"""
+        return cls()
+
+    def fetch(self):
+        raise NotImplementedError('Price sources must implement fetch()')
+
+
+class FilePriceSource(PriceSource):
+    """
+    Reads prices from a local CSV or JSON file.
+
+    CSV files need a header with a symbol column (symbol, ticker or ACT Symbol)
+    and a price column (price, current_price, close or last). An optional
+    timestamp column is used when present.
+
+    JSON files use any layout accepted by quotes_from_json.
+    """
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(settings.PRICE_SOURCE_PATH)
+
+    def fetch(self):
+        if not self.path.exists():
+            raise FileNotFoundError(f"Price file not found: {self.path}")
+
+        fetched_at = timezone.now()
+        if self.path.suffix.lower() == '.json':
+            return list(self._read_json(fetched_at))
+        return list(self._read_csv(fetched_at))
+
+    def _read_csv(self, fetched_at):
+        with open(self.path, newline='', encoding='utf-8') as handle:
+            reader = csv.DictReader(handle)
+            columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+
+            symbol_column = next((columns[c] for c in SYMBOL_COLUMNS if c in columns), None)
+            price_column = next((columns[c] for c in PRICE_COLUMNS if c in columns), None)
+            timestamp_column = next((columns[c] for c in TIMESTAMP_COLUMNS if c in columns), None)
+
+            if not symbol_column or not price_column:
+                raise ValueError(f"{self.path} needs a symbol and a price column")
+
+            skipped = 0
+            for row in reader:
+                symbol = (row.get(symbol_column) or '').strip()
+                price = parse_price(row.get(price_column))
+                if not symbol or price is None:
+                    skipped += 1
+                    continue
+                timestamp = parse_timestamp(row.get(timestamp_column), fetched_at) if timestamp_column else fetched_at
+                yield PriceQuote(symbol, price, timestamp or fetched_at)
+
+            if skipped:
+                logger.warning(f"Skipped {skipped} rows without a usable symbol or price in {self.path}")
+
+    def _read_json(self, fetched_at):
+        with open(self.path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        return quotes_from_json(data, fetched_at)
+
+
+class StaticPriceSource(PriceSource):
+    """Wraps quotes that are already in memory, e.g. a batch pushed to the ticks API"""
+    name = 'static'
+
+    def __init__(self, quotes):
+        self.quotes = list(quotes)
+
+    def fetch(self):
+        return self.quotes
+
+
+def get_price_source():
+    """Instantiate the price source configured in settings.PRICE_SOURCE_CLASS"""
+    source_class = import_string(settings.PRICE_SOURCE_CLASS)
+    return source_class.from_settings()
@@ -1,51 +1,48 @@
-import time
-import threading
 import logging
-import sys
-import platform
-from datetime import datetime
-import subprocess
-import os
-from django.conf import settings
-from django.utils import timezone
-from django.db.utils import ProgrammingError, OperationalError
 from .models import UpdateLog
+from .ingest import PriceIngestor
+from .runs import RunRecorder
+from .sources import get_price_source
+from indexes.nav import record_index_navs
+from accounts.snapshots import snapshot_portfolios
+from jobs.queue import enqueue
 
 logger = logging.getLogger(__name__)
 
-def update_investments_after_prices():
-    """Update investment positions with the latest stock prices"""
-    try:
-        logger.info("Updating investment positions with latest stock prices...")
-        
-        # Use local import to avoid circular imports
-        from investments.models import Investment, InvestmentPosition
-        
-        # Get all active investments
-        investments = Investment.objects.filter(status='ACTIVE')
-        updated_count = 0
-        
-        for investment in investments:
-            positions = investment.positions.all()
-            
-            for position in positions:
-                # Update current price from company
-                if position.company.current_price:
-                    position.current_price = position.company.current_price
-                    position.save()
-            
-            # Update investment total value
-            investment.update_current_value()
-            updated_count += 1
-        
-        logger.info(f"Updated {updated_count} investments with latest stock prices")
-        return updated_count
-    except Exception as e:
-        logger.exception(f"Error updating investments: {str(e)}")
-        return 0
+def update_investments_after_prices(company_ids=None):
+    """
+    Update investment positions with the latest stock prices.
+    Pass the IDs of companies whose price changed to revalue only the
+    investments holding them; None revalues every active investment.
+    Returns the RevaluationResult; errors propagate to the caller.
+    """
+    logger.info("Updating investment positions with latest stock prices...")
+    
+    # Use local import to avoid circular imports
+    from .revaluation import revalue_investments
+    
+    return revalue_investments(company_ids=company_ids)
+
+def queue_pending_revaluation(company_ids, error):
+    """
+    Hand the companies of a failed revaluation to a revaluation job. Their
+    prices are already committed, so the next ingestion sees them as
+    unchanged; the job keeps the IDs and the run_jobs worker retries them
+    with backoff. Returns the job, or None when there was nothing to do.
+    """
+    if not company_ids:
+        return None
+    job, created = enqueue('revaluation', {'company_ids': sorted(company_ids)})
+    logger.warning(f"Queued revaluation job {job.pk} for {len(company_ids)} companies after: {error}")
+    return job
 
-def update_stock_prices():
-    """Run the update_stock_data management command"""
+def update_stock_prices(trigger='scheduler', run_id=None):
+    """
+    Ingest the latest stock prices in-process and revalue investments.
+    Every run is recorded as an UpdateRun with a span per phase.
+    """
+    update_log = None
+    recorder = None
     try:
         logger.info("Starting stock price update...")
         # Save log entry for starting the update
@@ -55,45 +52,55 @@ def update_stock_prices():
         )
         update_log.status = 'running'
         update_log.save()
+        recorder = RunRecorder('stock_prices', trigger=trigger, run_id=run_id)
         
-        # Get project path
-        project_path = settings.BASE_DIR
+        # Load prices from the configured source and apply them in bulk
+        result = PriceIngestor(get_price_source(), timer=recorder.timer).run()
         
-        # Run the management command using subprocess
-        python_cmd = "python3" if platform.system() != "Windows" else "python"
-        command = f"{python_cmd} {project_path}/manage.py update_stock_data"
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        stdout, stderr = process.communicate()
+        logger.info("Stock price update completed successfully")
+        update_log.status = 'success'
+        update_log.details = result.summary()
         
-        # Check if command was successful
-        if process.returncode == 0:
-            logger.info("Stock price update completed successfully")
-            update_log.status = 'success'
-            update_log.details = stdout.decode('utf-8')
-            
-            # Update investments with new prices
+        # Update investments with new prices
+        try:
+            with recorder.phase('revaluation') as phase:
+                revaluation = update_investments_after_prices(result.changed_ids)
+                phase.rows_written = revaluation.investments_updated
+                phase.extra['positions_updated'] = revaluation.positions_updated
+                phase.extra['shards'] = revaluation.shards
+            update_log.details += f"\n\nAlso updated {revaluation.investments_updated} investments with latest prices."
+        except Exception as e:
+            logger.exception(f"Error updating investments after price update: {str(e)}")
+            update_log.details += f"\n\nError updating investments: {str(e)}"
+            job = queue_pending_revaluation(result.changed_ids, e)
+            if job is not None:
+                update_log.details += f" Queued revaluation job {job.pk} to retry."
+        
+        if result.changed_ids:
+            # Refresh the portfolios of affected users
             try:
-                investments_updated = update_investments_after_prices()
-                update_log.details += f"\n\nAlso updated {investments_updated} investments with latest prices."
+                with recorder.phase('portfolio_snapshot') as phase:
+                    phase.rows_written = snapshot_portfolios(result.changed_ids)
             except Exception as e:
-                logger.error(f"Error updating investments after price update: {str(e)}")
-                update_log.details += f"\n\nError updating investments: {str(e)}"
-        else:
-            logger.error(f"Error updating stock prices: {stderr.decode('utf-8')}")
-            update_log.status = 'error'
-            update_log.details = stderr.decode('utf-8')
+                logger.exception(f"Error snapshotting portfolios: {str(e)}")
             
+            # Materialize index NAVs at the new prices
+            try:
+                with recorder.phase('index_nav') as phase:
+                    phase.rows_written = record_index_navs()
+            except Exception as e:
+                logger.exception(f"Error recording index NAVs: {str(e)}")
+        
+        recorder.finish(status='success', summary=update_log.details)
+        update_log.timings = recorder.timer.timings
         update_log.save()
         return update_log
         
     except Exception as e:
         logger.exception(f"Exception during stock price update: {str(e)}")
         try:
+            if recorder is not None:
+                recorder.finish(status='error', error=str(e))
             update_log.status = 'error'
             update_log.details = str(e)
             update_log.save()
@@ -104,43 +111,9 @@ def update_stock_prices():
 
 def run_test_update():
     """Run a test update immediately and return the result"""
-    return update_stock_prices()
+    return update_stock_prices(trigger='manual')
 
 def start_price_updater():
-    """Start the price updater thread that runs every 30 minutes"""
-    logger.info("Price updater thread started")
-    
-    # Allow database initialization before checking for updates
-    time.sleep(10)
-    
-    update_interval = 30 * 60  # 30 minutes in seconds
-    
-    while True:
-        try:
-            # Check when was the last update
-            try:
-                last_update = UpdateLog.objects.filter(update_type='stock_prices').first()
-                
-                run_update = True
-                if last_update:
-                    # Calculate time since last update
-                    time_since_update = (timezone.now() - last_update.last_updated).total_seconds()
-                    # Only run if it's been more than update_interval since last update
-                    run_update = time_since_update >= update_interval
-                
-                if run_update:
-                    # Run in a separate thread to avoid blocking
-                    update_thread = threading.Thread(target=update_stock_prices)
-                    update_thread.daemon = True
-                    update_thread.start()
-            except (ProgrammingError, OperationalError) as e:
-                # Database might not be ready yet
-                logger.warning(f"Database not ready: {str(e)}")
-            
-            # Sleep for 1 minute before checking again
-            time.sleep(60)
-            
-        except Exception as e:
-            logger.exception(f"Error in price updater thread: {str(e)}")
-            # Sleep a bit before retrying
-            time.sleep(60)
\ No newline at end of file
+    """Run the single-leader price scheduler in the current thread"""
+    from .scheduler import PriceScheduler
+    PriceScheduler().run_forever(startup_delay=10)
@@ -0,0 +1,406 @@
+import asyncio
+import json
+import random
+import os
+import socket
+import multiprocessing
+import subprocess
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+import unittest
+from unittest import mock
+import numpy as np
+from django.db import connection
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import CustomUser
+from companies.models import Company
+from indexes.models import Index
+from investments.models import Investment, InvestmentPosition
+from jobs.models import Job
+from jobs.worker import JobWorker
+from .http_source import AsyncQuoteClient, HttpPriceSource, QuoteFetchError
+from .ingest import PriceSnapshot, price_snapshot
+from .quote_server import QuoteServer
+from .revaluation import revalue_investments_sql
+from .scheduler import autostart_scheduler
+from .shard_worker import init_worker
+from .sources import PriceQuote, StaticPriceSource, parse_price, parse_timestamp
+from .tasks import update_stock_prices
+from .valuation import VectorizedValuationEngine, to_cents
+
+
+def scheduler_state():
+    """Whether the price scheduler is enabled and running in this process"""
+    autostart_scheduler()
+    running = any(thread.name == 'price-scheduler' for thread in threading.enumerate())
+    return settings.PRICE_SCHEDULER_AUTOSTART, running
+
+
+class FlakyQuoteServer(QuoteServer):
+    """Answers the first `failures` requests with 503"""
+
+    def __init__(self, prices, failures, **kwargs):
+        super().__init__(prices, **kwargs)
+        self.failures = failures
+
+    async def respond(self, method, target):
+        if self.failures:
+            self.failures -= 1
+            self.requests += 1
+            return 503, {'error': 'Simulated upstream failure'}
+        return await super().respond(method, target)
+
+
+class SymbolFailingQuoteServer(QuoteServer):
+    """Answers every request for `failing` with 503 and records the order of requests"""
+
+    def __init__(self, prices, failing, **kwargs):
+        super().__init__(prices, **kwargs)
+        self.failing = failing
+        self.targets = []
+
+    async def respond(self, method, target):
+        self.targets.append(target)
+        if self.failing in target:
+            self.requests += 1
+            return 503, {'error': 'Simulated upstream failure'}
+        return await super().respond(method, target)
+
+
+async def serve_chunked(reader, writer):
+    """One response with a chunked body split across several chunks"""
+    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+        pass
+    body = json.dumps({'quotes': [{'symbol': 'AAA', 'price': '12.34'}, {'symbol': 'BBB', 'price': '5.60'}]}).encode()
+    writer.write(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nConnection: close\r\n\r\n')
+    for offset in range(0, len(body), 7):
+        chunk = body[offset:offset + 7]
+        writer.write(f'{len(chunk):x};ext=1\r\n'.encode() + chunk + b'\r\n')
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+    writer.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class AsyncQuoteClientTests(SimpleTestCase):
+    """The HTTP price source against the stand-in quote server"""
+    prices = {'AAA': Decimal('12.34'), 'BBB': Decimal('5.60'), 'CCC': Decimal('99.00')}
+
+    def fetch(self, server, symbols, **options):
+        async def run():
+            listener = await server.start(port=0)
+            port = listener.sockets[0].getsockname()[1]
+            source = self.source = HttpPriceSource(f'http://127.0.0.1:{port}/quotes', symbols=symbols, **options)
+            try:
+                return source, await source._fetch_all(source.batch_urls(symbols))
+            finally:
+                listener.close()
+                await listener.wait_closed()
+        return asyncio.run(run())
+
+    def test_fetches_quotes_over_one_keep_alive_connection(self):
+        server = QuoteServer(self.prices)
+        source, quotes = self.fetch(server, ['AAA', 'BBB', 'CCC'], batch_size=1, concurrency=1, backoff=0)
+        self.assertEqual({quote.symbol: quote.price for quote in quotes}, self.prices)
+        self.assertEqual(source.stats['requests'], 3)
+        self.assertEqual(source.stats['connections'], 1)
+        self.assertEqual(server.requests, 3)
+
+    def test_retries_retryable_statuses(self):
+        server = FlakyQuoteServer(self.prices, failures=2)
+        source, quotes = self.fetch(server, ['AAA'], retries=3, backoff=0)
+        self.assertEqual([quote.symbol for quote in quotes], ['AAA'])
+        self.assertEqual(source.stats['retries'], 2)
+        self.assertEqual(source.stats['failed_requests'], 0)
+
+    def test_gives_up_after_retries(self):
+        server = FlakyQuoteServer(self.prices, failures=10)
+        with self.assertRaises(QuoteFetchError):
+            self.fetch(server, ['AAA'], retries=2, backoff=0)
+        self.assertEqual(server.requests, 3)
+
+    def test_does_not_retry_client_errors(self):
+        server = QuoteServer(self.prices, max_symbols=1)
+        with self.assertRaises(QuoteFetchError):
+            self.fetch(server, ['AAA', 'BBB'], batch_size=2, retries=3, backoff=0)
+        self.assertEqual(server.requests, 1)
+
+    def test_refused_connection_is_retried(self):
+        client = AsyncQuoteClient(concurrency=1, retries=2, backoff=0, timeout=1)
+        with self.assertRaises(QuoteFetchError) as raised:
+            asyncio.run(client.get_json(f'http://127.0.0.1:{free_port()}/quotes?symbols=AAA'))
+        self.assertTrue(raised.exception.retryable)
+        self.assertEqual(client.retried, 2)
+
+    def test_slow_response_times_out(self):
+        server = QuoteServer(self.prices, latency_ms=2000)
+        with self.assertRaises(QuoteFetchError):
+            self.fetch(server, ['AAA'], retries=1, backoff=0, timeout=0.1)
+        self.assertEqual(server.requests, 2)
+        # Timed out attempts are in the latency histogram, not missing from it
+        latency = self.source.stats['latency_ms']
+        self.assertEqual(latency['count'], 2)
+        self.assertEqual(latency['outcomes'], {'ok': 0, 'error': 0, 'timeout': 2})
+        self.assertGreaterEqual(latency['p50'], 100)
+
+    def test_backoff_does_not_hold_a_concurrency_slot(self):
+        server = SymbolFailingQuoteServer(self.prices, failing='AAA')
+        source, quotes = self.fetch(server, ['AAA', 'BBB'], batch_size=1, concurrency=1, retries=1, backoff=0.2)
+        self.assertEqual([quote.symbol for quote in quotes], ['BBB'])
+        # The healthy batch ran while the failing one was backing off
+        self.assertEqual([target.rsplit('=', 1)[1] for target in server.targets], ['AAA', 'BBB', 'AAA'])
+        self.assertEqual(source.stats['failed_requests'], 1)
+        self.assertEqual(source.stats['latency_ms']['outcomes'], {'ok': 1, 'error': 2, 'timeout': 0})
+
+    def test_reads_chunked_bodies(self):
+        async def run():
+            listener = await asyncio.start_server(serve_chunked, '127.0.0.1', 0)
+            port = listener.sockets[0].getsockname()[1]
+            client = AsyncQuoteClient(concurrency=1, retries=0, backoff=0, timeout=1)
+            try:
+                return await client.get_json(f'http://127.0.0.1:{port}/quotes?symbols=AAA,BBB')
+            finally:
+                client.close()
+                listener.close()
+                await listener.wait_closed()
+
+        data = asyncio.run(run())
+        self.assertEqual([row['symbol'] for row in data['quotes']], ['AAA', 'BBB'])
+
+
+class PriceTicksTests(TestCase):
+    """Batched tick ingestion through /updates/ticks/"""
+
+    def setUp(self):
+        price_snapshot.clear()
+        self.company = Company.objects.create(name='Alpha', symbol='AAA', current_price=Decimal('10.00'))
+        admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_parse_timestamp_rejects_impossible_dates(self):
+        self.assertIsNone(parse_timestamp('2025-02-30T00:00:00', None))
+        self.assertIsNone(parse_timestamp('yesterday', None))
+        self.assertEqual(parse_timestamp('', 'default'), 'default')
+        self.assertEqual(parse_timestamp('2025-02-28T12:00:00Z', None).day, 28)
+
+    def test_impossible_timestamp_rejects_only_that_tick(self):
+        response = self.client.post('/updates/ticks/', {'ticks': [
+            {'symbol': 'AAA', 'price': '11.00', 'timestamp': '2025-02-30T00:00:00'},
+            {'symbol': 'AAA', 'price': '12.00', 'timestamp': '2025-02-28T12:00:00Z'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rejected'], 1)
+        self.assertEqual(response.data['applied'], 1)
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.current_price, Decimal('12.00'))
+
+    def test_parse_price_rounds_to_cents_within_column_range(self):
+        self.assertEqual(parse_price('12.345'), Decimal('12.35'))
+        self.assertEqual(parse_price('999999999999999999.99'), Decimal('999999999999999999.99'))
+        for value in ['1e30', '1e19', '999999999999999999.996', '0.004', '0', '-1', 'NaN', 'abc']:
+            self.assertIsNone(parse_price(value), value)
+
+    def test_out_of_range_prices_reject_only_their_ticks(self):
+        response = self.client.post('/updates/ticks/', {'ticks': [
+            {'symbol': 'AAA', 'price': '1e30'},
+            {'symbol': 'AAA', 'price': '1e19'},
+            {'symbol': 'AAA', 'price': '0.004'},
+            {'symbol': 'AAA', 'price': '12.50'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rejected'], 3)
+        self.assertEqual(response.data['applied'], 1)
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.current_price, Decimal('12.50'))
+
+    def test_batch_of_only_bad_ticks_is_a_client_error(self):
+        response = self.client.post('/updates/ticks/', {'ticks': [
+            {'symbol': 'AAA', 'price': '11.00', 'timestamp': '2025-02-30T00:00:00'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['rejected'], 1)
+
+
+class PriceRefreshTests(TestCase):
+    """Scheduled price refreshes and the in-memory price snapshot"""
+
+    def setUp(self):
+        price_snapshot.clear()
+        self.company = Company.objects.create(name='Alpha', symbol='AAA', current_price=Decimal('10.00'))
+
+    def refresh(self, price):
+        source = StaticPriceSource([PriceQuote('AAA', Decimal(price), timezone.now())])
+        with mock.patch('updates.tasks.get_price_source', return_value=source):
+            return update_stock_prices(trigger='manual')
+
+    def test_failed_revaluation_is_queued_as_a_job(self):
+        with mock.patch('updates.tasks.update_investments_after_prices', side_effect=RuntimeError('boom')):
+            update_log = self.refresh('11.00')
+        self.assertEqual(update_log.status, 'success')
+        job = Job.objects.get(job_type='revaluation')
+        self.assertEqual(job.params, {'company_ids': [self.company.id]})
+        self.assertEqual(job.status, 'queued')
+
+    def test_unchanged_prices_queue_nothing(self):
+        self.refresh('10.00')
+        with mock.patch('updates.tasks.update_investments_after_prices', side_effect=RuntimeError('boom')):
+            self.refresh('10.00')
+        self.assertFalse(Job.objects.exists())
+
+    def test_full_refresh_sees_writes_that_skip_updated_at(self):
+        Company.objects.filter(pk=self.company.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        Company.objects.create(name='Beta', symbol='BBB', current_price=Decimal('5.00'))
+        snapshot = PriceSnapshot()
+        snapshot.refresh()
+        # A bulk update that leaves updated_at alone
+        Company.objects.filter(pk=self.company.pk).update(current_price=Decimal('20.00'))
+        snapshot.refresh()
+        self.assertEqual(snapshot.lookup('AAA')[1], Decimal('10.00'))
+        with override_settings(PRICE_SNAPSHOT_FULL_REFRESH=0):
+            snapshot.refresh()
+        self.assertEqual(snapshot.lookup('AAA')[1], Decimal('20.00'))
+
+
+class UpdateInvestmentsTests(TestCase):
+    """/updates/update-investments/ queues the revaluation instead of running it"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Alpha', symbol='AAA', current_price=Decimal('10.00'))
+        index = Index.objects.create(name='Index', description='Test index')
+        index.companies.set([self.company])
+        admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.investment = Investment.objects.create(user=admin, index=index, amount=Decimal('100.00'), status='ACTIVE')
+        self.investment.create_default_positions()
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_post_queues_one_revaluation_job(self):
+        response = self.client.post('/updates/update-investments/')
+        self.assertEqual(response.status_code, 202)
+        again = self.client.post('/updates/update-investments/')
+        self.assertEqual(again.data['job_id'], response.data['job_id'])
+        self.assertEqual(Job.objects.filter(job_type='revaluation').count(), 1)
+
+    def test_worker_revalues_the_book(self):
+        response = self.client.post('/updates/update-investments/')
+        Company.objects.filter(pk=self.company.pk).update(current_price=Decimal('12.00'))
+        JobWorker(worker_id='test-worker').run_forever(burst=True)
+        job = Job.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, 'succeeded')
+        self.investment.refresh_from_db()
+        self.assertEqual(self.investment.current_value, Decimal('120.00'))
+
+
+class ValuationEngineTests(TestCase):
+    """The vectorized engine stores the same cents as the SQL engine and the model"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('user', 'user@example.com', 'password')
+        self.index = Index.objects.create(name='Index', description='Test index')
+
+    def add_investment(self, amount, holdings):
+        """holdings: (company, quantity) pairs"""
+        investment = Investment.objects.create(user=self.user, index=self.index, amount=Decimal(amount), status='ACTIVE')
+        for company, quantity in holdings:
+            InvestmentPosition.objects.create(
+                investment=investment, company=company, amount=Decimal('1.00'), quantity=Decimal(quantity),
+                purchase_price=Decimal('1.00'), current_price=Decimal('1.00'), weight=Decimal('1.00')
+            )
+        return investment
+
+    def values(self):
+        return list(Investment.objects.order_by('pk').values_list('current_value', 'profit_loss', 'profit_loss_percentage'))
+
+    def reset(self):
+        Investment.objects.update(current_value=None, profit_loss=Decimal('0.00'), profit_loss_percentage=Decimal('0.00'))
+
+    def revalue_with_model(self):
+        for investment in Investment.objects.order_by('pk'):
+            investment.update_current_value()
+
+    def test_to_cents_rounds_halves_away_from_zero(self):
+        cents = to_cents(np.array([10.025, 1.005, 0.125, -0.125, 2.4949999]))
+        self.assertEqual(cents.tolist(), [1003, 101, 13, -13, 249])
+
+    def add_random_book(self, half_cent=True):
+        rng = random.Random(0)
+        companies = [
+            Company.objects.create(name=f'Company {n}', symbol=f'C{n}', current_price=Decimal(rng.randint(100, 99999)) / 100)
+            for n in range(8)
+        ]
+        for _ in range(30):
+            holdings = [(company, f'{rng.uniform(0.001, 50):.8f}') for company in rng.sample(companies, 3)]
+            self.add_investment(f'{rng.randint(100, 500000) / 100:.2f}', holdings)
+        if not half_cent:
+            return
+        # An exact half cent: 2.5 * 4.01 = 10.025
+        self.add_investment('10.00', [(Company.objects.create(name='Half', symbol='HALF', current_price=Decimal('4.01')), '2.5')])
+
+    def test_vectorized_matches_model(self):
+        self.add_random_book()
+        VectorizedValuationEngine().run()
+        vectorized = self.values()
+        self.assertEqual(vectorized[-1], (Decimal('10.03'), Decimal('0.03'), Decimal('0.30')))
+        self.reset()
+        self.revalue_with_model()
+        self.assertEqual(self.values(), vectorized)
+
+    def test_sql_values_match_model(self):
+        # SQLite stores the unrounded float sums and reads them back half-even, so no exact halves here
+        self.add_random_book(half_cent=False)
+        revalue_investments_sql()
+        current_values = [row[0] for row in self.values()]
+        self.reset()
+        self.revalue_with_model()
+        self.assertEqual([row[0] for row in self.values()], current_values)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'SQLite keeps unrounded sums in decimal columns')
+    def test_vectorized_matches_sql(self):
+        self.add_random_book()
+        VectorizedValuationEngine().run()
+        vectorized = self.values()
+        self.reset()
+        revalue_investments_sql()
+        self.assertEqual(self.values(), vectorized)
+
+
+class SchedulerAutostartTests(SimpleTestCase):
+    """Only the server entry points start the price scheduler, and only when asked to"""
+
+    def test_django_setup_does_not_start_the_scheduler(self):
+        script = (
+            "import django, threading; django.setup(); "
+            "print(any(thread.name == 'price-scheduler' for thread in threading.enumerate()))"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, 'PRICE_SCHEDULER_AUTOSTART': 'true', 'RUN_MAIN': 'true'}
+        ).stdout
+        self.assertEqual(output.strip(), 'False')
+
+    def test_autostart_follows_the_setting(self):
+        with mock.patch('updates.scheduler.start_scheduler_thread') as start:
+            with override_settings(PRICE_SCHEDULER_AUTOSTART=False):
+                self.assertIsNone(autostart_scheduler())
+            start.assert_not_called()
+            with override_settings(PRICE_SCHEDULER_AUTOSTART=True):
+                autostart_scheduler()
+            start.assert_called_once_with()
+
+    def test_shard_workers_never_start_the_scheduler(self):
+        context = multiprocessing.get_context('spawn')
+        with mock.patch.dict(os.environ, {'PRICE_SCHEDULER_AUTOSTART': 'true', 'RUN_MAIN': 'true'}):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=init_worker) as executor:
+                self.assertEqual(executor.submit(scheduler_state).result(), (False, False))
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import TestUpdateView, UpdateInvestmentsView
+from .views import TestUpdateView, UpdateInvestmentsView, PriceTicksView, UpdateRunsView
 
 urlpatterns = [
     path('test-update/', TestUpdateView.as_view(), name='test-update'),
     path('update-investments/', UpdateInvestmentsView.as_view(), name='update-investments'),
+    path('ticks/', PriceTicksView.as_view(), name='price-ticks'),
+    path('runs/', UpdateRunsView.as_view(), name='update-runs'),
 ] 
\ No newline at end of file
@@ -0,0 +1,183 @@
+import logging
+import time
+from decimal import Decimal
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from companies.models import Company
+from investments.models import Investment, InvestmentPosition
+from .revaluation import RevaluationResult, reprice_positions, select_book
+
+logger = logging.getLogger(__name__)
+
+
+class PositionBook:
+    """
+    Investments, positions and prices loaded into NumPy arrays.
+
+    Investments are sorted by ID; every position refers to its investment and
+    company by row number (investment_idx / company_idx) so values can be
+    computed with fancy indexing and aggregated with np.bincount.
+    """
+
+    def __init__(self, investment_ids, amounts, current_values,
+                 investment_idx, company_idx, quantities, position_prices, company_prices):
+        self.investment_ids = investment_ids
+        self.amounts = amounts
+        self.current_values = current_values
+        self.investment_idx = investment_idx
+        self.company_idx = company_idx
+        self.quantities = quantities
+        self.position_prices = position_prices
+        self.company_prices = company_prices
+
+    @property
+    def position_count(self):
+        return len(self.quantities)
+
+    @classmethod
+    def load(cls, investments, positions):
+        """Build a book from an Investment queryset and the matching positions queryset"""
+        investment_rows = list(investments.order_by('pk').values_list('pk', 'amount', 'current_value'))
+        investment_ids = np.array([row[0] for row in investment_rows], dtype=np.int64)
+        amounts = np.array([float(row[1]) for row in investment_rows], dtype=np.float64)
+        current_values = np.array(
+            [np.nan if row[2] is None else float(row[2]) for row in investment_rows],
+            dtype=np.float64
+        )
+
+        position_rows = list(positions.values_list('investment_id', 'company_id', 'quantity', 'current_price'))
+        # Drop positions whose investment left the selection between the two queries
+        selected = set(investment_ids.tolist())
+        position_rows = [row for row in position_rows if row[0] in selected]
+        position_investments = np.array([row[0] for row in position_rows], dtype=np.int64)
+        position_companies = np.array([row[1] for row in position_rows], dtype=np.int64)
+        quantities = np.array([float(row[2]) for row in position_rows], dtype=np.float64)
+        position_prices = np.array([float(row[3]) for row in position_rows], dtype=np.float64)
+
+        # Price vector indexed by company row; NaN where a company has no price
+        company_ids = np.unique(position_companies)
+        prices = dict(Company.objects.filter(pk__in=company_ids.tolist()).values_list('pk', 'current_price'))
+        company_prices = np.array(
+            [np.nan if prices.get(pk) is None else float(prices[pk]) for pk in company_ids.tolist()],
+            dtype=np.float64
+        )
+
+        return cls(
+            investment_ids=investment_ids,
+            amounts=amounts,
+            current_values=current_values,
+            investment_idx=np.searchsorted(investment_ids, position_investments),
+            company_idx=np.searchsorted(company_ids, position_companies),
+            quantities=quantities,
+            position_prices=position_prices,
+            company_prices=company_prices
+        )
+
+
+def to_cents(values):
+    """
+    Round amounts to whole cents (int64), halves away from zero.
+
+    This is how PostgreSQL rounds numeric and how Investment.update_current_value
+    quantizes, so every engine stores the same cents. Float noise below a
+    millionth of a cent is dropped first: an exact half such as 10.025 is
+    1002.4999999999999 cents in binary and must still round up.
+    """
+    cents = np.round(values * 100, 6)
+    return (np.sign(cents) * np.floor(np.abs(cents) + 0.5)).astype(np.int64)
+
+
+def compute_values(book):
+    """
+    Vectorized valuation of a PositionBook.
+
+    Returns (current_value, profit_loss, profit_loss_percentage, has_positions)
+    arrays aligned with book.investment_ids, the first three in whole cents.
+    Positions whose company has no price keep their stored price, and
+    investments whose total is not positive fall back to the invested amount,
+    as in Investment.update_current_value.
+    """
+    count = len(book.investment_ids)
+    prices = book.company_prices[book.company_idx]
+    prices = np.where(np.isnan(prices), book.position_prices, prices)
+
+    totals = np.bincount(book.investment_idx, weights=book.quantities * prices, minlength=count)
+    has_positions = np.bincount(book.investment_idx, minlength=count) > 0
+
+    amounts = to_cents(book.amounts)
+    current_values = to_cents(np.where(totals > 0, totals, book.amounts))
+    profit_loss = current_values - amounts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage = to_cents(np.where(amounts > 0, profit_loss / amounts * 100, 0.0))
+    return current_values, profit_loss, percentage, has_positions
+
+
+def to_decimal(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class VectorizedValuationEngine:
+    """
+    Revalues investments by loading the book into arrays, computing every
+    position value and per-investment total in a few NumPy passes and
+    writing back only the investments whose value changed, in bulk.
+    """
+
+    def __init__(self, status='ACTIVE', company_ids=None, batch_size=None, shard=None):
+        self.status = status
+        self.company_ids = company_ids
+        self.shard = shard
+        self.batch_size = batch_size or settings.REVALUATION_BATCH_SIZE
+        self.timings = {}
+
+    def _timed(self, phase, started):
+        self.timings[phase] = round((time.perf_counter() - started) * 1000, 2)
+
+    def run(self):
+        started = time.perf_counter()
+        now = timezone.now()
+        positions, investments = select_book(self.status, self.company_ids, self.shard)
+
+        phase_started = time.perf_counter()
+        book = PositionBook.load(
+            investments,
+            InvestmentPosition.objects.filter(investment__in=investments)
+        )
+        self._timed('load', phase_started)
+
+        phase_started = time.perf_counter()
+        current_values, profit_loss, percentage, has_positions = compute_values(book)
+        # cents / 100 is the float nearest the stored Decimal, and NaN (no value yet) always differs
+        changed = np.flatnonzero(has_positions & (current_values / 100 != book.current_values))
+        self._timed('compute', phase_started)
+
+        phase_started = time.perf_counter()
+        updates = [
+            Investment(
+                pk=int(book.investment_ids[i]),
+                current_value=to_decimal(current_values[i]),
+                profit_loss=to_decimal(profit_loss[i]),
+                profit_loss_percentage=to_decimal(percentage[i]),
+                last_updated=now
+            )
+            for i in changed.tolist()
+        ]
+        with transaction.atomic():
+            positions_updated = reprice_positions(positions, now)
+        # Commit each batch on its own so row locks are held briefly
+        for offset in range(0, len(updates), self.batch_size):
+            with transaction.atomic():
+                Investment.objects.bulk_update(
+                    updates[offset:offset + self.batch_size],
+                    ['current_value', 'profit_loss', 'profit_loss_percentage', 'last_updated']
+                )
+        self._timed('write', phase_started)
+
+        logger.debug(f"Vectorized valuation of {book.position_count} positions: {self.timings}")
+        return RevaluationResult(
+            positions_updated=positions_updated,
+            investments_updated=len(updates),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2)
+        )
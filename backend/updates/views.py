@@ -3,13 +3,24 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
 from rest_framework import status
-from .tasks import update_stock_prices
-from .models import UpdateLog
+from .tasks import queue_pending_revaluation, run_test_update
+from .models import UpdateLog, UpdateRun
+from .runs import RunRecorder, summarize_runs
+from .serializers import UpdateRunSerializer
+from .revaluation import revalue_investments
+from .ingest import PriceIngestor
+from .sources import PriceQuote, StaticPriceSource, parse_price, parse_timestamp
+from django.conf import settings
+from indexes.nav import record_index_navs
+from accounts.snapshots import snapshot_portfolios
 from django.utils import timezone
 import threading
-from investments.models import Investment, InvestmentPosition
+from investments.models import InvestmentPosition
 from investments.serializers import InvestmentSerializer
 from rest_framework.permissions import IsAdminUser
+from django.urls import reverse
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
 
 # Create your views here.
 
@@ -22,8 +33,9 @@ class TestUpdateView(APIView):
             update_log = run_test_update()
             return Response({
                 'status': 'success',
-                'last_updated': update_log.timestamp.isoformat() if update_log else None,
-                'details': str(update_log) if update_log else 'No update performed'
+                'last_updated': update_log.last_updated.isoformat() if update_log else None,
+                'details': update_log.details if update_log else 'No update performed',
+                'timings': update_log.timings if update_log else {}
             })
         except Exception as e:
             return Response({
@@ -32,24 +44,146 @@ class TestUpdateView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class UpdateInvestmentsView(APIView):
-    """View to update investment positions based on current company prices"""
+    """
+    Queue a revaluation of every active investment at current company
+    prices. The run_jobs worker does the work; the response is 202 with the
+    job, whose progress is reported at /jobs/{id}/.
+    """
     permission_classes = [IsAdminUser]
     
     def post(self, request):
         try:
-            # Get all investments
-            investments = Investment.objects.filter(status='ACTIVE')
-            
-            # Update each investment's positions
-            updated_count = 0
-            for investment in investments:
-                if hasattr(investment, 'update_positions'):
-                    investment.update_positions()
-                    updated_count += 1
+            job, created = enqueue('revaluation', {'status': 'ACTIVE'}, dedupe_key='revaluation:ACTIVE', user=request.user)
+        except Exception as e:
+            return Response({
+                'status': 'error',
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response({
+            'status': 'success',
+            'message': 'Revaluation queued' if created else 'A revaluation is already queued or running',
+            'job_id': job.id,
+            'job_url': reverse('job-detail', kwargs={'pk': job.id}),
+            'job': JobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class PriceTicksView(APIView):
+    """
+    Accept a batch of price ticks from an external feeder.
+    Body: {"ticks": [{"symbol": "AAPL", "price": "187.12", "timestamp": "2025-03-21T12:00:00Z"}, ...]}
+    Ticks for the same symbol are coalesced to the latest one before the
+    companies are updated in bulk, then only the affected investments are revalued.
+    """
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request):
+        ticks = request.data.get('ticks') if isinstance(request.data, dict) else request.data
+        if not isinstance(ticks, list) or not ticks:
+            return Response({
+                'error': 'ticks must be a non-empty list'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if len(ticks) > settings.PRICE_TICKS_MAX_BATCH:
+            return Response({
+                'error': f'At most {settings.PRICE_TICKS_MAX_BATCH} ticks are accepted per request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Parse ticks by hand; a serializer per tick is too slow for large batches
+        received_at = timezone.now()
+        quotes = []
+        rejected = 0
+        for tick in ticks:
+            if not isinstance(tick, dict):
+                rejected += 1
+                continue
+            symbol = str(tick.get('symbol') or '').strip()
+            price = parse_price(tick.get('price'))
+            timestamp = parse_timestamp(tick.get('timestamp'), received_at)
+            if not symbol or price is None or timestamp is None:
+                rejected += 1
+                continue
+            quotes.append(PriceQuote(symbol, price, timestamp))
+        
+        if not quotes:
+            return Response({
+                'error': 'No valid ticks in batch',
+                'rejected': rejected
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        recorder = RunRecorder('price_ticks', trigger='ticks')
+        try:
+            result = PriceIngestor(StaticPriceSource(quotes), timer=recorder.timer).run()
+            revaluation = None
+            revaluation_job = None
+            try:
+                with recorder.phase('revaluation') as phase:
+                    revaluation = revalue_investments(company_ids=result.changed_ids)
+                    phase.rows_written = revaluation.investments_updated
+                    phase.extra['positions_updated'] = revaluation.positions_updated
+                    phase.extra['shards'] = revaluation.shards
+            except Exception as e:
+                # The prices are committed; a job retries the revaluation
+                revaluation_job = queue_pending_revaluation(result.changed_ids, e)
+            if result.changed_ids:
+                with recorder.phase('portfolio_snapshot') as phase:
+                    phase.rows_written = snapshot_portfolios(result.changed_ids)
+                with recorder.phase('index_nav') as phase:
+                    phase.rows_written = record_index_navs()
+            recorder.finish(status='success', summary=result.summary())
+        except Exception as e:
+            recorder.finish(status='error', error=str(e))
+            return Response({
+                'status': 'error',
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response({
+            'status': 'success',
+            'received': len(ticks),
+            'rejected': rejected,
+            'applied': result.applied,
+            'changed': len(result.changed_ids),
+            'unknown_symbols': result.unknown_symbols,
+            'investments_updated': revaluation.investments_updated if revaluation else 0,
+            'revaluation_job': revaluation_job.id if revaluation_job else None,
+            'run': recorder.run.id,
+            'timings': recorder.timer.timings
+        })
+
+
+class UpdateRunsView(APIView):
+    """
+    Recent price refresh runs with their phase spans and percentile summaries.
+    Query params: type (default stock_prices), status, limit (default 50, max 500).
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), 500)
+        except ValueError:
+            return Response({
+                'error': 'limit must be an integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({
+                'error': 'limit must be positive'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            runs = UpdateRun.objects.filter(
+                update_type=request.query_params.get('type', 'stock_prices')
+            ).prefetch_related('spans')
+            if request.query_params.get('status'):
+                runs = runs.filter(status=request.query_params['status'])
+            runs = list(runs[:limit])
             
             return Response({
                 'status': 'success',
-                'investments_updated': updated_count
+                'summary': summarize_runs(runs),
+                'runs': UpdateRunSerializer(runs, many=True).data
             })
         except Exception as e:
             return Response({
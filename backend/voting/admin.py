@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Vote, CompanyVoteCount
+from .models import Vote, CompanyVoteCount, VotePatternCount
 
 @admin.register(Vote)
 class VoteAdmin(admin.ModelAdmin):
@@ -13,4 +13,10 @@ class CompanyVoteCountAdmin(admin.ModelAdmin):
     list_display = ('company', 'index', 'total_weight', 'vote_count', 'last_updated')
     list_filter = ('index', 'last_updated')
     search_fields = ('company__name', 'index__name')
-    readonly_fields = ('last_updated',) 
\ No newline at end of file
+    readonly_fields = ('last_updated',) 
+
+@admin.register(VotePatternCount)
+class VotePatternCountAdmin(admin.ModelAdmin):
+    list_display = ('index', 'companies_voted', 'user_count', 'last_updated')
+    list_filter = ('index',)
+    readonly_fields = ('last_updated',)
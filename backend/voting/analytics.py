@@ -0,0 +1,94 @@
+import logging
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F
+from .models import Vote, VotePatternCount
+
+logger = logging.getLogger(__name__)
+
+
+def companies_voted(index, user):
+    """Number of distinct companies a user has voted for in an index"""
+    return Vote.objects.filter(index=index, user=user).aggregate(
+        total=Count('company', distinct=True)
+    )['total']
+
+
+def count_vote_distribution(index):
+    """
+    Votes-per-user histogram computed from the votes themselves with a
+    single GROUP BY: {companies voted for: number of users}.
+    """
+    per_user = Vote.objects.filter(index=index).values('user').annotate(
+        companies_voted=Count('company', distinct=True)
+    ).values_list('companies_voted', flat=True)
+    return dict(sorted(Counter(per_user.iterator()).items()))
+
+
+@transaction.atomic
+def rebuild_vote_distribution(index):
+    """Recount the stored histogram of an index from its votes"""
+    distribution = count_vote_distribution(index)
+    VotePatternCount.objects.filter(index=index).delete()
+    VotePatternCount.objects.bulk_create([
+        VotePatternCount(index=index, companies_voted=voted, user_count=users)
+        for voted, users in distribution.items()
+    ])
+    logger.info(f"Rebuilt vote distribution for index {index.id}: {distribution}")
+    return distribution
+
+
+def record_vote_change(index, previous, current):
+    """
+    Move one user between histogram buckets after their votes changed from
+    `previous` to `current` companies (0 means no votes). Counters are
+    updated with F() expressions, so concurrent submissions don't lose
+    increments.
+    """
+    if previous == current:
+        return
+    with transaction.atomic():
+        if previous:
+            VotePatternCount.objects.filter(
+                index=index, companies_voted=previous, user_count__gt=0
+            ).update(user_count=F('user_count') - 1)
+        if current:
+            bucket, created = VotePatternCount.objects.get_or_create(
+                index=index, companies_voted=current, defaults={'user_count': 1}
+            )
+            if not created:
+                VotePatternCount.objects.filter(pk=bucket.pk).update(user_count=F('user_count') + 1)
+
+
+def get_vote_distribution(index):
+    """
+    Votes-per-user histogram of an index, read from the stored counters.
+    Indexes voted on before the counters existed are backfilled by a data
+    migration; one that still has votes but no buckets is counted here.
+    """
+    distribution = dict(
+        VotePatternCount.objects.filter(index=index, user_count__gt=0)
+        .order_by('companies_voted')
+        .values_list('companies_voted', 'user_count')
+    )
+    if not distribution and Vote.objects.filter(index=index).exists():
+        distribution = rebuild_vote_distribution(index)
+    return distribution
+
+
+def most_common_votes(distribution, default):
+    """The number of companies most users voted for (the mode), or default"""
+    if not distribution:
+        return default
+    return max(distribution.items(), key=lambda item: item[1])[0]
+
+
+def basket_size(index, distribution, companies_with_votes):
+    """
+    Number of companies an executed index holds: the most common voting
+    pattern, kept within the index's [min, max] votes per user and the
+    number of companies that received votes. Returns (mode, size).
+    """
+    mode_votes = most_common_votes(distribution, index.min_votes_per_user)
+    num_companies = max(min(mode_votes, index.max_votes_per_user), index.min_votes_per_user)
+    return mode_votes, min(num_companies, companies_with_votes)
@@ -0,0 +1,30 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indexes', '0007_index_search_vector'),
+        ('voting', '0004_create_company_vote_counts_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VotePatternCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('companies_voted', models.PositiveIntegerField(help_text='Number of companies a user voted for', verbose_name='Companies Voted')),
+                ('user_count', models.PositiveIntegerField(default=0, help_text='Number of users who voted for that many companies', verbose_name='User Count')),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('index', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_pattern_counts', to='indexes.index', verbose_name='Index')),
+            ],
+            options={
+                'verbose_name': 'Vote Pattern Count',
+                'verbose_name_plural': 'Vote Pattern Counts',
+                'db_table': 'vote_pattern_counts',
+                'ordering': ['companies_voted'],
+                'unique_together': {('index', 'companies_voted')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_vote_pattern_counts(apps, schema_editor):
+    # Indexes voted on before the histogram existed; new votes only move users between buckets
+    Vote = apps.get_model('voting', 'Vote')
+    VotePatternCount = apps.get_model('voting', 'VotePatternCount')
+    histograms = {}
+    for index_id, voted in Vote.objects.filter(index__isnull=False).values('index', 'user').annotate(
+        voted=Count('company', distinct=True)
+    ).values_list('index', 'voted').iterator():
+        buckets = histograms.setdefault(index_id, {})
+        buckets[voted] = buckets.get(voted, 0) + 1
+
+    VotePatternCount.objects.filter(index_id__in=list(histograms)).delete()
+    VotePatternCount.objects.bulk_create([
+        VotePatternCount(index_id=index_id, companies_voted=voted, user_count=users)
+        for index_id, buckets in histograms.items()
+        for voted, users in buckets.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voting', '0005_votepatterncount'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_vote_pattern_counts, migrations.RunPython.noop),
+    ]
@@ -126,4 +126,37 @@ class CompanyVoteCount(models.Model):
                 'vote_count': vote_count
             }
         )
-        return vote_count_obj 
\ No newline at end of file
+        return vote_count_obj 
+
+class VotePatternCount(models.Model):
+    """
+    Number of users in an index who voted for a given number of companies.
+    A denormalized histogram kept up to date as votes are submitted, so the
+    voting pattern of an index can be read without scanning its votes.
+    """
+    index = models.ForeignKey(
+        Index,
+        on_delete=models.CASCADE,
+        related_name='vote_pattern_counts',
+        verbose_name=_('Index')
+    )
+    companies_voted = models.PositiveIntegerField(
+        help_text=_("Number of companies a user voted for"),
+        verbose_name=_('Companies Voted')
+    )
+    user_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Number of users who voted for that many companies"),
+        verbose_name=_('User Count')
+    )
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'vote_pattern_counts'
+        verbose_name = _('Vote Pattern Count')
+        verbose_name_plural = _('Vote Pattern Counts')
+        ordering = ['companies_voted']
+        unique_together = ['index', 'companies_voted']
+
+    def __str__(self):
+        return f"{self.index.name}: {self.user_count} users voted for {self.companies_voted} companies"
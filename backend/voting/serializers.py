@@ -5,6 +5,7 @@ from indexes.models import Index
 from django.db import transaction
 from decimal import Decimal
 from companies.models import Company
+from .analytics import companies_voted, record_vote_change
 
 
 class VoteSerializer(serializers.ModelSerializer):
@@ -105,6 +106,9 @@ class CreateVoteSerializer(serializers.Serializer):
         # Calculate vote weight per company
         weight_per_company = investment.amount / Decimal(len(company_ids))
         
+        # Companies this user had voted for before, for the voting-pattern histogram
+        previously_voted = companies_voted(index, user)
+        
         # Delete any existing votes for this user and investment
         Vote.objects.filter(user=user, investment=investment).delete()
         
@@ -128,6 +132,9 @@ class CreateVoteSerializer(serializers.Serializer):
             company = Company.objects.get(pk=company_id)
             CompanyVoteCount.update_vote_count(index, company)
         
+        # Move the user to their new bucket of the voting-pattern histogram
+        record_vote_change(index, previously_voted, companies_voted(index, user))
+        
         # Mark investment as voted and update status
         investment.has_voted = True
         investment.status = 'VOTED'
@@ -0,0 +1,82 @@
+import importlib
+from decimal import Decimal
+from django.apps import apps
+from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import CustomUser
+from companies.models import Company
+from indexes.models import Index
+from investments.models import Investment
+from .analytics import basket_size, count_vote_distribution, get_vote_distribution
+from .models import Vote, VotePatternCount
+
+backfill = importlib.import_module('voting.migrations.0006_backfill_vote_pattern_counts')
+
+
+class VoteDistributionTests(TestCase):
+    """The stored votes-per-user histogram against a recount of the votes"""
+
+    def setUp(self):
+        self.companies = [
+            Company.objects.create(name=f'Company {symbol}', symbol=symbol, current_price=Decimal('10.00'))
+            for symbol in ['AAA', 'BBB', 'CCC', 'DDD']
+        ]
+        self.index = Index.objects.create(
+            name='Index', description='Test index', status='VOTING', min_votes_per_user=1, max_votes_per_user=4
+        )
+        self.index.companies.set(self.companies)
+        self.users = [
+            CustomUser.objects.create_user(f'user{number}', f'user{number}@example.com', 'password')
+            for number in range(4)
+        ]
+
+    def invest(self, user):
+        return Investment.objects.create(user=user, index=self.index, amount=Decimal('100.00'), status='ACTIVE')
+
+    def submit(self, user, companies, investment=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        investment = investment or self.invest(user)
+        return client.post('/voting/votes/submit_votes/', {
+            'index_id': self.index.id,
+            'investment_id': investment.id,
+            'company_ids': [company.id for company in companies],
+        }, format='json')
+
+    def test_submissions_keep_the_histogram_in_step(self):
+        self.assertEqual(self.submit(self.users[0], self.companies[:2]).status_code, 201)
+        self.submit(self.users[1], self.companies[:2])
+        self.submit(self.users[2], self.companies[:3])
+        self.assertEqual(get_vote_distribution(self.index), {2: 2, 3: 1})
+        self.assertEqual(get_vote_distribution(self.index), count_vote_distribution(self.index))
+        self.assertEqual(basket_size(self.index, get_vote_distribution(self.index), 3), (2, 2))
+
+    def test_second_investment_moves_the_user_between_buckets(self):
+        self.submit(self.users[0], self.companies[:2])
+        self.submit(self.users[0], self.companies[2:4])
+        self.assertEqual(get_vote_distribution(self.index), {4: 1})
+        self.assertEqual(get_vote_distribution(self.index), count_vote_distribution(self.index))
+
+    def test_backfill_counts_votes_cast_before_the_histogram(self):
+        for user, voted in zip(self.users, [1, 2, 2, 3]):
+            investment = self.invest(user)
+            Vote.objects.bulk_create([
+                Vote(user=user, index=self.index, company=company, investment=investment, weight=Decimal('1'))
+                for company in self.companies[:voted]
+            ])
+        backfill.backfill_vote_pattern_counts(apps, None)
+        self.assertEqual(get_vote_distribution(self.index), {1: 1, 2: 2, 3: 1})
+
+        # A later vote moves one user instead of replacing the backfilled buckets
+        self.submit(self.users[0], self.companies[1:2])
+        self.assertEqual(get_vote_distribution(self.index), count_vote_distribution(self.index))
+        self.assertEqual(sum(get_vote_distribution(self.index).values()), 4)
+
+    def test_votes_cannot_be_deleted_around_the_counters(self):
+        self.submit(self.users[0], self.companies[:2])
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        vote = Vote.objects.filter(user=self.users[0]).first()
+        self.assertEqual(client.delete(f'/voting/votes/{vote.id}/').status_code, 405)
+        self.assertEqual(client.post('/voting/votes/', {}, format='json').status_code, 405)
+        self.assertEqual(VotePatternCount.objects.get(index=self.index).user_count, 1)
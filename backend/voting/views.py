@@ -9,7 +9,12 @@ from .serializers import VoteSerializer, CompanyVoteCountSerializer, CreateVoteS
 from indexes.models import Index
 
 
-class VoteViewSet(viewsets.ModelViewSet):
+class VoteViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    The current user's votes. Votes are only written through submit_votes,
+    which validates them and keeps the vote tallies and the voting-pattern
+    histogram in step; there is no generic create, update or delete.
+    """
     serializer_class = VoteSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -17,10 +22,6 @@ class VoteViewSet(viewsets.ModelViewSet):
         """Only return votes created by the current user"""
         return Vote.objects.filter(user=self.request.user)
 
-    def perform_create(self, serializer):
-        """Ensure vote is associated with current user"""
-        serializer.save(user=self.request.user)
-
     @action(detail=False, methods=['post'])
     def submit_votes(self, request):
         """
@@ -211,13 +211,37 @@ const indexesService = {
     try {
       const api = createApiInstance();
       const response = await api.post(`indexes/${id}/execute/`);
-      return response.data;
+      // Execution runs as a background job; wait for it to finish
+      return await this.waitForJob(response.data.job_id);
     } catch (error) {
       console.error(`Failed to execute index ${id}:`, error.message);
       throw error;
     }
   },
 
+  async waitForJob(jobId, { interval = 2000, maxWait = 10 * 60 * 1000, queuedWait = 60 * 1000 } = {}) {
+    const api = createApiInstance();
+    const startedAt = Date.now();
+    for (;;) {
+      const response = await api.get(`jobs/${jobId}/`);
+      const job = response.data;
+      if (job.status === "succeeded") return job;
+      if (job.status === "failed") {
+        throw new Error(job.error || `Job ${jobId} failed`);
+      }
+      const waited = Date.now() - startedAt;
+      if (job.status === "queued" && job.attempts === 0 && waited >= queuedWait) {
+        throw new Error(
+          `Job ${jobId} is still queued. Check that the job worker (manage.py run_jobs) is running.`
+        );
+      }
+      if (waited >= maxWait) {
+        throw new Error(`Job ${jobId} is still ${job.status}; check its progress later.`);
+      }
+      await new Promise((resolve) => setTimeout(resolve, interval));
+    }
+  },
+
   async setIndexDraft(id) {
     try {
       const api = createApiInstance();